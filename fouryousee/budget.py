@@ -0,0 +1,36 @@
+import threading
+import time
+
+
+class RateBudget(object):
+    """
+    Token bucket that limits the requests sent with one token. Up to
+    `burst` requests are sent at once, then one every `1 / rate` seconds.
+    The threads that share the budget wait their turn, so sending the
+    requests concurrently doesn't raise the rate.
+
+    :param rate: Requests per second.
+    :type rate: float, optional
+    :param burst: Requests allowed at once after a pause.
+    :type burst: int, optional
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 1):
+        if rate <= 0 or burst < 1:
+            raise Exception("The rate must be positive and the burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Wait until a request can be sent"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
@@ -0,0 +1,131 @@
+from typing import List
+
+
+class CategoryTree(object):
+    """
+    Index of the tree of media categories. The categories are ordered
+    in preorder, so the subtree of a category is a contiguous slice of
+    that order, and the number of medias of every subtree is computed
+    once from one listing of the medias.
+
+    :param categories: Categories as returned by `get_media_category()`.
+    :type categories: list, required
+    :param medias: Medias as returned by `get_medias()`.
+    :type medias: list, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> tree = my.get_category_tree()
+    >>> tree.subtree(1)  # The category and all its descendants
+    [1, 11, 15, 16]
+    >>> tree.medias_under(1)  # Medias of the category 1 and its descendants
+    [1, 4, 125]
+    >>> tree.media_count(15)
+    1
+    >>> tree.empty_subtrees()
+    [9, 10, 14, 17]
+
+    """
+
+    def __init__(self, categories: List[dict], medias: List[dict] = None):
+        self.categories = {c["id"]: c for c in categories}
+        self.parent = {}
+        self.children = {category_id: [] for category_id in self.categories}
+        for category_id, category in self.categories.items():
+            parent = category.get("parent")
+            parent_id = parent["id"] if isinstance(parent, dict) else parent
+            if parent_id in self.categories and parent_id != category_id:
+                self.parent[category_id] = parent_id
+                self.children[parent_id].append(category_id)
+            else:
+                self.parent[category_id] = None
+        for category_id, category in self.categories.items():
+            for child in category.get("children") or []:
+                child_id = child["id"] if isinstance(child, dict) else child
+                if child_id in self.categories and self.parent.get(child_id) is None \
+                        and child_id != category_id:
+                    self.parent[child_id] = category_id
+                    self.children[category_id].append(child_id)
+
+        # Preorder, where the subtree of a category is order[start:end]
+        self.order, self.start, self.end = [], {}, {}
+        roots = sorted(c for c, p in self.parent.items() if p is None)
+        for root in roots + sorted(self.categories):  # Cycles have no root
+            if root in self.start:
+                continue
+            stack = [(root, False)]
+            while stack:
+                category_id, closing = stack.pop()
+                if closing:
+                    self.end[category_id] = len(self.order)
+                    continue
+                if category_id in self.start:
+                    continue
+                self.start[category_id] = len(self.order)
+                self.order.append(category_id)
+                stack.append((category_id, True))
+                for child in sorted(self.children[category_id], reverse=True):
+                    stack.append((child, False))
+
+        self.medias = {category_id: [] for category_id in self.categories}
+        for media in medias or []:
+            for category in media.get("categories") or []:
+                category_id = category["id"] if isinstance(category, dict) else category
+                if category_id in self.medias:
+                    self.medias[category_id].append(media["id"])
+
+        # Distinct medias by subtree, merging the smaller set into the
+        # bigger one from the leaves to the roots
+        self.counts, pending = {}, {}
+        for category_id in reversed(self.order):
+            merged = set(self.medias[category_id])
+            for child in self.children[category_id]:
+                child_set = pending.pop(child, set())
+                if len(child_set) > len(merged):
+                    merged, child_set = child_set, merged
+                merged |= child_set
+            self.counts[category_id] = len(merged)
+            pending[category_id] = merged
+
+    def subtree(self, category_id: int) -> List[int]:
+        """Ids of the category and all its descendants"""
+        return self.order[self.start[category_id]:self.end[category_id]]
+
+    def ancestors(self, category_id: int) -> List[int]:
+        """Ids of the parents of the category, from the closest to the
+        root. With a cycle of parents, it stops when an id repeats."""
+        result, seen, current = [], {category_id}, self.parent.get(category_id)
+        while current is not None and current not in seen:
+            result.append(current)
+            seen.add(current)
+            current = self.parent.get(current)
+        return result
+
+    def medias_under(self, category_id: int) -> List[int]:
+        """Ids of the medias of the category and its descendants"""
+        return sorted({
+            media_id
+            for descendant in self.subtree(category_id)
+            for media_id in self.medias[descendant]
+        })
+
+    def media_count(self, category_id: int) -> int:
+        """Number of distinct medias of the category and its descendants"""
+        return self.counts[category_id]
+
+    def empty_subtrees(self, topmost: bool = False) -> List[int]:
+        """Ids of the categories without medias in all their subtree.
+        When `topmost` is True, the descendants of an empty category
+        aren't listed."""
+        result, position = [], 0
+        while position < len(self.order):
+            category_id = self.order[position]
+            if self.counts[category_id] == 0:
+                result.append(category_id)
+                if topmost:
+                    position = self.end[category_id]
+                    continue
+            position += 1
+        return sorted(result)
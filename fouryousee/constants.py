@@ -0,0 +1 @@
+PLATFORMS = ["SAMSUNG", "WINDOWS", "ANDROID", "4YOUSEE_PLAYER", "LG"]
@@ -0,0 +1,301 @@
+import asyncio
+import threading
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from typing import Callable, Iterable, List
+
+from fouryousee.graph import player_slots
+from fouryousee.reports import DATETIME_FORMAT, playlog_datetime
+
+PLAYER_ADDED = "player added"
+PLAYER_REMOVED = "player removed"
+STATUS_CHANGED = "status changed"
+WENT_OFFLINE = "went offline"
+CAME_ONLINE = "came online"
+PLAYLISTS_CHANGED = "playlists changed"
+GROUP_CHANGED = "group changed"
+PLATFORM_CHANGED = "platform changed"
+EVENT_TYPES = [PLAYER_ADDED, PLAYER_REMOVED, STATUS_CHANGED, WENT_OFFLINE, CAME_ONLINE, PLAYLISTS_CHANGED,
+               GROUP_CHANGED, PLATFORM_CHANGED]
+
+PlayerEvent = namedtuple("PlayerEvent", ["type", "player_id", "previous", "current", "player"])
+PlayerEvent.__doc__ = """Change of a player between two polls. `previous` and
+`current` hold the value that changed: the status, the minutes since the
+last contact, the slots of the playlists, the group or the platform."""
+
+
+def parse_datetime(value) -> datetime or None:
+    """Parse the dates sent by the API, where a missing date
+    can arrive as None or as the 'None' string"""
+    if not value or value == "None":
+        return None
+    return datetime.strptime(str(value)[:19], DATETIME_FORMAT)
+
+
+def contact_minutes(player: dict) -> int or None:
+    """Return the `lastContactInMinutes` of a player as integer"""
+    value = player.get("lastContactInMinutes")
+    if value is None or value == "None":
+        return None
+    return int(value)
+
+
+def scan_playlog_anomalies(players: List[dict],
+                           playlogs: Iterable[dict] = None,
+                           now: datetime = None,
+                           contact_threshold: int = 15,
+                           gap_threshold: int = 60) -> List[dict]:
+    """
+    Find, in one pass over the fleet, the players that have contact but
+    don't send logs and the players with gaps in the playback.
+
+    :param players: Players as returned by `get_players()`.
+    :type players: list, required
+    :param playlogs: Playlogs of a downloaded report. When informed,
+            the gaps between consecutive playlogs of every player are
+            considered.
+    :type playlogs: list, optional
+    :param now: Moment of reference, default value is the current time.
+    :type now: datetime, optional
+    :param contact_threshold: Minutes since the last contact to consider
+            a player in contact.
+    :type contact_threshold: int, optional
+    :param gap_threshold: Minutes without logs to consider a gap.
+    :type gap_threshold: int, optional
+    :return: List of dicts, one per anomaly, ranked from the longest gap
+            to the shortest.
+    :rtype: list
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from fouryousee.fleet import scan_playlog_anomalies
+    >>> scan_playlog_anomalies(my.get_players())
+    [
+       {
+          "id":2,
+          "name":"Sample name via API",
+          "issue":"contact without logs",
+          "gapInMinutes":14230,
+          "lastContactInMinutes":1,
+          "lastLogReceived":"2022-07-01 16:46:33"
+       }
+    ]
+
+    Considering the playlogs of a report
+
+    >>> from fouryousee.reports import read_report
+    >>> scan_playlog_anomalies(my.players, read_report('report_521546.gz'))
+
+    """
+    now = now or datetime.now()
+    moments = defaultdict(list)
+    for playlog in playlogs or []:
+        moments[int(playlog["playerId"])].append(playlog_datetime(playlog))
+
+    anomalies = []
+    for player in players:
+        base = dict(
+            id=player["id"],
+            name=player["name"],
+            lastContactInMinutes=contact_minutes(player),
+            lastLogReceived=player.get("lastLogReceived"),
+        )
+        last_contact = base["lastContactInMinutes"]
+        last_log = parse_datetime(base["lastLogReceived"])
+        if last_contact is not None and last_contact <= contact_threshold:
+            silence = None if last_log is None else int((now - last_log).total_seconds() // 60)
+            if silence is None or silence > gap_threshold:
+                anomalies.append(dict(
+                    base, issue="contact without logs", gapInMinutes=silence
+                ))
+
+        logs = sorted(moments.get(player["id"], []))
+        gap, start = 0, None
+        for previous, current in zip(logs, logs[1:]):
+            minutes = int((current - previous).total_seconds() // 60)
+            if minutes > gap:
+                gap, start = minutes, previous
+        if gap > gap_threshold:
+            anomalies.append(dict(
+                base, issue="playback gap", gapInMinutes=gap,
+                gapStart=start.strftime(DATETIME_FORMAT),
+            ))
+
+    return sorted(
+        anomalies,
+        key=lambda a: float("inf") if a["gapInMinutes"] is None else a["gapInMinutes"],
+        reverse=True,
+    )
+
+
+def player_state(player: dict, offline_threshold: int) -> tuple:
+    """Compact state of a player compared between polls: status,
+    whether it's offline, its playlists by slot, group and platform"""
+    status = player.get("playerStatus") or {}
+    minutes = contact_minutes(player)
+    offline = minutes is None or minutes > offline_threshold
+    group = (player.get("group") or {}).get("id")
+    return status.get("id"), offline, tuple(sorted(player_slots(player))), group, player.get("platform")
+
+
+class FleetPoller(object):
+    """
+    Poller of the players of the account that keeps the last snapshot
+    indexed by id and emits a :class:`PlayerEvent` for every change.
+    Only a compact state of every player is compared, in one pass, so
+    the poll interval can be short.
+
+    The events are delivered to the callbacks registered with `on`,
+    returned by `poll`, or consumed with ``async for``.
+
+    :param client: Object of :class:`FouryouseeAPI` used to consult the players.
+    :type client: FouryouseeAPI, required
+    :param interval: Seconds between every poll.
+    :type interval: int, optional
+    :param offline_threshold: Minutes since the last contact to consider
+            a player offline.
+    :type offline_threshold: int, optional
+    :param history: History where a snapshot of every poll is recorded.
+    :type history: HealthHistory, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from fouryousee.fleet import FleetPoller, WENT_OFFLINE
+    >>> poller = FleetPoller(my, interval=60, offline_threshold=15)
+    >>> poller.on(WENT_OFFLINE, lambda e: print("Offline:", e.player["name"], e.current))
+    >>> poller.start()
+    Offline: Sample name via API 16
+    >>> poller.stop()
+
+    Consuming the events with asyncio
+
+    >>> async def watch():
+    ...     async for event in FleetPoller(my):
+    ...         print(event.type, event.player_id)
+
+    """
+
+    def __init__(self, client, interval: int = 60, offline_threshold: int = 15, history=None):
+        self.client = client
+        self.history = history
+        self.interval = interval
+        self.offline_threshold = offline_threshold
+        self.players = {}
+        self.states = {}
+        self.initialized = False
+        self.callbacks = defaultdict(list)
+        self.stopped = threading.Event()
+        self.thread = None
+        self.error = None
+
+    def __aiter__(self):
+        return self.events()
+
+    def on(self, event_type: str or None, callback: Callable):
+        """Register a callback for one type of event, or for all of
+        them with None"""
+        if event_type is not None and event_type not in EVENT_TYPES:
+            raise Exception(f"Invalid event type {event_type}")
+        self.callbacks[event_type].append(callback)
+
+    def diff(self, players: List[dict]) -> List[PlayerEvent]:
+        """Compare the players received with the last snapshot, replace
+        the snapshot and return the changes. The first snapshot doesn't
+        produce events."""
+        events, states, current = [], {}, {}
+        for player in players:
+            player_id = player["id"]
+            state = player_state(player, self.offline_threshold)
+            states[player_id], current[player_id] = state, player
+            previous = self.states.get(player_id)
+            if previous is None:
+                if self.initialized:
+                    events.append(PlayerEvent(PLAYER_ADDED, player_id, None, player, player))
+                continue
+            if previous == state:
+                continue
+            if previous[0] != state[0]:
+                events.append(PlayerEvent(
+                    STATUS_CHANGED, player_id,
+                    self.players[player_id].get("playerStatus"), player.get("playerStatus"), player,
+                ))
+            if previous[1] != state[1]:
+                events.append(PlayerEvent(
+                    WENT_OFFLINE if state[1] else CAME_ONLINE, player_id,
+                    contact_minutes(self.players[player_id]), contact_minutes(player), player,
+                ))
+            if previous[2] != state[2]:
+                events.append(PlayerEvent(
+                    PLAYLISTS_CHANGED, player_id, dict(previous[2]), dict(state[2]), player,
+                ))
+            if previous[3] != state[3]:
+                events.append(PlayerEvent(
+                    GROUP_CHANGED, player_id, self.players[player_id].get("group"), player.get("group"), player,
+                ))
+            if previous[4] != state[4]:
+                events.append(PlayerEvent(PLATFORM_CHANGED, player_id, previous[4], state[4], player))
+        for player_id in self.states.keys() - states.keys():
+            player = self.players[player_id]
+            events.append(PlayerEvent(PLAYER_REMOVED, player_id, player, None, player))
+
+        self.players, self.states, self.initialized = current, states, True
+        return events
+
+    def dispatch(self, events: List[PlayerEvent]):
+        """Call the callbacks of every event"""
+        for event in events:
+            for callback in self.callbacks[event.type] + self.callbacks[None]:
+                callback(event)
+
+    def poll(self) -> List[PlayerEvent]:
+        """Consult the players, deliver the changes to the callbacks
+        and return them"""
+        players = self.client.get_players()
+        if self.history:
+            self.history.record(players)
+        events = self.diff(players)
+        self.dispatch(events)
+        return events
+
+    def run(self):
+        """Poll until `stop` is called. The errors of a poll don't stop
+        the poller, the last one is kept in `error`."""
+        while not self.stopped.is_set():
+            try:
+                self.poll()
+                self.error = None
+            except Exception as e:
+                self.error = e
+            self.stopped.wait(self.interval)
+
+    def start(self):
+        """Poll in a daemon thread"""
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread started by `start`"""
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    async def events(self):
+        """Asynchronous iterator of the events, polling in a thread
+        of the event loop every `interval` seconds"""
+        loop = asyncio.get_running_loop()
+        while True:
+            players = await loop.run_in_executor(None, self.client.get_players)
+            if self.history:
+                self.history.record(players)
+            events = self.diff(players)
+            self.dispatch(events)
+            for event in events:
+                yield event
+            await asyncio.sleep(self.interval)
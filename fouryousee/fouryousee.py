@@ -1,11 +1,24 @@
 import json
 import mimetypes
-import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
 from pathlib import Path
 from typing import List
 
 import requests
 
+from fouryousee.budget import RateBudget
+from fouryousee.categories import CategoryTree
+from fouryousee.constants import PLATFORMS
+from fouryousee.graph import DependencyGraph, item_media_ids
+from fouryousee.groups import GroupIndex
+from fouryousee.inventory import PlayerInventory
+from fouryousee.schedule import find_expired
+from fouryousee.search import MediaSearchIndex
+from fouryousee.slots import SlotMatrix
+from fouryousee.videowall import VideowallCompiler
+
 
 class FouryouseeAPI(object):
     """
@@ -33,6 +46,26 @@ class FouryouseeAPI(object):
         self.videowall = None
         self.reports = None
         self.playlogs = None
+        self.graph = None
+        self.category_tree = None
+        self.search_index = None
+        self.group_index = None
+        self.used_uploads = set()
+        # One request per second by token, shared by the threads of the
+        # client. A ClientPool also shares the session and the semaphore.
+        self.session = requests
+        self.budget = RateBudget(1.0)
+        self.semaphore = None
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request to the API respecting the rate budget of the
+        token, one request per second by default, and the concurrency
+        cap of the pool of the client. The budget is shared by all the
+        threads of the client, so the concurrent requests overlap their
+        latency without raising the rate."""
+        self.budget.acquire()
+        with self.semaphore or nullcontext():
+            return self.session.request(method, url, **kwargs)
 
     def get_all(self, resource, spec_id: int = False, **kwargs):
         all_registers = []
@@ -50,8 +83,7 @@ class FouryouseeAPI(object):
                 "Secret-Token": self.token,
                 "Content-Type": "application/json",
             }
-            time.sleep(1)
-            response = requests.request(
+            response = self.request(
                 "GET", url, headers=headers, params=kwargs
             )
             if not response.ok:
@@ -1230,6 +1262,758 @@ class FouryouseeAPI(object):
             self.reports = self.get_all("reports")
         return self.reports
 
+    def get_graph(self, refresh: bool = False) -> DependencyGraph:
+        """
+        Get the index of relations between medias, playlists and players
+        of the 4YouSee account. It's built from the `medias`, `playlists`
+        and `players` attributes, consulting the API only for the
+        resources that haven't been consulted yet.
+
+        :param refresh: True to consult again all the resources.
+        :type refresh: bool, optional
+        :return: Index of dependencies of the account.
+        :rtype: DependencyGraph
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        Which players show the media 55?
+
+        >>> my.get_graph().players_of_media(55)
+        {1, 2}
+
+        Which playlists have the media 55, directly or through a sub-playlist?
+
+        >>> my.graph.playlists_of_media(55)
+        {38, 39, 67}
+
+        """
+        if self.graph and not refresh:
+            return self.graph
+        if refresh or self.medias is None:
+            self.get_medias()
+        if refresh or self.playlists is None:
+            self.get_playlists()
+        if refresh or self.players is None:
+            self.get_players()
+        self.graph = DependencyGraph(self.medias, self.playlists, self.players)
+        return self.graph
+
+    def get_category_tree(self, refresh: bool = False) -> CategoryTree:
+        """
+        Get the index of the tree of media categories of the 4YouSee
+        account, with the medias of every subtree. It's built from the
+        `media_category` and `medias` attributes, consulting the API only
+        for the resources that haven't been consulted yet.
+
+        :param refresh: True to consult again the categories and medias.
+        :type refresh: bool, optional
+        :return: Index of the categories of the account.
+        :rtype: CategoryTree
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        All the medias under the category 1, including its descendants
+
+        >>> my.get_category_tree().medias_under(1)
+        [1, 4, 125]
+
+        Getting the empty media categories, considering their descendants
+
+        >>> my.category_tree.empty_subtrees()
+        [9, 10, 14, 17, 18, 19, 20]
+
+        """
+        if self.category_tree and not refresh:
+            return self.category_tree
+        if refresh or self.media_category is None:
+            self.get_media_category()
+        if refresh or self.medias is None:
+            self.get_medias()
+        self.category_tree = CategoryTree(self.media_category, self.medias)
+        return self.category_tree
+
+    def get_search_index(self, refresh: bool = False) -> MediaSearchIndex:
+        """
+        Get the search index of the media library of the 4YouSee account.
+        It's built from the `medias` attribute, consulting the API only if
+        the medias haven't been consulted yet, and it's kept up to date
+        by `add_media`, `edit_media` and `delete_media`.
+
+        :param refresh: True to consult again the medias.
+        :type refresh: bool, optional
+        :return: Search index of the medias of the account.
+        :rtype: MediaSearchIndex
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> index = my.get_search_index()
+        >>> [m['name'] for m in index.search('sams', limit=5)]
+        ['samsung_A80', 'audifonos_samsung']
+
+        """
+        if self.search_index and not refresh:
+            return self.search_index
+        if refresh or self.medias is None:
+            self.get_medias()
+        self.search_index = MediaSearchIndex(self.medias)
+        return self.search_index
+
+    def search_medias(self, text: str = None, **kwargs) -> List[dict]:
+        """
+        Search medias in the local index of the library, without
+        consulting the API on every search.
+
+        :param text: Words to look for, as the beginning of the words
+                of the name or the description.
+        :type text: str, optional
+        :param substring: True to look for the text in any part of the
+                name or the description, like `get_medias(name=...)`.
+        :type substring: bool, optional
+        :param category: Id of a media category.
+        :type category: int, optional
+        :param file_type: Extension of the file, like "mp4" or "zip".
+        :type file_type: str, optional
+        :param min_duration: Minimum duration in seconds.
+        :type min_duration: int, optional
+        :param max_duration: Maximum duration in seconds.
+        :type max_duration: int, optional
+        :param limit: Maximum number of medias to return.
+        :type limit: int, optional
+        :return: List of dicts where every dict depicts a media.
+        :rtype: list
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> my.search_medias('4you pl')
+        [
+           {
+              "id":1,
+              "name":"4YouSee Play",
+              "description":"4YouSee Play",
+              "file":"i_1.mp4",
+              "durationInSeconds":10,
+              ...
+           }
+        ]
+        >>> my.search_medias(category=1, file_type='gif')
+
+        """
+        return self.get_search_index().search(text, **kwargs)
+
+    def get_impact(self, media: int = None, playlist: int = None) -> dict:
+        """
+        Get the playlists and players that reference a media or a
+        playlist, before deleting it. It's consulted on the cached index
+        of dependencies (see `get_graph`), so there is no request per
+        playlist or player.
+
+        :param media: Id of the media.
+        :type media: int, optional
+        :param playlist: Id of the playlist.
+        :type playlist: int, optional
+        :return: Dict with the referencing playlists and players.
+        :rtype: dict
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> my.get_impact(media=55)
+        {'playlists': [38, 39], 'nestedPlaylists': [67], 'players': [1, 2]}
+        >>> my.get_impact(playlist=38)
+        {'playlists': [], 'slots': [(1, '0'), (1, '1'), (2, 'audio')], 'players': [1, 2]}
+
+        **Advanced Usage**
+
+        - Deleting all the zip files of the account that aren't used
+
+        >>> my.get_medias()
+        >>> for media in my.medias:
+        ...    if media['file'].endswith('zip') and not my.get_impact(media=media['id'])['playlists']:
+        ...        my.delete_media(media['id'])
+
+        """
+        if media is None and playlist is None:
+            raise Exception("Missing id of the media or the playlist.")
+        graph = self.get_graph()
+        if media is not None:
+            return graph.impact_of_media(int(media))
+        return graph.impact_of_playlist(int(playlist))
+
+    def sweep_expired(self, moment: datetime = None, delete_medias: bool = False,
+                      clean_playlists: bool = False, workers: int = 4) -> dict:
+        """
+        Find the medias after their `endDate`, the medias that can never
+        be active and the playlists where all the items are expired. The
+        schedules are evaluated locally over the `medias` and `playlists`
+        attributes, consulting the API only for the resources that haven't
+        been consulted yet.
+
+        :param moment: Moment of reference, default value is the current time.
+        :type moment: datetime, optional
+        :param delete_medias: True to delete the expired medias that no
+                playlist references, after cleaning the playlists.
+        :type delete_medias: bool, optional
+        :param clean_playlists: True to remove the expired items of the
+                playlists that still have active items.
+        :type clean_playlists: bool, optional
+        :param workers: Number of requests executed at the same time.
+        :type workers: int, optional
+        :return: Dict with the ids found and, when some action is executed,
+                the `errors` by id.
+        :rtype: dict
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> my.sweep_expired()
+        {
+           'expiredMedias': [1, 99],
+           'neverActiveMedias': [120],
+           'expiredPlaylists': [75],
+           'expiredItems': {38: [2], 75: [0, 1]}
+        }
+
+        Removing the expired items of the playlists and then deleting the
+        expired medias
+
+        >>> my.sweep_expired(clean_playlists=True, delete_medias=True)
+        {
+           'expiredMedias': [1, 99],
+           'neverActiveMedias': [120],
+           'expiredPlaylists': [75],
+           'expiredItems': {38: [2], 75: [0, 1]},
+           'editedPlaylists': [38],
+           'deletedMedias': [1],
+           'keptMedias': [99],
+           'errors': {}
+        }
+
+        .. note:: The playlists where all the items are expired aren't edited,
+                since a playlist can't be empty, so their medias are kept.
+
+        """
+        if self.medias is None:
+            self.get_medias()
+        if self.playlists is None:
+            self.get_playlists()
+        result = find_expired(self.medias, self.playlists, moment)
+        if not (delete_medias or clean_playlists):
+            return result
+
+        result["errors"] = {}
+        if clean_playlists:
+            playlists = {p["id"]: p for p in self.playlists}
+            tasks = {}
+            for playlist_id, indexes in result["expiredItems"].items():
+                if playlist_id in result["expiredPlaylists"]:
+                    continue
+                items, sequence = remove_items(playlists[playlist_id], indexes)
+                payload = dict(brief_playlist(playlists[playlist_id]), items=items, sequence=sequence)
+                if len(payload["name"]) > 40:
+                    payload["name"] = payload["name"][:36] + "..."
+                tasks[playlist_id] = (
+                    lambda i=playlist_id, p=json.dumps(payload, indent=2):
+                    self.edit("playlists/{}".format(i), payload=p)
+                )
+            edited = run_concurrently(tasks, workers)
+            result["editedPlaylists"] = sorted(edited["done"])
+            result["errors"].update(edited["errors"])
+            self.playlists = [edited["done"].get(p["id"], p) for p in self.playlists]
+            self.graph = None
+
+        if delete_medias:
+            referenced = {
+                media_id
+                for playlist in self.playlists
+                for item in playlist.get("items") or []
+                for media_id in item_media_ids(item)
+            }
+            deleted = run_concurrently({
+                media_id: lambda i=media_id: self.delete("medias/{}".format(i))
+                for media_id in result["expiredMedias"] if media_id not in referenced
+            }, workers)
+            result["deletedMedias"] = sorted(deleted["done"])
+            result["keptMedias"] = [i for i in result["expiredMedias"] if i in referenced]
+            result["errors"].update(deleted["errors"])
+            self.medias = [m for m in self.medias if m["id"] not in deleted["done"]]
+            if self.graph:
+                for media_id in deleted["done"]:
+                    self.graph.discard_media(media_id)
+        return result
+
+    def replace_media_in_playlists(self, old_id: int, new_id: int, dry_run: bool = False,
+                                   workers: int = 4) -> dict:
+        """
+        Replace a media with another one in all the playlists that contain
+        it, including the cells of the videowalls. The playlists affected
+        are found in the cached index of dependencies, the new `items` and
+        `sequence` are computed locally from the `playlists` attribute and
+        only the playlists that change are edited, concurrently.
+
+        :param old_id: Id of the media to be replaced.
+        :type old_id: int, required
+        :param new_id: Id of the media that takes its place.
+        :type new_id: int, required
+        :param dry_run: True to return the changes without editing the playlists.
+        :type dry_run: bool, optional
+        :param workers: Number of requests executed at the same time.
+        :type workers: int, optional
+        :return: Dict with the ids of the playlists edited, the ones that
+                only reach the media through a carousel (a media category)
+                and the `errors` by id. With `dry_run` the new `items` and
+                `sequence` of every playlist are returned in `changes`.
+        :rtype: dict
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> my.replace_media_in_playlists(55, 117)
+        {
+           'editedPlaylists': [38, 41],
+           'skippedPlaylists': [],
+           'errors': {}
+        }
+
+        Checking the changes before editing the playlists
+
+        >>> my.replace_media_in_playlists(55, 117, dry_run=True)
+        {
+           'changes': {
+              38: {'items': [{'type': 'news', ...},
+                             {'type': 'media', 'id': 117},
+                             {'type': 'media', 'id': 31, 'name': 'Gopro', ...}],
+                   'sequence': [0, 1, 2, 0]},
+              41: {'items': [{'type': 'media', 'id': 117}], 'sequence': [0]}
+           },
+           'skippedPlaylists': []
+        }
+
+        .. note:: A carousel plays the medias of a category, so the
+                playlists that only have the media inside a carousel are
+                skipped. Use `edit_media` to change its categories instead.
+
+        """
+        if old_id == new_id:
+            raise Exception("The new media must be different from the old one.")
+        graph = self.get_graph()
+        if new_id not in graph.medias:
+            raise Exception(f"Media with ID {new_id} was not found")
+
+        changes, skipped = {}, []
+        for playlist_id in sorted(graph.playlists_of_media(old_id, nested=False)):
+            playlist = graph.playlists[playlist_id]
+            items, sequence = replace_media(playlist, old_id, new_id)
+            if items == playlist["items"] and sequence == playlist["sequence"]:
+                skipped.append(playlist_id)
+            else:
+                changes[playlist_id] = dict(items=items, sequence=sequence)
+        if dry_run:
+            return dict(changes=changes, skippedPlaylists=skipped)
+
+        tasks = {}
+        for playlist_id, change in changes.items():
+            payload = dict(brief_playlist(graph.playlists[playlist_id]), **change)
+            if len(payload["name"]) > 40:
+                payload["name"] = payload["name"][:36] + "..."
+            tasks[playlist_id] = (
+                lambda i=playlist_id, p=json.dumps(payload, indent=2):
+                self.edit("playlists/{}".format(i), payload=p)
+            )
+        edited = run_concurrently(tasks, workers)
+        if edited["done"]:
+            self.playlists = [edited["done"].get(p["id"], p) for p in self.playlists]
+            self.graph = None
+        return dict(
+            editedPlaylists=sorted(edited["done"]),
+            skippedPlaylists=skipped,
+            errors=edited["errors"],
+        )
+
+    def get_group_index(self, refresh: bool = False) -> GroupIndex:
+        """
+        Get the index of the players of the 4YouSee account by group.
+        It's built from the `players` attribute, consulting the API only
+        if the players haven't been consulted yet.
+
+        :param refresh: True to consult again the players.
+        :type refresh: bool, optional
+        :return: Index of the groups of players.
+        :rtype: GroupIndex
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> my.get_group_index().players_of(2)
+        [2, 3]
+
+        """
+        if self.group_index and not refresh:
+            return self.group_index
+        if refresh or self.players is None:
+            self.get_players()
+        self.group_index = GroupIndex(self.players)
+        return self.group_index
+
+    def get_group_statuses(self, group: int, refresh: bool = False) -> List[dict]:
+        """
+        Get the status and the last contact of the players of a group.
+
+        :param group: Id of a group of players.
+        :type group: int, required
+        :param refresh: True to consult again the players.
+        :type refresh: bool, optional
+        :return: List of dicts, one per player of the group.
+        :rtype: list
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> my.get_group_statuses(2, refresh=True)
+        [
+           {'id': 2, 'name': 'Sample name via API', 'status': 'Online', 'lastContactInMinutes': 1},
+           {'id': 3, 'name': 'Store 3', 'status': 'Local assist needed', 'lastContactInMinutes': 9000}
+        ]
+
+        """
+        return self.get_group_index(refresh).statuses(group)
+
+    def edit_players(self, changes: dict, workers: int = 4) -> dict:
+        """
+        Update many players at once. The payload of every player is
+        computed from the `players` attribute, so only one request per
+        player is sent, concurrently.
+
+        :param changes: Dict where every key is the id of a player and
+                every value a dict with the params of `edit_player`.
+        :type changes: dict, required
+        :param workers: Number of requests executed at the same time.
+        :type workers: int, optional
+        :return: Dict with the ids of the players edited and the
+                `errors` by id.
+        :rtype: dict
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> my.edit_players({2: {'name': 'Lobby'}, 3: {'platform': 'ANDROID'}})
+        {'editedPlayers': [2, 3], 'errors': {}}
+
+        """
+        if self.players is None:
+            self.get_players()
+        players = {p["id"]: p for p in self.players}
+
+        tasks, errors = {}, {}
+        for player_id, change in changes.items():
+            if player_id not in players:
+                errors[player_id] = f"Player with ID {player_id} was not found"
+                continue
+            validate_kwargs_player(**change)
+            payload = dict(brief_player(players[player_id]), **change)
+            if len(payload["name"]) > 50:
+                payload["name"] = payload["name"][:46] + "..."
+            tasks[player_id] = (
+                lambda i=player_id, p=json.dumps(payload, indent=2):
+                self.edit("players/{}".format(i), payload=p)
+            )
+        edited = run_concurrently(tasks, workers)
+        errors.update(edited["errors"])
+        if edited["done"]:
+            self.players = [edited["done"].get(p["id"], p) for p in self.players]
+            if self.group_index:
+                for player in edited["done"].values():
+                    self.group_index.add(player)
+            self.graph = None
+        return dict(editedPlayers=sorted(edited["done"]), errors=errors)
+
+    def assign_group_playlist(self, group: int, playlist: int, days: List[int] = None,
+                              workers: int = 4) -> dict:
+        """
+        Assign a playlist to all the players of a group.
+
+        :param group: Id of a group of players.
+        :type group: int, required
+        :param playlist: Id of the playlist.
+        :type playlist: int, required
+        :param days: Days of the week (starting from 0) where the playlist
+                is assigned, default value is all of them.
+        :type days: list, optional
+        :param workers: Number of requests executed at the same time.
+        :type workers: int, optional
+        :return: Dict with the ids of the players edited and the
+                `errors` by id.
+        :rtype: dict
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        Assigning the playlist 40 from Monday to Friday
+
+        >>> my.assign_group_playlist(2, 40, days=[1, 2, 3, 4, 5])
+        {'editedPlayers': [2, 3], 'errors': {}}
+
+        """
+        days = [str(day) for day in (range(7) if days is None else days)]
+        changes = {}
+        for player_id in self.get_group_index().players_of(group):
+            playlists = brief_player(self.group_index.players[player_id])["playlists"]
+            changes[player_id] = dict(playlists=dict(playlists, **{day: playlist for day in days}))
+        return self.edit_players(changes, workers)
+
+    def move_players(self, player_ids: List[int], group: int, workers: int = 4) -> dict:
+        """
+        Move players to another group.
+
+        :param player_ids: Ids of the players.
+        :type player_ids: list, required
+        :param group: Id of the group of destination.
+        :type group: int, required
+        :param workers: Number of requests executed at the same time.
+        :type workers: int, optional
+        :return: Dict with the ids of the players edited and the
+                `errors` by id.
+        :rtype: dict
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        Moving all the players of the group 2 to the group 5
+
+        >>> my.move_players(my.get_group_index().players_of(2), 5)
+        {'editedPlayers': [2, 3], 'errors': {}}
+
+        """
+        return self.edit_players({player_id: dict(group=group) for player_id in player_ids}, workers)
+
+    def assign_audio(self, audio: int or None, group: int = None, platform: str = None,
+                     current_audio: int = None, player_ids: List[int] = None,
+                     refresh: bool = False, workers: int = 4) -> dict:
+        """
+        Assign an audio playlist to the players that match all the filters
+        received. The players are selected from one listing, the ones that
+        already have the audio are skipped and the rest are edited
+        concurrently, see `edit_players`.
+
+        :param audio: Id of the audio playlist, None to remove the audio.
+        :type audio: int, required
+        :param group: Id of a group of players.
+        :type group: int, optional
+        :param platform: Platform of the players. **Ex**. **SAMSUNG**
+        :type platform: str, optional
+        :param current_audio: Id of the audio playlist the players have
+                now, 0 for the players without audio.
+        :type current_audio: int, optional
+        :param player_ids: Ids of the players.
+        :type player_ids: list, optional
+        :param refresh: True to consult again the players.
+        :type refresh: bool, optional
+        :param workers: Number of requests executed at the same time.
+        :type workers: int, optional
+        :return: Dict with the ids of the players edited, the ones
+                skipped because they already have the audio and the
+                `errors` by id.
+        :rtype: dict
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        Replacing the summer audio by the christmas one in the Samsung players of the group 2
+
+        >>> my.assign_audio(61, group=2, platform='SAMSUNG', current_audio=8)
+        {'editedPlayers': [2, 14, 15], 'skippedPlayers': [], 'errors': {}}
+
+        Removing the audio of all the players
+
+        >>> my.assign_audio(None)
+
+        """
+        if refresh or self.players is None:
+            self.get_players()
+        changes, skipped = {}, []
+        for player in self.players:
+            current = brief_player(player)["audios"].get("0") or 0
+            if (group is not None and (player.get("group") or {}).get("id") != group) \
+                    or (platform is not None and player.get("platform") != platform) \
+                    or (current_audio is not None and current != current_audio) \
+                    or (player_ids is not None and player["id"] not in player_ids):
+                continue
+            if current == (audio or 0):
+                skipped.append(player["id"])
+            else:
+                changes[player["id"]] = dict(audios={"0": audio} if audio else {})
+        result = self.edit_players(changes, workers)
+        result["skippedPlayers"] = sorted(skipped)
+        return result
+
+    def get_inventory(self, refresh: bool = False) -> PlayerInventory:
+        """
+        Get the inventory of the players by platform, status, group and
+        playlist. It's built from the `players` attribute, consulting the
+        API only if the players haven't been consulted yet.
+
+        :param refresh: True to consult again the players.
+        :type refresh: bool, optional
+        :return: Inventory of the players.
+        :rtype: PlayerInventory
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> my.get_inventory().crosstab('platform', 'group')
+        {('ANDROID', 'Default'): 1, ('SAMSUNG', 'Clientes Barrio Sur'): 1, ('LG', 'Clientes Barrio Sur'): 1}
+        >>> my.get_inventory().export('inventory.json', 'platform', 'status')
+
+        """
+        if refresh or self.players is None:
+            self.get_players()
+        return PlayerInventory(self.players)
+
+    def get_slot_matrix(self, refresh: bool = False) -> SlotMatrix:
+        """
+        Get the matrix of the playlists assigned to every day of the week
+        of every player. It's built from the `players` attribute,
+        consulting the API only if the players haven't been consulted yet.
+
+        :param refresh: True to consult again the players.
+        :type refresh: bool, optional
+        :return: Matrix of players by day of the week.
+        :rtype: SlotMatrix
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> my.get_slot_matrix().players_of(38, day=6)
+        [1, 2]
+
+        Comparing the slots with the ones of an hour ago
+
+        >>> before = my.get_slot_matrix()
+        >>> my.get_slot_matrix(refresh=True).diff(before)
+        [{'player': 2, 'day': 6, 'before': 38, 'after': 41}]
+
+        """
+        if refresh or self.players is None:
+            self.get_players()
+        return SlotMatrix(self.players)
+
+    def apply_slot_matrix(self, matrix: SlotMatrix, workers: int = 4) -> dict:
+        """
+        Edit the players whose slots in the matrix received are different
+        from the `players` attribute. Only the players changed are edited,
+        concurrently, see `edit_players`.
+
+        :param matrix: Matrix with the slots planned.
+        :type matrix: SlotMatrix, required
+        :param workers: Number of requests executed at the same time.
+        :type workers: int, optional
+        :return: Dict with the ids of the players edited and the
+                `errors` by id.
+        :rtype: dict
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> planned = my.get_slot_matrix().copy()
+        >>> planned.assign([1, 2], 41, days=[6])
+        >>> my.apply_slot_matrix(planned)
+        {'editedPlayers': [1, 2], 'errors': {}}
+
+        """
+        return self.edit_players(matrix.changed_players(self.get_slot_matrix()), workers)
+
+    def collect_uploads(self, delete: bool = False, keep: List[str] = None,
+                        refresh: bool = False, workers: int = 4) -> dict:
+        """
+        Find the uploads that aren't used by any media, like the ones left
+        by a failed `add_media`, and optionally delete them. The uploads
+        and the medias are compared locally from the `uploads` and
+        `medias` attributes, consulting the API only for the resources
+        that haven't been consulted yet.
+
+        An upload is considered in use when a media references its id,
+        when it was used by `add_media` or `edit_media` of this object,
+        or when its file name is the name of a media, since `add_media`
+        names the medias after their files by default.
+
+        :param delete: True to delete the uploads not used, concurrently.
+        :type delete: bool, optional
+        :param keep: Ids of uploads that must not be deleted.
+        :type keep: list, optional
+        :param refresh: True to consult again the uploads and the medias.
+        :type refresh: bool, optional
+        :param workers: Number of requests executed at the same time.
+        :type workers: int, optional
+        :return: Dict with the uploads not used and, when they are
+                deleted, the ids deleted and the `errors` by id.
+        :rtype: dict
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> my.collect_uploads()
+        {
+           'unusedUploads': [{'id': 'caf52322a13608e78751573ef1f94bc6', 'filename': 'sample-png-file.png'}],
+           'usedUploads': 1
+        }
+        >>> my.collect_uploads(delete=True)
+        {
+           'unusedUploads': [{'id': 'caf52322a13608e78751573ef1f94bc6', 'filename': 'sample-png-file.png'}],
+           'usedUploads': 1,
+           'deletedUploads': ['caf52322a13608e78751573ef1f94bc6'],
+           'errors': {}
+        }
+
+        """
+        if refresh or self.uploads is None:
+            self.get_uploads()
+        if refresh or self.medias is None:
+            self.get_medias()
+
+        used = set(self.used_uploads) | set(keep or [])
+        names = set()
+        for media in self.medias:
+            if isinstance(media.get("file"), dict):
+                used.add(media["file"].get("id"))
+            names.add(" ".join(str(media.get("name") or "").split()).casefold())
+        unused = [
+            upload for upload in self.uploads
+            if upload["id"] not in used
+            and " ".join(Path(upload.get("filename") or "").stem.split()).casefold() not in names
+        ]
+        result = dict(unusedUploads=unused, usedUploads=len(self.uploads) - len(unused))
+        if not delete:
+            return result
+
+        deleted = run_concurrently({
+            upload["id"]: lambda i=upload["id"]: self.delete("uploads/{}".format(i))
+            for upload in unused
+        }, workers)
+        result["deletedUploads"] = sorted(deleted["done"])
+        result["errors"] = deleted["errors"]
+        self.uploads = [u for u in self.uploads if u["id"] not in deleted["done"]]
+        return result
+
     def post(
         self,
         resource: str,
@@ -1241,9 +2025,8 @@ class FouryouseeAPI(object):
             base_url=FouryouseeAPI.url, resource=resource
         )
         headers = {"Content-Type": header_type, "Secret-Token": self.token}
-        time.sleep(1)
-        response = requests.post(
-            url, headers=headers, data=payload, files=files
+        response = self.request(
+            "POST", url, headers=headers, data=payload, files=files
         )
         if not response.ok:
             raise Exception(response.text)
@@ -1397,7 +2180,11 @@ class FouryouseeAPI(object):
         if file_uploaded:
             kwargs["file"] = file_uploaded[0]
             payload = json.dumps(kwargs, indent=2)
-            return self.post(resource="medias", payload=payload)
+            media = self.post(resource="medias", payload=payload)
+            self.used_uploads.add(file_uploaded[0].get("id"))
+            if self.search_index and media:
+                self.search_index.add(media)
+            return media
 
     def add_media_category(self, **kwargs) -> dict:
         """
@@ -1581,6 +2368,83 @@ class FouryouseeAPI(object):
         payload = json.dumps(kwargs, indent=2)
         return self.post("players/", payload=payload)
 
+    def add_players(self, players: List[dict], refresh: bool = False, workers: int = 4) -> dict:
+        """
+        Create many players at once. All the players are validated before
+        any request, the ones whose name already exists in the account
+        are skipped and the rest are created concurrently. The names are
+        compared without considering case and repeated spaces, after the
+        same truncation of `add_player`, so running it again with the same
+        list only creates the players that failed.
+
+        :param players: List of dicts with the params of `add_player`.
+        :type players: list, required
+        :param refresh: True to consult again the players of the account
+                before comparing the names.
+        :type refresh: bool, optional
+        :param workers: Number of requests executed at the same time.
+        :type workers: int, optional
+        :return: Dict with the ids of the players `created` and the ones
+                `existing` before, and the `errors`, all by name. The names
+                repeated in the list are in `duplicates`, with the name
+                that was kept.
+        :rtype: dict
+
+        **Usage**
+
+        Once "**my**" object has been created. You can execute the next:
+
+        >>> stores = [dict(name=f'Store {n}', platform='ANDROID', group=5,
+        ...                playlists={str(day): 38 for day in range(7)})
+        ...           for n in range(1, 201)]
+        >>> my.add_players(stores)
+        {'created': {'Store 1': 120, ..., 'Store 200': 319}, 'existing': {},
+         'errors': {'Store 7': '...'}, 'duplicates': {}}
+        >>> my.add_players(stores)
+        {'created': {'Store 7': 320}, 'existing': {'Store 1': 120, ..., 'Store 200': 319},
+         'errors': {}, 'duplicates': {}}
+
+        """
+        payloads = []
+        for index, player in enumerate(players):
+            if not player.get("name") or not player.get("platform") or not player.get("playlists"):
+                raise Exception(f"Player {index}: Missing name, platform or playlists field")
+            try:
+                validate_kwargs_player(**player)
+            except Exception as e:
+                raise Exception(f"Player {index}: {e}")
+            payloads.append(dict(player, name=player_name(player["name"]), group=player.get("group", 1)))
+
+        if refresh or self.players is None:
+            self.get_players()
+        existing = {player_key(p["name"]): p for p in self.players}
+
+        names = {}
+        for payload in payloads:
+            names.setdefault(player_key(payload["name"]), payload["name"])
+        result, tasks = dict(created={}, existing={}, errors={}, duplicates={}), {}
+        for payload in payloads:
+            key = player_key(payload["name"])
+            if key in existing:
+                result["existing"][payload["name"]] = existing[key]["id"]
+            elif key not in tasks:
+                tasks[key] = (
+                    lambda p=json.dumps(payload, indent=2): self.post("players/", payload=p)
+                )
+            else:
+                result["duplicates"][payload["name"]] = names[key]
+        created = run_concurrently(tasks, workers)
+        for key, player in created["done"].items():
+            result["created"][names[key]] = player["id"]
+            self.players.append(player)
+            if self.group_index:
+                self.group_index.add(player)
+        for key, error in created["errors"].items():
+            result["errors"][names[key]] = error
+        if created["done"]:
+            self.graph = None
+        return result
+
     def add_playlist(self, **kwargs) -> dict:
         """
         Create a new playlist in the 4yousee account.
@@ -1749,9 +2613,20 @@ class FouryouseeAPI(object):
 
         .. note:: The previous playlist has 4 elements inside it.
 
+        The shape of the videowalls is validated locally before the
+        request. When the medias were consulted before, the ids of the
+        cells are checked too
+
+        >>> my.get_medias()
+        >>> my.add_playlist(name='Wall', items=[{'type': 'videowall', 'grid': [[{'id': 4}, {'id': 999}]]}],
+        ...                 sequence=[0])
+        Exception: Item 0: Invalid videowall: Cell (0, 1) references the media 999, that was not found
+
         """
         # Validators
         validate_kwargs_playlist(**kwargs)
+        if kwargs.get("items"):
+            kwargs["items"] = VideowallCompiler(self.medias).compile_items(kwargs["items"])
 
         if len(kwargs.get("name")) > 50:
             kwargs["name"] = kwargs["name"][:46] + "..."
@@ -1836,8 +2711,7 @@ class FouryouseeAPI(object):
             "Content-Type": "application/json",
             "Secret-Token": self.token,
         }
-        time.sleep(1)
-        response = requests.delete(url, headers=headers)
+        response = self.request("DELETE", url, headers=headers)
         if not response.ok:
             raise Exception(response.text)
         else:
@@ -1874,12 +2748,16 @@ class FouryouseeAPI(object):
         except Exception:
             raise Exception(f"Upload with ID {spec_id} was not found")
 
-    def delete_media(self, spec_id: int):
+    def delete_media(self, spec_id: int, check_impact: bool = False):
         """
         Delete one media of the 4YouSee account.
 
         :param spec_id: Id of a single media.
         :type spec_id: int, required
+        :param check_impact: True to avoid deleting a media that is part
+                of a playlist. The impact is consulted on the cached
+                index of dependencies, see `get_impact`.
+        :type check_impact: bool, optional
         :return: True in case the media was deleted successfully
                 or False in case the media was not deleted.
         :rtype: bool
@@ -1892,6 +2770,8 @@ class FouryouseeAPI(object):
         True
         >>> my.delete_media(123_456)  # If doesn't exists
         False
+        >>> my.delete_media(55, check_impact=True)
+        Exception: Media with ID 55 is used by playlists [38, 39] and players [1, 2]
 
 
         **Advanced Usage**
@@ -1906,11 +2786,27 @@ class FouryouseeAPI(object):
         if not spec_id:
             raise Exception("Missing id of the media.")
 
+        if check_impact:
+            impact = self.get_impact(media=spec_id)
+            if impact["playlists"] or impact["players"]:
+                raise Exception(
+                    f"Media with ID {spec_id} is used by playlists "
+                    f"{impact['playlists']} and players {impact['players']}"
+                )
+
+        deleted = False
         try:
             if self.get_medias(id=spec_id):
-                return self.delete("medias/{}".format(spec_id))
+                deleted = self.delete("medias/{}".format(spec_id))
         except Exception:
             raise Exception(f"Media with ID {spec_id} was not found")
+        if deleted and self.medias is not None:
+            self.medias = [m for m in self.medias if m["id"] != spec_id]
+        if deleted and self.graph:
+            self.graph.discard_media(spec_id)
+        if deleted and self.search_index:
+            self.search_index.remove(spec_id)
+        return deleted
 
     def delete_player(self, spec_id: int):
         """
@@ -1945,12 +2841,17 @@ class FouryouseeAPI(object):
         except Exception:
             raise Exception(f"Player with ID {spec_id} was not found")
 
-    def delete_playlist(self, spec_id: int):
+    def delete_playlist(self, spec_id: int, check_impact: bool = False):
         """
         Delete one playlist of the 4YouSee account.
 
         :param spec_id: Id of a single playlist.
         :type spec_id: int, required
+        :param check_impact: True to avoid deleting a playlist that is
+                assigned to a player or is part of another playlist. The
+                impact is consulted on the cached index of dependencies,
+                see `get_impact`.
+        :type check_impact: bool, optional
         :return: True in case the playlist was deleted successfully
                 or False in case the playlist was not deleted.
         :rtype: bool
@@ -1963,6 +2864,8 @@ class FouryouseeAPI(object):
         True
         >>> my.delete_playlist(123_456) # If doesn't exists
         False
+        >>> my.delete_playlist(38, check_impact=True)
+        Exception: Playlist with ID 38 is used by playlists [] and players [1, 2]
 
 
         **Advanced Usage**
@@ -1972,11 +2875,25 @@ class FouryouseeAPI(object):
         if not spec_id:
             raise Exception("Missing id of the player.")
 
+        if check_impact:
+            impact = self.get_impact(playlist=spec_id)
+            if impact["playlists"] or impact["players"]:
+                raise Exception(
+                    f"Playlist with ID {spec_id} is used by playlists "
+                    f"{impact['playlists']} and players {impact['players']}"
+                )
+
+        deleted = False
         try:
             if self.get_playlists(id=spec_id):
-                return self.delete("playlists/{}".format(spec_id))
+                deleted = self.delete("playlists/{}".format(spec_id))
         except Exception:
             raise Exception(f"Playlist with ID {spec_id} was not found")
+        if deleted and self.playlists is not None:
+            self.playlists = [p for p in self.playlists if p["id"] != spec_id]
+        if deleted and self.graph:
+            self.graph.discard_playlist(spec_id)
+        return deleted
 
     def edit(self, resource: str, payload=None):
         url = "{base_url}{resource}".format(
@@ -1986,8 +2903,7 @@ class FouryouseeAPI(object):
             "Content-Type": "application/json",
             "Secret-Token": self.token,
         }
-        time.sleep(1)
-        response = requests.put(url, headers=headers, data=payload)
+        response = self.request("PUT", url, headers=headers, data=payload)
         if not response.ok:
             raise Exception(response.text)
         return json.loads(response.text)
@@ -2120,7 +3036,12 @@ class FouryouseeAPI(object):
 
         del kwargs["id"]
         payload = json.dumps(kwargs, indent=2)
-        return self.edit("medias/{}/".format(spec_id), payload=payload)
+        media = self.edit("medias/{}/".format(spec_id), payload=payload)
+        if isinstance(kwargs.get("file"), dict):
+            self.used_uploads.add(kwargs["file"].get("id"))
+        if self.search_index:
+            self.search_index.update(dict(media, id=spec_id))
+        return media
 
     def edit_category(self, **kwargs):
         """
@@ -2629,6 +3550,19 @@ def filter_id(input_id: str or int, iterable: list) -> list:
     return list(filter(lambda i: i["id"] == input_id, iterable))
 
 
+def player_name(name: str) -> str:
+    """Return the name of a player as it's saved by `add_player`"""
+    if len(name) > 50:
+        return name[:46] + "..."
+    return name
+
+
+def player_key(name: str) -> str:
+    """Return the name of a player to compare it with others, without
+    considering case and repeated spaces"""
+    return " ".join(player_name(name).split()).casefold()
+
+
 def brief_player(player: dict) -> dict:
     """Receive a player object an return the information required
     to the payload"""
@@ -2638,7 +3572,8 @@ def brief_player(player: dict) -> dict:
         group=player["group"]["id"],
         platform=player["platform"],
         playlists={
-            str(k): v["id"] for k, v in enumerate(player["playlists"].values())
+            str(k): v["id"] if v else None
+            for k, v in enumerate(player["playlists"].values())
         },
         audios={}
         if not player["audios"]["0"]
@@ -2669,6 +3604,73 @@ def brief_media(media: dict) -> dict:
     )
 
 
+def run_concurrently(tasks: dict, workers: int = 4) -> dict:
+    """Execute the callables of a dict concurrently and return a dict
+    with the results and the errors, both by the key of every task"""
+    done, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {key: executor.submit(task) for key, task in tasks.items()}
+        for key, future in futures.items():
+            try:
+                done[key] = future.result()
+            except Exception as e:
+                errors[key] = str(e)
+    return dict(done=done, errors=errors)
+
+
+def remove_items(playlist: dict, indexes: list) -> tuple:
+    """Return the items and the sequence of a playlist without the
+    items of the indexes received. The other items are kept as they
+    are, with their contentSchedule."""
+    removed = set(indexes)
+    items, positions = [], {}
+    for index, item in enumerate(playlist["items"]):
+        if index not in removed:
+            positions[index] = len(items)
+            items.append(item)
+    sequence = [positions[i] for i in playlist["sequence"] if i in positions]
+    return items, sequence
+
+
+def media_reference(item: dict, media_id: int) -> dict:
+    """Return an item or a videowall cell pointing to another media. The
+    fields that describe the previous media are dropped, its
+    contentSchedule is kept."""
+    reference = {"type": item.get("type", "media"), "id": media_id}
+    if item.get("contentSchedule"):
+        reference["contentSchedule"] = item["contentSchedule"]
+    return reference
+
+
+def replace_media(playlist: dict, old_id: int, new_id: int) -> tuple:
+    """Return the items and the sequence of a playlist with the media
+    `old_id` replaced by `new_id`. When the new media already is an item
+    of the playlist, the sequence points to that item. Only the items
+    and the cells of the old media change, the rest are kept as they are."""
+    existent = next((
+        index for index, item in enumerate(playlist["items"])
+        if item["type"] == "media" and item["id"] == new_id
+    ), None)
+    items, positions, merged = [], {}, []
+    for index, item in enumerate(playlist["items"]):
+        if item["type"] == "media" and item["id"] == old_id:
+            if existent is not None:
+                merged.append(index)
+                continue
+            item = media_reference(item, new_id)
+        elif item["type"] in ["videoWall", "videowall"] and old_id in item_media_ids(item):
+            item = dict(item, grid=[
+                [media_reference(cell, new_id) if cell.get("id") == old_id else cell for cell in row]
+                for row in item.get("grid") or []
+            ])
+        positions[index] = len(items)
+        items.append(item)
+    for index in merged:
+        positions[index] = positions[existent]
+    sequence = [positions[i] for i in playlist["sequence"]]
+    return items, sequence
+
+
 def validate_kwargs_single_media(**kwargs) -> Exception or None:
     """Validate the kwargs sent to the post_single_media function"""
     if not kwargs.get("file"):
@@ -2741,13 +3743,7 @@ def validate_kwargs_player(**kwargs) -> Exception or None:
             raise Exception("Invalid playlists field")
 
     if platform := kwargs.get("platform"):
-        if not isinstance(platform, list) and platform not in [
-            "SAMSUNG",
-            "WINDOWS",
-            "ANDROID",
-            "4YOUSEE_PLAYER",
-            "LG",
-        ]:
+        if not isinstance(platform, list) and platform not in PLATFORMS:
             raise Exception("Invalid platform field")
 
     if audios := kwargs.get("audios"):
@@ -0,0 +1,207 @@
+from collections import defaultdict
+from typing import List
+
+SUBPLAYLIST_TYPES = ["subPlaylist", "playlist"]
+VIDEOWALL_TYPES = ["videoWall", "videowall"]
+AUDIO_SLOT = "audio"
+
+
+def item_media_ids(item: dict) -> List[int]:
+    """Return the ids of the medias referenced by one item of a
+    playlist, considering carousels and the cells of videowalls"""
+    kind = item.get("type", "media")
+    if kind == "media":
+        return [item["id"]] if item.get("id") is not None else []
+    if kind == "carousel":
+        return [i["id"] for i in item.get("items") or [] if i.get("id") is not None]
+    if kind in VIDEOWALL_TYPES:
+        return [
+            media_id
+            for row in item.get("grid") or []
+            for cell in row
+            for media_id in item_media_ids(cell)
+        ]
+    return []
+
+
+def player_slots(player: dict) -> List[tuple]:
+    """Return the (slot, playlist id) pairs of a player, where slot is
+    the weekday ("0".."6") or "audio" for the audio playlist"""
+    slots = [
+        (str(day), playlist["id"])
+        for day, playlist in (player.get("playlists") or {}).items()
+        if playlist
+    ]
+    audio = (player.get("audios") or {}).get("0")
+    if audio:
+        slots.append((AUDIO_SLOT, audio["id"]))
+    return slots
+
+
+class DependencyGraph(object):
+    """
+    In-memory index of the relations between medias, playlists and
+    players, built from one listing of every resource. The reverse
+    indexes (media → playlists → players) are computed once, so the
+    impact queries are dictionary lookups.
+
+    :param medias: Medias as returned by `get_medias()`.
+    :type medias: list, optional
+    :param playlists: Playlists as returned by `get_playlists()`.
+    :type playlists: list, required
+    :param players: Players as returned by `get_players()`.
+    :type players: list, required
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> graph = my.get_graph()
+    >>> graph.players_of_media(55)
+    {1, 2}
+    >>> graph.playlists_of_media(55)
+    {38, 39}
+    >>> graph.playlists_of_media(55, nested=False)
+    {38}
+    >>> graph.players_of_playlist(38)
+    {1}
+
+    """
+
+    def __init__(self, medias: List[dict] = None, playlists: List[dict] = None,
+                 players: List[dict] = None):
+        self.medias = {m["id"]: m for m in medias or []}
+        self.playlists = {p["id"]: p for p in playlists or []}
+        self.players = {p["id"]: p for p in players or []}
+
+        # Direct relations
+        self.playlist_medias = {}
+        self.playlist_children = {}
+        self.media_direct_playlists = defaultdict(set)
+        self.playlist_parents = defaultdict(set)
+        for playlist_id, playlist in self.playlists.items():
+            medias_ids, children = set(), set()
+            for item in playlist.get("items") or []:
+                if item.get("type") in SUBPLAYLIST_TYPES:
+                    children.add(item["id"])
+                else:
+                    medias_ids.update(item_media_ids(item))
+            self.playlist_medias[playlist_id] = medias_ids
+            self.playlist_children[playlist_id] = children
+            for media_id in medias_ids:
+                self.media_direct_playlists[media_id].add(playlist_id)
+            for child in children:
+                self.playlist_parents[child].add(playlist_id)
+
+        self.playlist_slots = defaultdict(list)
+        for player_id, player in self.players.items():
+            for slot, playlist_id in player_slots(player):
+                self.playlist_slots[playlist_id].append((player_id, slot))
+
+        self._link()
+
+    def _link(self):
+        """Compute the transitive relations from the direct ones"""
+        self.playlist_ancestors = {}
+        for playlist_id in set(self.playlists) | set(self.playlist_parents):
+            self.playlist_ancestors[playlist_id] = self._ancestors(playlist_id)
+
+        self.media_playlists = defaultdict(set)
+        for media_id, direct in self.media_direct_playlists.items():
+            for playlist_id in direct:
+                self.media_playlists[media_id].add(playlist_id)
+                self.media_playlists[media_id].update(
+                    self.playlist_ancestors.get(playlist_id, ())
+                )
+
+        self.playlist_players = {}
+        for playlist_id, ancestors in self.playlist_ancestors.items():
+            self.playlist_players[playlist_id] = {
+                player_id
+                for pid in ancestors | {playlist_id}
+                for player_id, _ in self.playlist_slots.get(pid, [])
+            }
+
+    def _ancestors(self, playlist_id: int) -> set:
+        """Playlists that contain the playlist received at any level"""
+        seen, stack = set(), list(self.playlist_parents.get(playlist_id, ()))
+        while stack:
+            parent = stack.pop()
+            if parent in seen or parent == playlist_id:
+                continue
+            seen.add(parent)
+            stack.extend(self.playlist_parents.get(parent, ()))
+        return seen
+
+    def playlists_of_media(self, media_id: int, nested: bool = True) -> set:
+        """Playlists that contain the media. When `nested` is True it
+        also considers the playlists containing it as sub-playlist."""
+        if nested:
+            return set(self.media_playlists.get(media_id, ()))
+        return set(self.media_direct_playlists.get(media_id, ()))
+
+    def players_of_playlist(self, playlist_id: int) -> set:
+        """Players that execute the playlist, directly or inside
+        another playlist, in any weekday or as audio"""
+        return set(self.playlist_players.get(playlist_id, ()))
+
+    def players_of_media(self, media_id: int) -> set:
+        """Players that execute the media"""
+        return {
+            player_id
+            for playlist_id in self.media_playlists.get(media_id, ())
+            for player_id in self.playlist_players.get(playlist_id, ())
+        }
+
+    def slots_of_playlist(self, playlist_id: int) -> List[tuple]:
+        """(player id, slot) pairs where the playlist is assigned
+        directly"""
+        return list(self.playlist_slots.get(playlist_id, []))
+
+    def parents_of_playlist(self, playlist_id: int, nested: bool = False) -> set:
+        """Playlists that contain the playlist as sub-playlist"""
+        if nested:
+            return set(self.playlist_ancestors.get(playlist_id, ()))
+        return set(self.playlist_parents.get(playlist_id, ()))
+
+    def impact_of_media(self, media_id: int) -> dict:
+        """Playlists and players that would be affected if the media
+        is deleted"""
+        return dict(
+            playlists=sorted(self.playlists_of_media(media_id, nested=False)),
+            nestedPlaylists=sorted(
+                self.playlists_of_media(media_id)
+                - self.playlists_of_media(media_id, nested=False)
+            ),
+            players=sorted(self.players_of_media(media_id)),
+        )
+
+    def impact_of_playlist(self, playlist_id: int) -> dict:
+        """Playlists that contain it, slots where it's assigned and
+        players that would be affected if the playlist is deleted"""
+        return dict(
+            playlists=sorted(self.parents_of_playlist(playlist_id)),
+            slots=sorted(self.slots_of_playlist(playlist_id)),
+            players=sorted(self.players_of_playlist(playlist_id)),
+        )
+
+    def discard_media(self, media_id: int):
+        """Remove a deleted media from the index"""
+        self.medias.pop(media_id, None)
+        for playlist_id in self.media_direct_playlists.pop(media_id, ()):
+            self.playlist_medias[playlist_id].discard(media_id)
+        self.media_playlists.pop(media_id, None)
+
+    def discard_playlist(self, playlist_id: int):
+        """Remove a deleted playlist from the index. The playlists and
+        medias it contained lose the players that reached them only
+        through it, so the transitive relations are computed again."""
+        self.playlists.pop(playlist_id, None)
+        for media_id in self.playlist_medias.pop(playlist_id, ()):
+            self.media_direct_playlists[media_id].discard(playlist_id)
+        for child in self.playlist_children.pop(playlist_id, ()):
+            self.playlist_parents[child].discard(playlist_id)
+        for parent in self.playlist_parents.pop(playlist_id, ()):
+            self.playlist_children.get(parent, set()).discard(playlist_id)
+        self.playlist_slots.pop(playlist_id, None)
+        self._link()
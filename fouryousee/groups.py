@@ -0,0 +1,84 @@
+from collections import defaultdict
+from typing import List
+
+from fouryousee.fleet import contact_minutes
+
+
+class GroupIndex(object):
+    """
+    Index of the players of the account by group, built from one
+    listing of the players.
+
+    :param players: Players as returned by `get_players()`.
+    :type players: list, required
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> groups = my.get_group_index()
+    >>> groups.groups()
+    [{'id': 1, 'name': 'Default', 'players': [1]},
+     {'id': 2, 'name': 'Clientes Barrio Sur', 'players': [2, 3]}]
+    >>> groups.players_of(2)
+    [2, 3]
+    >>> groups.group_of(3)
+    2
+
+    """
+
+    def __init__(self, players: List[dict]):
+        self.players = {}
+        self.names = {}
+        self.members = defaultdict(set)
+        self.player_group = {}
+        for player in players:
+            self.add(player)
+
+    def add(self, player: dict):
+        """Index a player, or update the group of one already indexed"""
+        self.remove(player["id"])
+        group = player.get("group") or {}
+        group_id = group.get("id") if isinstance(group, dict) else group
+        if isinstance(group, dict) and group.get("name"):
+            self.names[group_id] = group["name"]
+        self.players[player["id"]] = player
+        self.player_group[player["id"]] = group_id
+        self.members[group_id].add(player["id"])
+
+    def remove(self, player_id: int):
+        """Remove a player from the index"""
+        if player_id not in self.players:
+            return
+        group_id = self.player_group.pop(player_id)
+        del self.players[player_id]
+        self.members[group_id].discard(player_id)
+        if not self.members[group_id]:
+            del self.members[group_id]
+
+    def groups(self) -> List[dict]:
+        """Groups that have players, with the ids of their players"""
+        return [
+            dict(id=group_id, name=self.names.get(group_id), players=sorted(members))
+            for group_id, members in sorted(self.members.items(), key=lambda g: str(g[0]))
+        ]
+
+    def players_of(self, group_id: int) -> List[int]:
+        """Ids of the players of a group"""
+        return sorted(self.members.get(group_id, ()))
+
+    def group_of(self, player_id: int) -> int:
+        """Id of the group of a player"""
+        return self.player_group[player_id]
+
+    def statuses(self, group_id: int) -> List[dict]:
+        """Status and last contact of every player of a group"""
+        return [
+            dict(
+                id=player_id,
+                name=self.players[player_id]["name"],
+                status=(self.players[player_id].get("playerStatus") or {}).get("name"),
+                lastContactInMinutes=contact_minutes(self.players[player_id]),
+            )
+            for player_id in self.players_of(group_id)
+        ]
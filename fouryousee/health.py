@@ -0,0 +1,156 @@
+import json
+import os
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from fouryousee.fleet import contact_minutes
+
+
+class HealthHistory(object):
+    """
+    History of the status of the players, kept as a ring buffer of
+    compact samples per player and optionally appended to a file of
+    JSON lines, one line per snapshot, so it survives restarts.
+
+    Every sample is (timestamp, online, status id), where a player is
+    online when its last contact is within `offline_threshold` minutes.
+
+    :param path: File where the snapshots are appended and loaded from.
+    :type path: str, optional
+    :param capacity: Samples kept by player, default value is one week of
+            snapshots taken every minute.
+    :type capacity: int, optional
+    :param offline_threshold: Minutes since the last contact to consider
+            a player offline.
+    :type offline_threshold: int, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from fouryousee.health import HealthHistory
+    >>> history = HealthHistory('health.jsonl')
+    >>> history.record(my.get_players())
+
+    Recording a snapshot on every poll of the fleet
+
+    >>> from fouryousee.fleet import FleetPoller
+    >>> FleetPoller(my, interval=60, history=history).start()
+
+    Some days later
+
+    >>> history.score()
+    {
+       1: {'uptime': 99.31, 'flaps': 4, 'flapsPerDay': 0.57, 'mttr': 12.5,
+           'online': True, 'samples': 10080},
+       3: {'uptime': 0.0, 'flaps': 0, 'flapsPerDay': 0.0, 'mttr': None,
+           'online': False, 'samples': 10080}
+    }
+
+    """
+
+    def __init__(self, path: str = None, capacity: int = 10_080, offline_threshold: int = 15):
+        self.path = Path(path) if path else None
+        self.capacity = capacity
+        self.offline_threshold = offline_threshold
+        self.samples = defaultdict(lambda: deque(maxlen=self.capacity))
+        if self.path and self.path.exists():
+            self.load()
+
+    def _append(self, timestamp: int, states: dict):
+        for player_id, (online, status) in states.items():
+            self.samples[player_id].append((timestamp, online, status))
+
+    def record(self, players: List[dict], moment: datetime = None):
+        """Add a snapshot of the players received"""
+        timestamp = int((moment or datetime.now()).timestamp())
+        states = {}
+        for player in players:
+            minutes = contact_minutes(player)
+            online = minutes is not None and minutes <= self.offline_threshold
+            states[player["id"]] = (online, (player.get("playerStatus") or {}).get("id"))
+        self._append(timestamp, states)
+        if self.path:
+            with open(self.path, "a") as file:
+                file.write(json.dumps(dict(t=timestamp, p={
+                    str(player_id): [int(online), status] for player_id, (online, status) in states.items()
+                })) + "\n")
+
+    def load(self):
+        """Read the snapshots of the file"""
+        with open(self.path) as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                snapshot = json.loads(line)
+                self._append(snapshot["t"], {
+                    int(player_id): (bool(online), status)
+                    for player_id, (online, status) in snapshot["p"].items()
+                })
+
+    def compact(self):
+        """Rewrite the file with only the samples kept in memory. A
+        history without file has nothing to rewrite."""
+        if not self.path:
+            return
+        snapshots = defaultdict(dict)
+        for player_id, samples in self.samples.items():
+            for timestamp, online, status in samples:
+                snapshots[timestamp][str(player_id)] = [int(online), status]
+        temporary = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(temporary, "w") as file:
+            for timestamp in sorted(snapshots):
+                file.write(json.dumps(dict(t=timestamp, p=snapshots[timestamp])) + "\n")
+        os.replace(temporary, self.path)
+
+    def score(self, start: datetime = None, end: datetime = None,
+              player_ids: List[int] = None) -> dict:
+        """
+        Health of every player between two moments.
+
+        - `uptime`: percentage of the time online, every sample lasts
+          until the next one.
+        - `flaps`: changes between online and offline, and `flapsPerDay`.
+        - `mttr`: mean minutes to recover from the outages that started
+          and finished inside the period.
+
+        :param start: Moment from, default value is the oldest sample.
+        :type start: datetime, optional
+        :param end: Moment to, default value is the newest sample.
+        :type end: datetime, optional
+        :param player_ids: Ids of the players, default value is all of them.
+        :type player_ids: list, optional
+        :return: Dict with the scores by the id of the player.
+        :rtype: dict
+        """
+        low = start.timestamp() if start else float("-inf")
+        high = end.timestamp() if end else float("inf")
+        scores = {}
+        for player_id in sorted(self.samples if player_ids is None else player_ids):
+            samples = [s for s in self.samples.get(player_id, ()) if low <= s[0] <= high]
+            if not samples:
+                continue
+            total = up = flaps = 0
+            outages, down_since = [], None
+            for (t0, online0, _), (t1, online1, _) in zip(samples, samples[1:]):
+                total += t1 - t0
+                up += (t1 - t0) if online0 else 0
+                if online0 != online1:
+                    flaps += 1
+                    if not online1:
+                        down_since = t1
+                    elif down_since is not None:
+                        outages.append(t1 - down_since)
+                        down_since = None
+            days = total / 86_400
+            scores[player_id] = dict(
+                uptime=round(100 * up / total, 2) if total else None,
+                flaps=flaps,
+                flapsPerDay=round(flaps / days, 2) if days else None,
+                mttr=round(sum(outages) / len(outages) / 60, 2) if outages else None,
+                online=samples[-1][1],
+                samples=len(samples),
+            )
+        return scores
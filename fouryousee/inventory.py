@@ -0,0 +1,139 @@
+import csv
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import List
+
+from fouryousee.constants import PLATFORMS
+from fouryousee.fleet import PLAYER_REMOVED
+
+DIMENSIONS = ["platform", "status", "group", "playlist"]
+
+
+def player_keys(player: dict) -> List[tuple]:
+    """(platform, status, group, playlist) of a player, one per distinct
+    playlist of its weekdays"""
+    status = (player.get("playerStatus") or {}).get("name")
+    group = player.get("group") or {}
+    group = group.get("name") or group.get("id")
+    playlists = sorted({
+        slot["id"] for slot in (player.get("playlists") or {}).values() if slot
+    }) or [None]
+    return [(player.get("platform"), status, group, playlist) for playlist in playlists]
+
+
+class PlayerInventory(object):
+    """
+    Inventory of the players by platform, status, group and playlist.
+    Every player is placed once in the cells of its combination, so any
+    cross-tabulation is an aggregation of the cells, without going over
+    the players again. A player is counted once in every playlist of its
+    weekdays, and once in the cross-tabulations without playlist.
+
+    :param players: Players as returned by `get_players()`.
+    :type players: list, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> inventory = my.get_inventory()
+    >>> inventory.crosstab('platform')
+    {('SAMSUNG',): 1, ('WINDOWS',): 0, ('ANDROID',): 1, ('4YOUSEE_PLAYER',): 0, ('LG',): 1}
+    >>> inventory.crosstab('platform', 'status')
+    {('ANDROID', 'Online'): 1, ('SAMSUNG', 'Online'): 1, ('LG', 'Local assist needed'): 1}
+    >>> inventory.players(platform='LG', group='Clientes Barrio Sur')
+    [3]
+    >>> inventory.export('inventory.csv', 'platform', 'group')
+
+    Keeping it updated with the changes seen by a poller
+
+    >>> from fouryousee.fleet import FleetPoller
+    >>> poller = FleetPoller(my)
+    >>> poller.on(None, inventory.apply)
+
+    """
+
+    def __init__(self, players: List[dict] = None):
+        self.cells = defaultdict(set)
+        self.keys = {}
+        for player in players or []:
+            self.add(player)
+
+    def add(self, player: dict):
+        """Place a player, or move one already placed"""
+        self.remove(player["id"])
+        keys = player_keys(player)
+        self.keys[player["id"]] = keys
+        for key in keys:
+            self.cells[key].add(player["id"])
+
+    def remove(self, player_id: int):
+        """Take a player out of the inventory"""
+        for key in self.keys.pop(player_id, ()):
+            self.cells[key].discard(player_id)
+            if not self.cells[key]:
+                del self.cells[key]
+
+    def apply(self, event):
+        """Update the inventory with a :class:`PlayerEvent` of a poller"""
+        if event.type == PLAYER_REMOVED:
+            self.remove(event.player_id)
+        else:
+            self.add(event.player)
+
+    def _positions(self, dimensions: tuple) -> List[int]:
+        for dimension in dimensions:
+            if dimension not in DIMENSIONS:
+                raise Exception(f"Invalid dimension {dimension}, use one of {DIMENSIONS}")
+        return [DIMENSIONS.index(d) for d in dimensions]
+
+    def members(self, *dimensions: str) -> dict:
+        """Ids of the players of every combination of the dimensions"""
+        positions = self._positions(dimensions)
+        members = defaultdict(set)
+        for key, player_ids in self.cells.items():
+            members[tuple(key[p] for p in positions)] |= player_ids
+        return members
+
+    def crosstab(self, *dimensions: str) -> dict:
+        """Number of players of every combination of the dimensions. The
+        known platforms are always present when the only dimension is
+        the platform."""
+        counts = {key: len(ids) for key, ids in self.members(*dimensions).items()}
+        if dimensions == ("platform",):
+            counts = {**{(platform,): 0 for platform in PLATFORMS}, **counts}
+        return counts
+
+    def players(self, **filters) -> List[int]:
+        """Ids of the players with the values of the dimensions received"""
+        positions = dict(zip(filters, self._positions(tuple(filters))))
+        return sorted({
+            player_id
+            for key, player_ids in self.cells.items()
+            if all(key[positions[d]] == value for d, value in filters.items())
+            for player_id in player_ids
+        })
+
+    def table(self, *dimensions: str) -> List[dict]:
+        """Rows of a cross-tabulation with its count and its players"""
+        dimensions = dimensions or tuple(DIMENSIONS)
+        return [
+            dict(zip(dimensions, key), count=len(ids), players=sorted(ids))
+            for key, ids in sorted(self.members(*dimensions).items(), key=lambda i: str(i[0]))
+        ]
+
+    def export(self, path: str, *dimensions: str) -> Path:
+        """Write a cross-tabulation as CSV or JSON, according to the
+        extension of the file"""
+        path = Path(path)
+        rows = self.table(*dimensions)
+        if path.suffix.lower() == ".json":
+            path.write_text(json.dumps(rows, indent=2))
+        else:
+            with open(path, "w", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=list(dimensions or DIMENSIONS) + ["count", "players"])
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow(dict(row, players=" ".join(map(str, row["players"]))))
+        return path
@@ -0,0 +1,233 @@
+from typing import List
+
+from fouryousee.graph import SUBPLAYLIST_TYPES, VIDEOWALL_TYPES, item_media_ids
+
+NEWS_DURATION = 10
+
+
+class PlaylistCalculator(object):
+    """
+    Local calculator of the duration of the playlists, without
+    requests to the API. The items are resolved against the durations of
+    the cached medias and played in the order of the `sequence`.
+
+    - A layout doesn't take time.
+    - A videowall takes the duration of its longest cell.
+    - A carousel plays its next media every time it appears in the sequence.
+    - A sub-playlist plays its entire loop.
+
+    :param medias: Medias as returned by `get_medias()`.
+    :type medias: list, required
+    :param playlists: Playlists as returned by `get_playlists()`, used to
+            resolve the sub-playlists.
+    :type playlists: list, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from fouryousee.playlists import PlaylistCalculator
+    >>> calculator = PlaylistCalculator(my.get_medias(), my.get_playlists())
+    >>> calculator.duration(75)
+    146
+
+    Planning a playlist before adding it
+
+    >>> calculator.duration({'items': [{'type': 'media', 'id': 117},
+    ...                                {'type': 'media', 'id': 228}],
+    ...                      'sequence': [0, 1, 0]})
+    166
+    >>> calculator.offsets({'items': [{'type': 'media', 'id': 117},
+    ...                               {'type': 'media', 'id': 228}],
+    ...                     'sequence': [0, 1, 0]})
+    [{'position': 0, 'item': 0, 'type': 'media', 'id': 117, 'start': 0, 'duration': 20},
+     {'position': 1, 'item': 1, 'type': 'media', 'id': 228, 'start': 20, 'duration': 126},
+     {'position': 2, 'item': 0, 'type': 'media', 'id': 117, 'start': 146, 'duration': 20}]
+
+    Durations of all the playlists of the account
+
+    >>> calculator.durations()
+    {38: 102, 39: 102, 75: 146}
+
+    """
+
+    def __init__(self, medias: List[dict], playlists: List[dict] = None):
+        self.medias = {
+            m["id"]: m.get("durationInSeconds") or 0 for m in medias
+        }
+        self.playlists = {p["id"]: p for p in playlists or []}
+        self._durations = {}
+        self._resolving = set()
+
+    def media_duration(self, item: dict) -> int:
+        """Duration of a media, the cached one or the one of the item"""
+        if item.get("id") in self.medias:
+            return self.medias[item["id"]]
+        return item.get("durationInSeconds") or 0
+
+    def item_duration(self, item: dict, appearance: int = 0) -> int:
+        """Duration of an item the time number `appearance` it's played"""
+        kind = item.get("type", "media")
+        if kind == "media":
+            return self.media_duration(item)
+        if kind == "news":
+            return item.get("durationInSeconds") or NEWS_DURATION
+        if kind == "carousel":
+            # The sequence of a carousel has the ids of its medias
+            medias = {m["id"]: m for m in item.get("items") or []}
+            order = item.get("sequence") or list(medias)
+            if not order:
+                return 0
+            media_id = order[appearance % len(order)]
+            return self.media_duration(medias.get(media_id, {"id": media_id}))
+        if kind in VIDEOWALL_TYPES:
+            return max(
+                (self.item_duration(cell) for row in item.get("grid") or [] for cell in row),
+                default=0,
+            )
+        if kind in SUBPLAYLIST_TYPES:
+            return self.duration(item["id"])
+        return 0
+
+    def offsets(self, playlist: dict or int) -> List[dict]:
+        """Start and duration of every position of the sequence of a
+        playlist, in seconds since the start of the loop"""
+        if not isinstance(playlist, dict):
+            playlist = self.playlists[playlist]
+        items = playlist.get("items") or []
+        sequence = playlist.get("sequence")
+        if sequence is None:
+            sequence = list(range(len(items)))
+        appearances, start, result = {}, 0, []
+        for position, index in enumerate(sequence):
+            item = items[index]
+            duration = self.item_duration(item, appearances.get(index, 0))
+            appearances[index] = appearances.get(index, 0) + 1
+            result.append(dict(
+                position=position, item=index, type=item.get("type"),
+                id=item.get("id"), start=start, duration=duration,
+            ))
+            start += duration
+        return result
+
+    def duration(self, playlist: dict or int) -> int:
+        """Seconds of one loop of a playlist"""
+        if isinstance(playlist, dict):
+            return sum(o["duration"] for o in self.offsets(playlist))
+        if playlist not in self._durations:
+            if playlist not in self.playlists:
+                raise Exception(f"Playlist with ID {playlist} was not found")
+            if playlist in self._resolving:
+                raise Exception(f"Playlist with ID {playlist} contains itself")
+            self._resolving.add(playlist)
+            try:
+                self._durations[playlist] = self.duration(self.playlists[playlist])
+            finally:
+                self._resolving.discard(playlist)
+        return self._durations[playlist]
+
+    def durations(self, playlists: List[dict or int] = None) -> dict:
+        """Seconds of one loop of many playlists, all the cached ones
+        by default"""
+        if playlists is None:
+            playlists = list(self.playlists)
+        return {
+            p["id"] if isinstance(p, dict) else p: self.duration(p)
+            for p in playlists
+        }
+
+
+class PlaylistFlattener(object):
+    """
+    Expansion of the sub-playlists from one listing of the playlists.
+    The expansion of every playlist is memoized, so the playlists that
+    share the same sub-playlists are expanded only once, and the cycles
+    between playlists are detected.
+
+    :param playlists: Playlists as returned by `get_playlists()`.
+    :type playlists: list, required
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from fouryousee.playlists import PlaylistFlattener
+    >>> flattener = PlaylistFlattener(my.get_playlists())
+    >>> flattener.flatten(38)  # Items in the order they are played
+    [{'type': 'news', 'durationInSeconds': 10},
+     {'type': 'media', 'id': 55, 'name': 'samsung_A80', ...},
+     {'type': 'media', 'id': 56, 'name': 'audifonos_samsung', ...}]
+    >>> flattener.media_ids(38)
+    [55, 56]
+
+    If a playlist contains itself through its sub-playlists
+
+    >>> flattener.flatten(90)
+    Exception: Playlist with ID 90 contains itself: 90 -> 91 -> 90
+
+    """
+
+    def __init__(self, playlists: List[dict]):
+        self.playlists = {p["id"]: p for p in playlists}
+        self._entries = {}
+        self._flat = {}
+        self._media_ids = {}
+        self._path = []
+
+    def entries(self, playlist_id: int) -> List[tuple]:
+        """(playlist id, index, item) of every item of the playlist in the
+        order of its sequence, where the id and the index locate the item
+        in the playlist or in the sub-playlist that contains it. The
+        sub-playlists that aren't in the listing are skipped."""
+        if playlist_id in self._entries:
+            return self._entries[playlist_id]
+        if playlist_id in self._path:
+            cycle = self._path[self._path.index(playlist_id):] + [playlist_id]
+            raise Exception(
+                "Playlist with ID {} contains itself: {}".format(
+                    playlist_id, " -> ".join(map(str, cycle))
+                )
+            )
+        if playlist_id not in self.playlists:
+            raise Exception(f"Playlist with ID {playlist_id} was not found")
+
+        playlist = self.playlists[playlist_id]
+        items = playlist.get("items") or []
+        sequence = playlist.get("sequence")
+        if sequence is None:
+            sequence = range(len(items))
+        self._path.append(playlist_id)
+        entries = []
+        try:
+            for index in sequence:
+                item = items[index]
+                if item.get("type") not in SUBPLAYLIST_TYPES:
+                    entries.append((playlist_id, index, item))
+                elif item["id"] in self.playlists:
+                    entries.extend(self.entries(item["id"]))
+        finally:
+            self._path.pop()
+        self._entries[playlist_id] = entries
+        return entries
+
+    def flatten(self, playlist_id: int) -> List[dict]:
+        """Items of the playlist in the order of its sequence, with the
+        sub-playlists replaced by their own items"""
+        if playlist_id not in self._flat:
+            self._flat[playlist_id] = [item for _, _, item in self.entries(playlist_id)]
+        return self._flat[playlist_id]
+
+    def media_ids(self, playlist_id: int) -> List[int]:
+        """Ids of the medias played by the playlist, without repetitions
+        and in the order they first appear"""
+        if playlist_id not in self._media_ids:
+            self._media_ids[playlist_id] = list(dict.fromkeys(
+                media_id
+                for item in self.flatten(playlist_id)
+                for media_id in item_media_ids(item)
+            ))
+        return self._media_ids[playlist_id]
+
+    def flatten_all(self) -> dict:
+        """Expansion of all the playlists, by id"""
+        return {playlist_id: self.flatten(playlist_id) for playlist_id in self.playlists}
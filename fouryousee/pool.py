@@ -0,0 +1,193 @@
+import threading
+from typing import Callable, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fouryousee.budget import RateBudget
+from fouryousee.fleet import contact_minutes
+from fouryousee.fouryousee import FouryouseeAPI, run_concurrently
+
+
+class ClientPool(object):
+    """
+    Clients of many 4YouSee accounts sharing one pool of connections.
+    Every token has its own rate budget and the requests of all the
+    accounts in flight are limited by `max_concurrency`.
+
+    :param accounts: Token of every account by the name of the account.
+    :type accounts: dict, required
+    :param rate: Requests per second allowed by token.
+    :type rate: float, optional
+    :param burst: Requests allowed at once by token after a pause.
+    :type burst: int, optional
+    :param max_concurrency: Requests in flight at the same time,
+            considering all the accounts.
+    :type max_concurrency: int, optional
+
+    **Usage**
+
+    >>> from fouryousee.pool import ClientPool
+    >>> with ClientPool({'store-a': 'f9d8c7...', 'store-b': 'a1b2c3...'}) as pool:
+    ...     result = pool.map(lambda my: len(my.get_players()))
+    >>> result
+    {'done': {'store-a': 12, 'store-b': 40}, 'errors': {}}
+
+    Every client is a :class:`FouryouseeAPI`
+
+    >>> pool['store-a'].get_playlists(id=38)
+
+    """
+
+    def __init__(self, accounts: dict, rate: float = 1.0, burst: int = 1,
+                 max_concurrency: int = 16):
+        self.max_concurrency = max_concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.clients = {}
+        for account, token in accounts.items():
+            client = FouryouseeAPI(token, account=account)
+            client.session = self.session
+            client.budget = RateBudget(rate, burst)
+            client.semaphore = self.semaphore
+            self.clients[account] = client
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getitem__(self, account: str) -> FouryouseeAPI:
+        return self.clients[account]
+
+    def __iter__(self):
+        return iter(self.clients)
+
+    def __len__(self):
+        return len(self.clients)
+
+    def map(self, operation: Callable, accounts: List[str] = None) -> dict:
+        """
+        Execute an operation with the client of every account, concurrently.
+
+        :param operation: Callable that receives a :class:`FouryouseeAPI`.
+        :type operation: callable, required
+        :param accounts: Names of the accounts, default value is all of them.
+        :type accounts: list, optional
+        :return: Dict with the results in `done` and the errors in
+                `errors`, both by the name of the account.
+        :rtype: dict
+        """
+        accounts = self.clients if accounts is None else accounts
+        return run_concurrently(
+            {account: lambda c=self.clients[account]: operation(c) for account in accounts},
+            self.max_concurrency,
+        )
+
+    def close(self):
+        """Close the connections of the pool"""
+        self.session.close()
+
+
+def field(record: dict, key: str or Callable):
+    """Value of a record by a callable or by a key, where the dots
+    reach nested dicts, like 'group.name'"""
+    if callable(key):
+        return key(record)
+    value = record
+    for part in key.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+class AccountsIndex(object):
+    """
+    Merged index of the resources of all the accounts of a pool. Every
+    record is tagged with the name of its `account`, so the fleet-wide
+    filters and counts are answered from memory.
+
+    :param pool: Pool with the clients of the accounts.
+    :type pool: ClientPool, required
+
+    **Usage**
+
+    >>> from fouryousee.pool import AccountsIndex, ClientPool
+    >>> pool = ClientPool({'store-a': 'f9d8c7...', 'store-b': 'a1b2c3...'})
+    >>> index = AccountsIndex(pool)
+    >>> index.refresh(['players', 'medias'])
+    {}
+    >>> [(p['account'], p['name']) for p in index.offline_players(threshold=30)]
+    [('store-b', 'Lobby')]
+    >>> index.count('players', by='platform')
+    {'ANDROID': 31, 'SAMSUNG': 20, 'LG': 1}
+    >>> index.count('players', by=lambda p: (p['account'], p['platform']))
+    {('store-a', 'ANDROID'): 12, ('store-b', 'ANDROID'): 19, ...}
+    >>> index.filter('players', **{'group.name': 'Stores', 'platform': 'LG'})
+
+    """
+
+    RESOURCES = ["players", "medias", "playlists", "uploads"]
+
+    def __init__(self, pool: ClientPool):
+        self.pool = pool
+        self.records = {}
+
+    def refresh(self, resources: List[str] = None, accounts: List[str] = None) -> dict:
+        """
+        Consult again the resources of the accounts, concurrently, and
+        rebuild the merged index. The cache of every client is updated too.
+
+        :param resources: Names of the resources, any of `RESOURCES`.
+        :type resources: list, optional
+        :param accounts: Names of the accounts, default value is all of them.
+        :type accounts: list, optional
+        :return: Errors by the name of the account. The accounts with
+                errors keep their previous records.
+        :rtype: dict
+        """
+        resources = resources or ["players", "medias"]
+        for resource in resources:
+            if resource not in self.RESOURCES:
+                raise Exception(f"Invalid resource {resource}")
+        result = self.pool.map(
+            lambda my: {r: getattr(my, f"get_{r}")() for r in resources}, accounts
+        )
+        for resource in resources:
+            self.records[resource] = [
+                record for record in self.records.get(resource, [])
+                if record["account"] not in result["done"]
+            ] + [
+                dict(record, account=account)
+                for account, listings in result["done"].items()
+                for record in listings[resource] or []
+            ]
+        return result["errors"]
+
+    def filter(self, resource: str, predicate: Callable = None, **fields) -> List[dict]:
+        """Records of all the accounts that match the predicate and
+        have the values of the fields received"""
+        return [
+            record for record in self.records.get(resource, [])
+            if (predicate is None or predicate(record))
+            and all(field(record, k) == v for k, v in fields.items())
+        ]
+
+    def count(self, resource: str, by: str or Callable = "account",
+              predicate: Callable = None) -> dict:
+        """Number of records of all the accounts by the value of a field"""
+        counts = {}
+        for record in self.filter(resource, predicate):
+            key = field(record, by)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def offline_players(self, threshold: int = 15) -> List[dict]:
+        """Players of all the accounts without contact in the last
+        `threshold` minutes"""
+        return self.filter("players", lambda p: (
+            contact_minutes(p) is None or contact_minutes(p) > threshold
+        ))
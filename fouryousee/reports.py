@@ -0,0 +1,530 @@
+import gzip
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+import requests
+
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def download_report(url: str, path: str or Path, workers: int = 4,
+                    chunk_size: int = 8 * 1024 * 1024,
+                    retries: int = 3) -> Path:
+    """
+    Download the file of the `url` field of a report and return the
+    path where it was saved.
+
+    When the server supports range requests the file is downloaded in
+    chunks by parallel GETs. The data is written to a `.part` file and
+    the finished chunks are registered in a `.part.json` file, so an
+    interrupted download is resumed from where it stopped. Finally the
+    size of the file is verified.
+
+    :param url: Url of the report.
+    :type url: str, required
+    :param path: Path where the file will be saved.
+    :type path: str, required
+    :param workers: Number of parallel GETs.
+    :type workers: int, optional
+    :param chunk_size: Bytes requested by every GET.
+    :type chunk_size: int, optional
+    :param retries: Attempts of every chunk before giving up.
+    :type retries: int, optional
+    :return: Path of the downloaded file.
+    :rtype: Path
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from fouryousee.reports import download_report
+    >>> report = my.get_reports(id=521546)
+    >>> download_report(report['url'], 'report_521546.gz')
+    PosixPath('report_521546.gz')
+
+    """
+    path = Path(path)
+    part = path.with_name(path.name + ".part")
+    state = path.with_name(path.name + ".part.json")
+
+    with requests.Session() as session:
+        with session.get(url, headers={"Range": "bytes=0-0"},
+                         stream=True) as response:
+            if not response.ok:
+                raise Exception(response.text)
+            content_range = response.headers.get("Content-Range", "")
+            ranged = response.status_code == 206 and "/" in content_range
+            total = int(content_range.rsplit("/", 1)[1]) if ranged else None
+
+        if not ranged or total == 0:
+            _download_sequential(session, url, part)
+        else:
+            _download_ranges(session, url, part, state, total, workers,
+                             chunk_size, retries)
+
+    if total is not None and part.stat().st_size != total:
+        raise Exception(
+            f"Incomplete download of {url}: expected {total} bytes "
+            f"and received {part.stat().st_size}."
+        )
+    part.replace(path)
+    if state.exists():
+        state.unlink()
+    return path
+
+
+def _download_sequential(session, url: str, part: Path):
+    """Download the url in a single GET"""
+    with session.get(url, stream=True) as response:
+        if not response.ok:
+            raise Exception(response.text)
+        with open(part, "wb") as file:
+            shutil.copyfileobj(response.raw, file)
+
+
+def _download_ranges(session, url: str, part: Path, state: Path, total: int,
+                     workers: int, chunk_size: int, retries: int):
+    """Download the missing chunks of the url with parallel range
+    requests, registering every finished chunk"""
+    chunks = [
+        (start, min(start + chunk_size, total) - 1)
+        for start in range(0, total, chunk_size)
+    ]
+    done = set()
+    if part.exists() and state.exists():
+        with open(state) as file:
+            saved = json.load(file)
+        if saved.get("total") == total and saved.get("chunkSize") == chunk_size:
+            done = set(saved.get("done", []))
+    if not part.exists() or not done:
+        with open(part, "wb") as file:
+            file.truncate(total)
+
+    lock = threading.Lock()
+
+    def fetch(index: int):
+        start, end = chunks[index]
+        for attempt in range(retries):
+            try:
+                response = session.get(
+                    url, headers={"Range": f"bytes={start}-{end}"}, timeout=60
+                )
+                if response.status_code != 206 or len(response.content) != end - start + 1:
+                    raise Exception(f"Invalid range response {response.status_code}")
+                break
+            except Exception:
+                if attempt == retries - 1:
+                    raise
+        with open(part, "r+b") as file:
+            file.seek(start)
+            file.write(response.content)
+        with lock:
+            done.add(index)
+            with open(state, "w") as file:
+                json.dump(dict(total=total, chunkSize=chunk_size,
+                               done=sorted(done)), file)
+
+    pending = [i for i in range(len(chunks)) if i not in done]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in as_completed([executor.submit(fetch, i) for i in pending]):
+            future.result()
+
+
+def read_report(path: str or Path) -> List[dict]:
+    """Return the playlogs of a downloaded report with format json,
+    compressed with gzip or not"""
+    return list(iter_report(path))
+
+
+def iter_report(path: str or Path, block_size: int = 1024 * 1024) -> Iterator[dict]:
+    """Yield one by one the playlogs of a downloaded report with format
+    json. When the file is a json array it is decoded by blocks, so the
+    whole report is never loaded in memory."""
+    path = Path(path)
+    with open(path, "rb") as file:
+        compressed = file.read(2) == b"\x1f\x8b"
+    opener = gzip.open if compressed else open
+    decoder = json.JSONDecoder()
+    with opener(path, "rt", encoding="utf-8") as file:
+        buffer = file.read(block_size).lstrip()
+        if not buffer.startswith("["):
+            data = json.loads(buffer + file.read())
+            if isinstance(data, dict):
+                data = data.get("results") or data.get("playlogs") or []
+            yield from data
+            return
+        buffer, position = buffer[1:], 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                block = file.read(block_size)
+                if not block:
+                    raise Exception(f"Invalid report file {path}")
+                buffer, position = buffer[position:] + block, 0
+                continue
+            yield item
+
+
+def playlog_datetime(playlog: dict) -> datetime:
+    """Return the moment when a playlog was registered. It considers
+    the fields `date` and `time` or a single `datetime` field"""
+    if value := playlog.get("datetime") or playlog.get("timestamp"):
+        return datetime.fromisoformat(str(value).replace("T", " ")[:19])
+    return datetime.strptime(
+        "{} {}".format(playlog["date"], playlog.get("time", "00:00:00")),
+        DATETIME_FORMAT,
+    )
+
+
+def report_filter(start: datetime, end: datetime, player_ids: list) -> dict:
+    """Build the filter of `request_report` for the [start, end) window"""
+    last = end - timedelta(seconds=1)
+    return {
+        "startDate": start.strftime("%Y-%m-%d"),
+        "startTime": start.strftime("%H:%M:%S"),
+        "endDate": last.strftime("%Y-%m-%d"),
+        "endTime": last.strftime("%H:%M:%S"),
+        "mediaId": [],
+        "playerId": sorted(player_ids),
+    }
+
+
+# Types of the known columns of every report type. The columns that
+# are not listed are inferred from all the playlogs of the report.
+REPORT_COLUMNS = {
+    "detailed": {
+        "playerId": "int64",
+        "playerName": "string",
+        "mediaId": "int64",
+        "mediaName": "string",
+        "date": "string",
+        "time": "string",
+        "playedAt": "timestamp",
+    },
+}
+
+# Types a numeric column is promoted through when its values don't fit.
+# A column mixing booleans with other values is written as string.
+PROMOTIONS = ["int64", "float64", "string"]
+
+
+def value_type(value) -> str:
+    """Narrowest arrow type that holds a value of a playlog"""
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int64"
+    if isinstance(value, float):
+        return "float64"
+    return "string"
+
+
+def report_schema(report_type: str, playlogs: Iterable[dict], pa):
+    """Build the arrow schema of a report from the known columns of
+    its type and all the playlogs received, in one pass. A column is
+    promoted to the widest type of its values, so no value is truncated,
+    and the known integer columns become float or string if needed."""
+    known = REPORT_COLUMNS.get(report_type, {})
+    columns = {}
+    for playlog in playlogs:
+        for name, value in playlog.items():
+            current = columns.setdefault(name, known.get(name))
+            if value is None or current in ["string", "timestamp"]:
+                continue
+            kind = value_type(value)
+            if current is None:
+                columns[name] = kind
+            elif (kind == "bool") != (current == "bool"):
+                columns[name] = "string"
+            elif kind != "bool" and PROMOTIONS.index(kind) > PROMOTIONS.index(current):
+                columns[name] = kind
+    for name, kind in known.items():
+        columns.setdefault(name, kind)
+    types = dict(
+        bool=pa.bool_(), int64=pa.int64(), float64=pa.float64(),
+        string=pa.string(), timestamp=pa.timestamp("ms"),
+    )
+    return pa.schema([
+        pa.field(name, types[kind or "string"]) for name, kind in columns.items()
+    ])
+
+
+def export_report(path: str or Path, destination: str or Path,
+                  report: dict = None, chunk_rows: int = 100_000,
+                  compression: str = "zstd") -> Path:
+    """
+    Convert a downloaded report into a compressed columnar file. The
+    report is read twice, first to infer the columns of all its playlogs
+    and then to write them in chunks of `chunk_rows` playlogs, so the
+    memory used doesn't depend on the size of the report.
+
+    When the destination ends with `.arrow` or `.feather` an Arrow IPC
+    file is written, otherwise a Parquet file. It requires `pyarrow`,
+    that can be installed with `pip install fouryousee[parquet]`.
+
+    :param path: Path of the downloaded report.
+    :type path: str, required
+    :param destination: Path of the columnar file.
+    :type destination: str, required
+    :param report: Report as returned by `get_reports(id=...)`, its
+            `type` and `format` define the schema of the file.
+    :type report: dict, optional
+    :param chunk_rows: Number of playlogs written at once.
+    :type chunk_rows: int, optional
+    :param compression: Compression codec of the file.
+    :type compression: str, optional
+    :return: Path of the columnar file.
+    :rtype: Path
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from fouryousee.reports import download_report, export_report
+    >>> report = my.get_reports(id=521546)
+    >>> file = download_report(report['url'], 'report_521546.gz')
+    >>> export_report(file, 'report_521546.parquet', report=report)
+    PosixPath('report_521546.parquet')
+    >>> import duckdb
+    >>> duckdb.sql("SELECT mediaId, count(*) FROM 'report_521546.parquet' GROUP BY 1")
+
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise Exception(
+            "pyarrow is required to export reports, install it with "
+            "`pip install fouryousee[parquet]`."
+        )
+    report = report or {}
+    if report.get("format", "json") != "json":
+        raise Exception("Only reports with format json can be exported.")
+
+    destination = Path(destination)
+
+    def playlogs() -> Iterator[dict]:
+        for row in iter_report(path):
+            if "playedAt" not in row and ("date" in row or "datetime" in row):
+                row["playedAt"] = playlog_datetime(row)
+            yield row
+
+    schema = report_schema(report.get("type", "detailed"), playlogs(), pa)
+    writer, chunk = None, []
+
+    def write(rows: List[dict]):
+        for row in rows:
+            for field in schema:
+                value = row.get(field.name)
+                if pa.types.is_string(field.type) and isinstance(value, (dict, list)):
+                    row[field.name] = json.dumps(value)
+                elif pa.types.is_string(field.type) and value is not None:
+                    row[field.name] = str(value)
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+
+    try:
+        if destination.suffix in [".arrow", ".feather"]:
+            writer = pa.ipc.new_file(
+                str(destination), schema,
+                options=pa.ipc.IpcWriteOptions(compression=compression),
+            )
+        else:
+            writer = pq.ParquetWriter(str(destination), schema, compression=compression)
+        for playlog in playlogs():
+            chunk.append(playlog)
+            if len(chunk) >= chunk_rows:
+                write(chunk)
+                chunk = []
+        if chunk:
+            write(chunk)
+    finally:
+        if writer:
+            writer.close()
+    return destination
+
+
+def merge_windows(windows: Iterable[list]) -> List[list]:
+    """Merge overlapping or contiguous [start, end) windows"""
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def subtract_windows(start, end, covered: List[list]) -> List[list]:
+    """Return the pieces of [start, end) that are not inside the
+    merged `covered` windows"""
+    missing, cursor = [], start
+    for c_start, c_end in covered:
+        if c_end <= cursor:
+            continue
+        if c_start >= end:
+            break
+        if c_start > cursor:
+            missing.append([cursor, c_start])
+        cursor = max(cursor, c_end)
+    if cursor < end:
+        missing.append([cursor, end])
+    return missing
+
+
+class PlaylogRollup(object):
+    """
+    Incremental counts of playlogs by player, media and hour, persisted
+    on a json file together with the (player, window) ranges that were
+    already ingested. Every run only requests the reports of the windows
+    that haven't been covered by previous runs.
+
+    :param client: Object of :class:`FouryouseeAPI`.
+    :type client: FouryouseeAPI, required
+    :param path: Path of the json file where the rollup is persisted.
+    :type path: str, required
+    :param receiver: Started receiver used to wait the reports, when
+            it's not informed the reports are consulted by polling.
+    :type receiver: ReportWebhookReceiver, optional
+    :param timeout: Seconds to wait the webhook before polling.
+    :type timeout: int, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from datetime import datetime
+    >>> from fouryousee.reports import PlaylogRollup
+    >>> rollup = PlaylogRollup(my, 'playlogs.json')
+    >>> rollup.update(datetime(2022, 7, 1), datetime(2022, 7, 2), player_ids=[1, 2])
+    2
+    >>> rollup.update(datetime(2022, 7, 1), datetime(2022, 7, 2, 1), player_ids=[1, 2])
+    1  # Only the last hour was requested
+    >>> rollup.totals(by='mediaId')
+    {1: 1130, 55: 845}
+
+    """
+
+    def __init__(self, client, path: str or Path, receiver=None,
+                 timeout=600, poll_interval=30):
+        self.client = client
+        self.path = Path(path)
+        self.timeout = timeout if receiver else 0
+        if receiver is None:
+            # Imported here so the fleet tools don't load the HTTP server
+            from fouryousee.webhook import ReportWebhookReceiver
+            receiver = ReportWebhookReceiver(client, poll_interval=poll_interval)
+        self.receiver = receiver
+        self.coverage = defaultdict(list)
+        self.counts = defaultdict(int)
+        if self.path.exists():
+            self.load()
+
+    def load(self):
+        with open(self.path) as file:
+            data = json.load(file)
+        for player_id, windows in data.get("coverage", {}).items():
+            self.coverage[int(player_id)] = [
+                [datetime.strptime(s, DATETIME_FORMAT),
+                 datetime.strptime(e, DATETIME_FORMAT)]
+                for s, e in windows
+            ]
+        for key, count in data.get("counts", {}).items():
+            player_id, media_id, hour = key.split("|")
+            self.counts[(int(player_id), int(media_id), hour)] = count
+
+    def save(self):
+        data = {
+            "coverage": {
+                str(player_id): [
+                    [s.strftime(DATETIME_FORMAT), e.strftime(DATETIME_FORMAT)]
+                    for s, e in windows
+                ]
+                for player_id, windows in self.coverage.items()
+            },
+            "counts": {
+                f"{player_id}|{media_id}|{hour}": count
+                for (player_id, media_id, hour), count in self.counts.items()
+            },
+        }
+        temp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(temp, "w") as file:
+            json.dump(data, file)
+        temp.replace(self.path)
+
+    def uncovered(self, start: datetime, end: datetime,
+                  player_ids: list) -> List[tuple]:
+        """Return a list of (start, end, player_ids) with the windows
+        that haven't been ingested, grouping the players that miss
+        the same window"""
+        groups = defaultdict(list)
+        for player_id in player_ids:
+            for s, e in subtract_windows(start, end, self.coverage[player_id]):
+                groups[(s, e)].append(player_id)
+        return [(s, e, ids) for (s, e), ids in sorted(groups.items())]
+
+    def ingest(self, playlogs: Iterable[dict], start: datetime,
+               end: datetime, player_ids: list):
+        """Add the playlogs of the [start, end) window to the counts and
+        mark the window as covered for the players received"""
+        players = set(player_ids)
+        for playlog in playlogs:
+            if int(playlog["playerId"]) not in players:
+                continue
+            moment = playlog_datetime(playlog)
+            if not start <= moment < end:
+                continue
+            hour = moment.strftime("%Y-%m-%d %H:00")
+            self.counts[
+                (int(playlog["playerId"]), int(playlog["mediaId"]), hour)
+            ] += 1
+        for player_id in player_ids:
+            self.coverage[player_id] = merge_windows(
+                self.coverage[player_id] + [[start, end]]
+            )
+
+    def update(self, start: datetime, end: datetime, player_ids: list,
+               directory: str or Path = ".") -> int:
+        """Request, download and ingest the reports of the windows that
+        are not covered yet. Return the number of requested reports."""
+        windows = self.uncovered(start, end, player_ids)
+        for w_start, w_end, ids in windows:
+            payload = dict(filter=report_filter(w_start, w_end, ids))
+            if self.timeout:
+                report_id = self.receiver.request_report(**payload).report_id
+            else:
+                report_id = self.client.request_report(**payload)["id"]
+            report = self.receiver.wait(report_id, timeout=self.timeout)
+            if report.get("status") != "success":
+                raise Exception(f"Report with ID {report['id']} failed")
+            file = download_report(
+                report["url"], Path(directory) / f"report_{report['id']}.gz"
+            )
+            self.ingest(iter_report(file), w_start, w_end, ids)
+            file.unlink()
+            self.save()
+        return len(windows)
+
+    def totals(self, by: str = "mediaId", start: datetime = None,
+               end: datetime = None) -> dict:
+        """Sum the counts by `playerId`, `mediaId` or `hour`,
+        optionally inside the [start, end) window"""
+        position = ["playerId", "mediaId", "hour"].index(by)
+        first = start.strftime("%Y-%m-%d %H:00") if start else ""
+        last = end.strftime("%Y-%m-%d %H:00") if end else "~"
+        result = defaultdict(int)
+        for key, count in self.counts.items():
+            if first <= key[2] < last:
+                result[key[position]] += count
+        return dict(result)
@@ -0,0 +1,455 @@
+from bisect import bisect_right
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List
+
+from fouryousee.graph import VIDEOWALL_TYPES
+from fouryousee.playlists import PlaylistFlattener
+
+DAY_SECONDS = 24 * 60 * 60
+WEEK_SECONDS = 7 * DAY_SECONDS
+
+
+def parse_date(value) -> datetime or None:
+    """Parse the startDate or endDate of a schedule, where a missing
+    date can arrive as None or as the 'None' string"""
+    if not value or value == "None":
+        return None
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+
+
+def parse_time(value: str) -> int:
+    """Seconds since midnight of a 'HH:MM' or 'HH:MM:SS' time"""
+    parts = [int(p) for p in str(value).split(":")]
+    return parts[0] * 3600 + parts[1] * 60 + (parts[2] if len(parts) > 2 else 0)
+
+
+def week_second(moment: datetime) -> int:
+    """Seconds since the start of the week. The weeks start on
+    sunday, which is the weekday 0 of the schedules."""
+    day = (moment.weekday() + 1) % 7
+    return day * DAY_SECONDS + moment.hour * 3600 + moment.minute * 60 + moment.second
+
+
+def item_schedules(item: dict, schedules: tuple = ()) -> List[tuple]:
+    """Return the (media id, contentSchedules) of every media of an item
+    of a playlist. The contentSchedule of the item applies to all its
+    medias, the one of a cell of a videowall or of a media of a carousel
+    only to that media."""
+    if item.get("contentSchedule"):
+        schedules = schedules + (item["contentSchedule"],)
+    kind = item.get("type", "media")
+    if kind == "media":
+        return [(item["id"], schedules)] if item.get("id") is not None else []
+    if kind == "carousel":
+        return [
+            entry for media in item.get("items") or []
+            for entry in item_schedules(dict(media, type="media"), schedules)
+        ]
+    if kind in VIDEOWALL_TYPES:
+        return [
+            entry for row in item.get("grid") or [] for cell in row
+            for entry in item_schedules(cell, schedules)
+        ]
+    return []
+
+
+class CompiledSchedule(object):
+    """
+    Schedule of a media preprocessed into a date range and the merged
+    intervals of the week where it is active.
+
+    :param schedule: `schedule` of a media or `contentSchedule` of an
+            item of a playlist.
+    :type schedule: dict, optional
+    """
+
+    def __init__(self, schedule: dict = None):
+        schedule = schedule or {}
+        self.start = parse_date(schedule.get("startDate"))
+        end = parse_date(schedule.get("endDate"))
+        self.end = end + timedelta(days=1) if end else None
+        intervals = []
+        for time in schedule.get("times") or []:
+            start, finish = parse_time(time["startTime"]), parse_time(time["endTime"])
+            for day in time.get("weekDays", range(7)):
+                offset = int(day) * DAY_SECONDS
+                if finish > start:
+                    intervals.append((offset + start, offset + finish))
+                else:  # Crosses midnight
+                    intervals.append((offset + start, offset + DAY_SECONDS))
+                    following = (offset + DAY_SECONDS) % WEEK_SECONDS
+                    intervals.append((following, following + finish))
+        self.always = not schedule.get("times")
+        self.weekly = []
+        for start, finish in sorted(intervals):
+            if self.weekly and start <= self.weekly[-1][1]:
+                self.weekly[-1][1] = max(self.weekly[-1][1], finish)
+            elif finish > start:
+                self.weekly.append([start, finish])
+        self.weekly_starts = [start for start, _ in self.weekly]
+
+    def intersection(self, other: "CompiledSchedule") -> "CompiledSchedule":
+        """Schedule active only when both schedules are active, like a
+        media limited by the contentSchedule of an item"""
+        compiled = CompiledSchedule()
+        compiled.start = max(filter(None, [self.start, other.start]), default=None)
+        compiled.end = min(filter(None, [self.end, other.end]), default=None)
+        compiled.always = self.always and other.always
+        if self.always or other.always:
+            weekly = other.weekly if self.always else self.weekly
+            compiled.weekly = [list(interval) for interval in weekly]
+        else:
+            compiled.weekly, i, j = [], 0, 0
+            while i < len(self.weekly) and j < len(other.weekly):
+                start = max(self.weekly[i][0], other.weekly[j][0])
+                finish = min(self.weekly[i][1], other.weekly[j][1])
+                if finish > start:
+                    compiled.weekly.append([start, finish])
+                if self.weekly[i][1] < other.weekly[j][1]:
+                    i += 1
+                else:
+                    j += 1
+        compiled.weekly_starts = [start for start, _ in compiled.weekly]
+        return compiled
+
+    def in_dates(self, moment: datetime) -> bool:
+        return (self.start is None or moment >= self.start) and (
+            self.end is None or moment < self.end
+        )
+
+    def active(self, moment: datetime) -> bool:
+        """True if the media is active at the moment received"""
+        if not self.in_dates(moment):
+            return False
+        if self.always:
+            return True
+        position = bisect_right(self.weekly_starts, week_second(moment)) - 1
+        return position >= 0 and week_second(moment) < self.weekly[position][1]
+
+    def expired(self, moment: datetime) -> bool:
+        """True if the moment is after the endDate"""
+        return self.end is not None and moment >= self.end
+
+    def never_active(self) -> bool:
+        """True if there is no moment where the media can be active"""
+        if self.start and self.end and self.start >= self.end:
+            return True
+        if self.always:
+            return False
+        if not self.weekly:
+            return True
+        if self.start and self.end and self.end - self.start < timedelta(days=7):
+            day = self.start
+            while day < self.end:
+                offset = (day.weekday() + 1) % 7 * DAY_SECONDS
+                if any(s < offset + DAY_SECONDS and e > offset for s, e in self.weekly):
+                    return False
+                day += timedelta(days=1)
+            return True
+        return False
+
+
+class _Epoch(object):
+    """Range of dates of a playlist where the valid medias don't change,
+    with the segments of the week where the active medias don't change.
+    The schedules are keyed by tuples that end with the id of the media."""
+
+    def __init__(self, schedules: dict):
+        events = Counter()
+        always = set()
+        for key, compiled in schedules.items():
+            if compiled.always:
+                always.add(key)
+            for start, finish in compiled.weekly:
+                events[(start, key)] += 1
+                events[(finish, key)] -= 1
+        points = sorted({0} | {point for point, _ in events})
+        by_point = {}
+        for (point, key), delta in events.items():
+            by_point.setdefault(point, []).append((key, delta))
+
+        self.starts, self.actives = [], []
+        counter, current = Counter(), set(always)
+        for point in points:
+            if point >= WEEK_SECONDS:
+                break
+            for key, delta in by_point.get(point, []):
+                counter[key] += delta
+                if counter[key] > 0:
+                    current.add(key)
+                elif key not in always:
+                    current.discard(key)
+            active = frozenset(key[-1] for key in current)
+            if not self.actives or self.actives[-1] != active:
+                self.starts.append(point)
+                self.actives.append(active)
+
+    def active(self, second: int) -> frozenset:
+        return self.actives[bisect_right(self.starts, second) - 1]
+
+    def next_boundary(self, second: int) -> int or None:
+        """Seconds until the next segment of the week, None if the
+        active medias are the same the whole week"""
+        if len(self.starts) == 1:
+            return None
+        position = bisect_right(self.starts, second)
+        if position < len(self.starts):
+            return self.starts[position] - second
+        following = 1 if self.actives[-1] == self.actives[0] else 0
+        return self.starts[following] + WEEK_SECONDS - second
+
+
+class _Epochs(object):
+    """Epochs of a playlist, compiled only when they are consulted"""
+
+    def __init__(self, schedules: dict, starts: List[datetime]):
+        self.schedules = schedules
+        self.compiled = [None] * len(starts)
+        self.starts = starts
+
+    def __getitem__(self, position: int) -> _Epoch:
+        if self.compiled[position] is None:
+            start = self.starts[position]
+            self.compiled[position] = _Epoch({
+                key: compiled
+                for key, compiled in self.schedules.items()
+                if compiled.in_dates(start)
+            })
+        return self.compiled[position]
+
+
+class ScheduleEngine(object):
+    """
+    Schedules of all the medias compiled into interval structures, to
+    answer which medias of a playlist are active at a moment and when
+    the next change happens, with binary searches. In a playlist, the
+    schedule of a media is limited by the `contentSchedule` of the item
+    that contains it.
+
+    The weekday 0 of the schedules is considered sunday. The moments are
+    naive datetimes in the timezone of the account.
+
+    :param medias: Medias as returned by `get_medias()`.
+    :type medias: list, required
+    :param playlists: Playlists as returned by `get_playlists()`.
+    :type playlists: list, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from datetime import datetime
+    >>> from fouryousee.schedule import ScheduleEngine
+    >>> engine = ScheduleEngine(my.get_medias(), my.get_playlists())
+    >>> engine.active_medias(38, datetime(2021, 6, 26, 8, 0))
+    {1, 31, 55}
+    >>> engine.next_change(38, datetime(2021, 6, 26, 8, 0))
+    datetime.datetime(2021, 6, 26, 23, 0)
+
+    Simulating one week of programming of a playlist
+
+    >>> for start, end, medias in engine.timeline(38, datetime(2021, 6, 27), datetime(2021, 7, 4)):
+    ...     print(start, end, sorted(medias))
+
+    """
+
+    def __init__(self, medias: List[dict], playlists: List[dict] = None):
+        self.schedules = {
+            media["id"]: CompiledSchedule(media.get("schedule"))
+            for media in medias
+        }
+        self.flattener = PlaylistFlattener(playlists or [])
+        self._items = {}
+        self._epochs = {}
+
+    def medias_of_playlist(self, playlist_id: int) -> List[int]:
+        """Ids of the medias of a playlist, expanding sub-playlists. A
+        playlist that isn't in the listing has no medias."""
+        if playlist_id not in self.flattener.playlists:
+            return []
+        return self.flattener.media_ids(playlist_id)
+
+    def schedule_of(self, media_id: int) -> CompiledSchedule:
+        if media_id not in self.schedules:
+            self.schedules[media_id] = CompiledSchedule()
+        return self.schedules[media_id]
+
+    def schedules_of_item(self, playlist_id: int, index: int, item: dict) -> dict:
+        """Schedules of the medias of the item `index` of a playlist,
+        limited by the contentSchedules of the item, keyed by
+        (playlist id, index, position, media id)"""
+        if (playlist_id, index) not in self._items:
+            schedules = {}
+            for position, (media_id, contents) in enumerate(item_schedules(item)):
+                compiled = self.schedule_of(media_id)
+                for content in contents:
+                    compiled = compiled.intersection(CompiledSchedule(content))
+                schedules[(playlist_id, index, position, media_id)] = compiled
+            self._items[(playlist_id, index)] = schedules
+        return self._items[(playlist_id, index)]
+
+    def epochs(self, playlist_id: int) -> tuple:
+        """Boundaries of the ranges of dates of a playlist and their
+        compiled weeks"""
+        if playlist_id not in self._epochs:
+            schedules = {}
+            if playlist_id in self.flattener.playlists:
+                for owner, index, item in self.flattener.entries(playlist_id):
+                    schedules.update(self.schedules_of_item(owner, index, item))
+            bounds = sorted(
+                {c.start for c in schedules.values() if c.start}
+                | {c.end for c in schedules.values() if c.end}
+            )
+            starts = [datetime.min] + bounds
+            self._epochs[playlist_id] = (starts, _Epochs(schedules, starts))
+        return self._epochs[playlist_id]
+
+    def is_active(self, media_id: int, moment: datetime) -> bool:
+        """True if the media is active at the moment received"""
+        return self.schedule_of(media_id).active(moment)
+
+    def active_medias(self, playlist_id: int, moment: datetime) -> frozenset:
+        """Ids of the medias of the playlist active at the moment"""
+        starts, epochs = self.epochs(playlist_id)
+        epoch = epochs[bisect_right(starts, moment) - 1]
+        return epoch.active(week_second(moment))
+
+    def active_medias_at(self, playlist_id: int,
+                         moments: Iterable[datetime]) -> List[frozenset]:
+        """Evaluate the playlist at many moments in one call, returning
+        the active medias in the same order of the moments"""
+        starts, epochs = self.epochs(playlist_id)
+        moments = list(moments)
+        result = [None] * len(moments)
+        position = 0
+        for index in sorted(range(len(moments)), key=moments.__getitem__):
+            moment = moments[index]
+            while position + 1 < len(starts) and starts[position + 1] <= moment:
+                position += 1
+            result[index] = epochs[position].active(week_second(moment))
+        return result
+
+    def _next_boundary(self, playlist_id: int, moment: datetime) -> datetime or None:
+        starts, epochs = self.epochs(playlist_id)
+        position = bisect_right(starts, moment) - 1
+        limit = starts[position + 1] if position + 1 < len(starts) else None
+        delta = epochs[position].next_boundary(week_second(moment))
+        candidate = None
+        if delta is not None:
+            candidate = moment.replace(microsecond=0) + timedelta(seconds=delta)
+        if limit and (candidate is None or limit < candidate):
+            return limit
+        return candidate
+
+    def changes(self, playlist_id: int, moment: datetime) -> Iterator[tuple]:
+        """Yield (moment, active medias) every time the active medias of
+        the playlist change after the moment received"""
+        current = self.active_medias(playlist_id, moment)
+        while True:
+            moment = self._next_boundary(playlist_id, moment)
+            if moment is None:
+                return
+            active = self.active_medias(playlist_id, moment)
+            if active != current:
+                current = active
+                yield moment, active
+
+    def next_change(self, playlist_id: int, moment: datetime) -> datetime or None:
+        """Moment when the active medias of the playlist change, None if
+        they won't change anymore"""
+        return next(self.changes(playlist_id, moment), (None, None))[0]
+
+    def timeline(self, playlist_id: int, start: datetime, end: datetime) -> List[tuple]:
+        """Segments (start, end, active medias) of the playlist between
+        two moments"""
+        segments = []
+        moment, active = start, self.active_medias(playlist_id, start)
+        for following, following_active in self.changes(playlist_id, start):
+            if following >= end:
+                break
+            segments.append((moment, following, active))
+            moment, active = following, following_active
+        segments.append((moment, end, active))
+        return segments
+
+
+def find_expired(medias: List[dict], playlists: List[dict] = None,
+                 moment: datetime = None) -> dict:
+    """
+    Evaluate the schedules of all the medias in one pass and find the
+    medias after their `endDate`, the medias that can never be active and
+    the playlists where all the items are expired. An item is expired when
+    its medias are, or when its `contentSchedule` leaves them no moment
+    to be active anymore. The carousels are never expired, since they
+    play a category of medias.
+
+    :param medias: Medias as returned by `get_medias()`.
+    :type medias: list, required
+    :param playlists: Playlists as returned by `get_playlists()`.
+    :type playlists: list, optional
+    :param moment: Moment of reference, default value is the current time.
+    :type moment: datetime, optional
+    :return: Dict with the ids of `expiredMedias`, `neverActiveMedias`,
+            `expiredPlaylists` and, by playlist, the indexes of the
+            `expiredItems`.
+    :rtype: dict
+
+    **Usage**
+
+    >>> from fouryousee.schedule import find_expired
+    >>> find_expired(my.get_medias(), my.get_playlists())
+    {
+       'expiredMedias': [1, 99],
+       'neverActiveMedias': [120],
+       'expiredPlaylists': [75],
+       'expiredItems': {38: [2], 75: [0, 1]}
+    }
+
+    """
+    moment = moment or datetime.now()
+    expired, never, schedules = set(), set(), {}
+    for media in medias:
+        compiled = schedules[media["id"]] = CompiledSchedule(media.get("schedule"))
+        if compiled.expired(moment):
+            expired.add(media["id"])
+        elif compiled.never_active():
+            never.add(media["id"])
+    dead = expired | never
+
+    def is_dead(media_id: int, contents: tuple) -> bool:
+        if media_id in dead:
+            return True
+        if not contents:
+            return False
+        compiled = schedules.get(media_id) or CompiledSchedule()
+        for content in contents:
+            compiled = compiled.intersection(CompiledSchedule(content))
+        return compiled.expired(moment) or compiled.never_active()
+
+    expired_items, expired_playlists = {}, []
+    for playlist in playlists or []:
+        indexes, alive = [], False
+        for index, item in enumerate(playlist.get("items") or []):
+            if item.get("type") == "layout":
+                continue
+            if item.get("type") == "carousel":
+                # It plays a category, that stays even if its medias expire
+                alive = True
+                continue
+            entries = item_schedules(item)
+            if entries and all(is_dead(*entry) for entry in entries):
+                indexes.append(index)
+            else:
+                alive = True
+        if indexes:
+            expired_items[playlist["id"]] = indexes
+            if not alive:
+                expired_playlists.append(playlist["id"])
+
+    return dict(
+        expiredMedias=sorted(expired),
+        neverActiveMedias=sorted(never),
+        expiredPlaylists=sorted(expired_playlists),
+        expiredItems=expired_items,
+    )
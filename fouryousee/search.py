@@ -0,0 +1,225 @@
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from pathlib import Path
+from typing import List
+
+NGRAM = 3
+MAX_PREFIX = 20
+
+
+def normalize(text) -> str:
+    """Lowercase the text and remove its accents"""
+    text = unicodedata.normalize("NFKD", str(text or "")).lower()
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text) -> List[str]:
+    """Words of a text, normalized"""
+    return re.findall(r"[^\W_]+", normalize(text))
+
+
+def ngrams(text: str) -> set:
+    """Substrings of `NGRAM` characters of a normalized text"""
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def media_fields(media: dict) -> dict:
+    """Searchable fields of a media, for the shape returned by
+    `get_medias()` and by `add_media()`/`edit_media()`"""
+    fields = {}
+    if "name" in media:
+        fields["name"] = media["name"] or ""
+    if "description" in media:
+        fields["description"] = media["description"] or ""
+    if "categories" in media:
+        fields["categories"] = [
+            c["id"] if isinstance(c, dict) else int(c) for c in media["categories"] or []
+        ]
+    if "durationInSeconds" in media or "duration" in media:
+        fields["duration"] = int(media.get("durationInSeconds", media.get("duration")) or 0)
+    if media.get("file") and isinstance(media["file"], str):
+        fields["fileType"] = Path(media["file"]).suffix.lstrip(".").lower()
+    return fields
+
+
+class MediaSearchIndex(object):
+    """
+    In-memory search index of the media library. The words of the name
+    and the description are indexed by prefix, for type-ahead, and by
+    substrings of 3 characters, for the same partial matches as
+    `get_medias(name=...)`. Categories, file types and durations are
+    indexed as facets. The index is updated one media at a time, so it
+    doesn't need to be built again after every change.
+
+    :param medias: Medias as returned by `get_medias()`.
+    :type medias: list, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> index = my.get_search_index()
+    >>> [m['name'] for m in index.search('sams')]
+    ['samsung_A80', 'audifonos_samsung']
+    >>> [m['id'] for m in index.search('sung', substring=True, category=27)]
+    [55]
+    >>> [m['id'] for m in index.search(file_type='mp4', max_duration=20)]
+    [4, 1, 55]
+    >>> index.facets(index.search('samsung'))
+    {'categories': {27: 2}, 'fileTypes': {'mp4': 2}}
+
+    """
+
+    def __init__(self, medias: List[dict] = None):
+        self.medias = {}
+        self.fields = {}
+        self.prefixes = defaultdict(set)
+        self.grams = defaultdict(set)
+        self.categories = defaultdict(set)
+        self.file_types = defaultdict(set)
+        self.durations = []
+        for media in medias or []:
+            self.add(media)
+
+    def _keys(self, fields: dict) -> tuple:
+        """Prefixes and n-grams of the texts of a media"""
+        texts = [fields.get("name", ""), fields.get("description", "")]
+        prefixes, grams = set(), set()
+        for text in texts:
+            for token in tokenize(text):
+                prefixes.update(token[:i] for i in range(1, min(len(token), MAX_PREFIX) + 1))
+            grams |= ngrams(normalize(text))
+        return prefixes, grams
+
+    def add(self, media: dict):
+        """Index a new media, or update one that is already indexed
+        with the fields received"""
+        media_id = media["id"]
+        fields = media_fields(media)
+        if "name" in fields and "description" not in fields:
+            # The API uses the name as description of the medias
+            fields["description"] = fields["name"]
+            media = dict(media, description=fields["name"])
+        if media_id in self.medias:
+            fields = dict(self.fields[media_id], **fields)
+            media = dict(self.medias[media_id], **media)
+            self.remove(media_id)
+        fields.setdefault("name", "")
+        fields.setdefault("description", "")
+        fields["sortName"] = normalize(fields["name"])
+        self.medias[media_id] = media
+        self.fields[media_id] = fields
+
+        prefixes, grams = self._keys(fields)
+        for prefix in prefixes:
+            self.prefixes[prefix].add(media_id)
+        for gram in grams:
+            self.grams[gram].add(media_id)
+        for category in fields.get("categories", []):
+            self.categories[category].add(media_id)
+        if fields.get("fileType"):
+            self.file_types[fields["fileType"]].add(media_id)
+        insort(self.durations, (fields.get("duration", 0), media_id))
+
+    update = add
+
+    def remove(self, media_id: int):
+        """Remove a media from the index"""
+        if media_id not in self.medias:
+            return
+        fields = self.fields.pop(media_id)
+        del self.medias[media_id]
+        prefixes, grams = self._keys(fields)
+        for keys, index in ((prefixes, self.prefixes), (grams, self.grams),
+                            (fields.get("categories", []), self.categories),
+                            ([fields.get("fileType")], self.file_types)):
+            for key in keys:
+                if key in index:
+                    index[key].discard(media_id)
+                    if not index[key]:
+                        del index[key]
+        position = bisect_left(self.durations, (fields.get("duration", 0), media_id))
+        del self.durations[position]
+
+    def _substring(self, text: str) -> set:
+        """Ids of the medias whose name or description contains the text"""
+        text = normalize(text)
+        grams = ngrams(text)
+        if grams:
+            candidates = set.intersection(*(self.grams.get(g, set()) for g in grams))
+        else:
+            candidates = set(self.medias)
+        return {
+            media_id for media_id in candidates
+            if text in normalize(self.fields[media_id]["name"])
+            or text in normalize(self.fields[media_id]["description"])
+        }
+
+    def search(self, text: str = None, substring: bool = False, category: int = None,
+               file_type: str = None, min_duration: int = None,
+               max_duration: int = None, limit: int = None) -> List[dict]:
+        """
+        Medias that match the text and all the facets received, sorted
+        by name.
+
+        :param text: Words to look for. By default every word must be the
+                beginning of a word of the name or the description.
+        :type text: str, optional
+        :param substring: True to look for the text in any part of the
+                name or the description, like `get_medias(name=...)`.
+        :type substring: bool, optional
+        :param category: Id of a media category.
+        :type category: int, optional
+        :param file_type: Extension of the file, like "mp4" or "zip".
+        :type file_type: str, optional
+        :param min_duration: Minimum duration in seconds.
+        :type min_duration: int, optional
+        :param max_duration: Maximum duration in seconds.
+        :type max_duration: int, optional
+        :param limit: Maximum number of medias to return.
+        :type limit: int, optional
+        :return: List of dicts where every dict depicts a media.
+        :rtype: list
+        """
+        sets = []
+        if text and substring:
+            sets.append(self._substring(text))
+        elif text:
+            sets.extend(self.prefixes.get(t[:MAX_PREFIX], set()) for t in tokenize(text))
+        if category is not None:
+            sets.append(self.categories.get(int(category), set()))
+        if file_type:
+            sets.append(self.file_types.get(file_type.lstrip(".").lower(), set()))
+        if min_duration is not None or max_duration is not None:
+            low = bisect_left(self.durations, (min_duration or 0, float("-inf")))
+            high = len(self.durations) if max_duration is None else \
+                bisect_right(self.durations, (max_duration, float("inf")))
+            sets.append({media_id for _, media_id in self.durations[low:high]})
+
+        if sets:
+            sets.sort(key=len)
+            found = set(sets[0]).intersection(*sets[1:])
+        else:
+            found = set(self.medias)
+        key = lambda media_id: (self.fields[media_id]["sortName"], media_id)  # noqa: E731
+        if limit is None:
+            result = sorted(found, key=key)
+        else:
+            result = heapq.nsmallest(limit, found, key=key)
+        return [self.medias[media_id] for media_id in result]
+
+    def facets(self, medias: List[dict] = None) -> dict:
+        """Number of medias by category and by file type, of the medias
+        received or of all the library"""
+        ids = self.medias if medias is None else [m["id"] for m in medias]
+        categories, file_types = defaultdict(int), defaultdict(int)
+        for media_id in ids:
+            fields = self.fields[media_id]
+            for category in fields.get("categories", []):
+                categories[category] += 1
+            if fields.get("fileType"):
+                file_types[fields["fileType"]] += 1
+        return {"categories": dict(categories), "fileTypes": dict(file_types)}
@@ -0,0 +1,126 @@
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import List
+
+DAYS = 7
+EMPTY = 0
+
+
+class SlotMatrix(object):
+    """
+    Matrix of the playlists of the fleet, one row per player and one
+    column per day of the week (starting from 0), stored as a flat array
+    of playlist ids where 0 is an empty slot. The queries run over the
+    columns of the array instead of the nested dicts of every player.
+
+    :param players: Players as returned by `get_players()`.
+    :type players: list, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> matrix = my.get_slot_matrix()
+    >>> matrix.players_of(38, day=6)  # Who plays the playlist 38 on Saturday?
+    [1, 2]
+    >>> matrix.unused([p['id'] for p in my.get_playlists()])
+    [40, 41]
+
+    Changing the slots locally and then editing only the players changed
+
+    >>> planned = matrix.copy()
+    >>> planned.assign(my.get_group_index().players_of(2), 41, days=[0, 6])
+    >>> planned.diff(matrix)
+    [{'player': 2, 'day': 0, 'before': 39, 'after': 41}, ...]
+    >>> my.apply_slot_matrix(planned)
+    {'editedPlayers': [2, 3], 'errors': {}}
+
+    """
+
+    def __init__(self, players: List[dict] = None):
+        self.player_ids = []
+        self.rows = {}
+        self.cells = array("q")
+        for player in players or []:
+            slots = player.get("playlists") or {}
+            self.rows[player["id"]] = len(self.player_ids)
+            self.player_ids.append(player["id"])
+            self.cells.extend(
+                (slots.get(str(day)) or {}).get("id") or EMPTY for day in range(DAYS)
+            )
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def copy(self) -> "SlotMatrix":
+        """Independent copy of the matrix"""
+        matrix = SlotMatrix()
+        matrix.player_ids = list(self.player_ids)
+        matrix.rows = dict(self.rows)
+        matrix.cells = array("q", self.cells)
+        return matrix
+
+    def row(self, player_id: int) -> List[int]:
+        """Playlist ids of a player, from day 0 to day 6"""
+        start = self.rows[player_id] * DAYS
+        return self.cells[start:start + DAYS].tolist()
+
+    def column(self, day: int) -> array:
+        """Playlist ids of a day, in the order of `player_ids`"""
+        return self.cells[day::DAYS]
+
+    def players_of(self, playlist_id: int, day: int = None) -> List[int]:
+        """Players that have the playlist in the day received, or in
+        any day"""
+        if day is not None:
+            return list(compress(self.player_ids, map(playlist_id.__eq__, self.column(day))))
+        positions = compress(range(len(self.cells)), map(playlist_id.__eq__, self.cells))
+        return [self.player_ids[i] for i in sorted({p // DAYS for p in positions})]
+
+    def playlists(self) -> set:
+        """Ids of the playlists assigned to any slot"""
+        return set(self.cells) - {EMPTY}
+
+    def unused(self, playlist_ids: List[int]) -> List[int]:
+        """Playlists of the ones received that aren't assigned to any slot"""
+        return sorted(set(playlist_ids) - self.playlists())
+
+    def counts(self, day: int = None) -> Counter:
+        """Number of slots of every playlist, in one day or in the week"""
+        counts = Counter(self.cells if day is None else self.column(day))
+        counts.pop(EMPTY, None)
+        return counts
+
+    def assign(self, player_ids: List[int], playlist_id: int, days: List[int] = None):
+        """Put a playlist in the slots of the players received"""
+        days = range(DAYS) if days is None else days
+        for player_id in player_ids:
+            start = self.rows[player_id] * DAYS
+            for day in days:
+                self.cells[start + int(day)] = playlist_id or EMPTY
+
+    def diff(self, previous: "SlotMatrix") -> List[dict]:
+        """Slots that changed from a previous matrix. The players that
+        are only in one of the matrices are compared with empty slots."""
+        changes = []
+        for player_id in self.player_ids + [p for p in previous.player_ids if p not in self.rows]:
+            before = previous.row(player_id) if player_id in previous.rows else [EMPTY] * DAYS
+            after = self.row(player_id) if player_id in self.rows else [EMPTY] * DAYS
+            if before != after:
+                changes.extend(
+                    dict(player=player_id, day=day, before=b, after=a)
+                    for day, (b, a) in enumerate(zip(before, after)) if b != a
+                )
+        return changes
+
+    def changed_players(self, previous: "SlotMatrix") -> dict:
+        """The `playlists` param of `edit_player` for every player whose
+        slots are different from the previous matrix"""
+        return {
+            player_id: dict(playlists={
+                str(day): playlist_id or None for day, playlist_id in enumerate(self.row(player_id))
+            })
+            for player_id in self.player_ids
+            if player_id in previous.rows and self.row(player_id) != previous.row(player_id)
+        }
@@ -0,0 +1,116 @@
+from typing import List
+
+from fouryousee.graph import VIDEOWALL_TYPES
+
+
+def compile_cell(cell: dict) -> dict:
+    """Reference to the media of a cell, keeping its contentSchedule"""
+    compiled = dict(type="media", id=cell["id"])
+    if cell.get("contentSchedule"):
+        compiled["contentSchedule"] = cell["contentSchedule"]
+    return compiled
+
+
+class VideowallCompiler(object):
+    """
+    Local validation of the videowall items of a playlist before sending
+    it to the API. The grid is checked in one pass: it must be
+    rectangular and every cell must reference a media of the library.
+    Optionally, the durations of the cells must line up, since the
+    videowall plays all of them at the same time.
+
+    :param medias: Medias as returned by `get_medias()`. Without medias
+            the ids aren't checked and the durations are taken from the cells.
+    :type medias: list, optional
+    :param tolerance: Seconds of difference allowed between the durations
+            of the cells. Default value is None, the durations aren't checked.
+    :type tolerance: int, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from fouryousee.videowall import VideowallCompiler
+    >>> compiler = VideowallCompiler(my.get_medias(), tolerance=0)
+    >>> compiler.compile({'type': 'videowall',
+    ...                   'grid': [[{'id': 4}, {'id': 1}], [{'id': 2}, {'id': 4}]]})
+    {'type': 'videowall', 'abortIfError': False, 'ignoreLayout': False,
+     'grid': [[{'type': 'media', 'id': 4}, {'type': 'media', 'id': 1}],
+              [{'type': 'media', 'id': 2}, {'type': 'media', 'id': 4}]]}
+    >>> compiler.errors({'type': 'videowall', 'grid': [[{'id': 4}, {'id': 999}], [{'id': 31}]]})
+    ['Row 1 has 1 cells instead of 2',
+     'Cell (0, 1) references the media 999, that was not found',
+     'Durations of the cells are different: 10s in (0, 0), 30s in (1, 0)']
+
+    """
+
+    def __init__(self, medias: List[dict] = None, tolerance: int = None):
+        self.medias = None if medias is None else {
+            m["id"]: m.get("durationInSeconds") for m in medias
+        }
+        self.tolerance = tolerance
+
+    def errors(self, item: dict) -> List[str]:
+        """Problems found in a videowall item, empty if it's valid"""
+        grid = item.get("grid")
+        if not isinstance(grid, list) or not grid:
+            return ["The grid must be a non empty list of rows"]
+
+        errors, durations = [], {}
+        width = len(grid[0]) if isinstance(grid[0], list) else 0
+        for y, row in enumerate(grid):
+            if not isinstance(row, list) or not row:
+                errors.append(f"Row {y} must be a non empty list of cells")
+                continue
+            if len(row) != width:
+                errors.append(f"Row {y} has {len(row)} cells instead of {width}")
+            for x, cell in enumerate(row):
+                media_id = cell.get("id") if isinstance(cell, dict) else None
+                if not isinstance(media_id, int) or cell.get("type", "media") != "media":
+                    errors.append(f"Cell ({y}, {x}) must be a media with an id")
+                elif self.medias is not None and media_id not in self.medias:
+                    errors.append(f"Cell ({y}, {x}) references the media {media_id}, that was not found")
+                else:
+                    duration = self.medias.get(media_id) if self.medias is not None \
+                        else cell.get("durationInSeconds")
+                    if duration:
+                        durations[(y, x)] = duration
+
+        if self.tolerance is not None and durations \
+                and max(durations.values()) - min(durations.values()) > self.tolerance:
+            shortest = min(durations, key=durations.get)
+            longest = max(durations, key=durations.get)
+            errors.append(
+                "Durations of the cells are different: "
+                f"{durations[shortest]}s in {shortest}, {durations[longest]}s in {longest}"
+            )
+        return errors
+
+    def compile(self, item: dict) -> dict:
+        """Normalized payload of a videowall item, where the cells are
+        reduced to the media references with their contentSchedule and
+        the other keys of the item are kept. An exception with all the problems found is raised if it's
+        not valid."""
+        errors = self.errors(item)
+        if errors:
+            raise Exception("Invalid videowall: {}".format("; ".join(errors)))
+        return dict(
+            item,
+            type=item.get("type", "videowall"),
+            abortIfError=bool(item.get("abortIfError", False)),
+            ignoreLayout=bool(item.get("ignoreLayout", False)),
+            grid=[[compile_cell(cell) for cell in row] for row in item["grid"]],
+        )
+
+    def compile_items(self, items: List[dict]) -> List[dict]:
+        """Items of a playlist with its videowalls compiled. The
+        exception raised tells the position of the invalid item."""
+        compiled = []
+        for index, item in enumerate(items):
+            if isinstance(item, dict) and item.get("type") in VIDEOWALL_TYPES:
+                try:
+                    item = self.compile(item)
+                except Exception as e:
+                    raise Exception(f"Item {index}: {e}")
+            compiled.append(item)
+        return compiled
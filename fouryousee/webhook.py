@@ -0,0 +1,238 @@
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PENDING_STATUS = ["waiting", "processing"]
+
+
+class ReportWebhookReceiver(object):
+    """
+    Embeddable HTTP server that receives the POST sent by 4YouSee
+    when a requested report is ready.
+
+    Every pending report is represented by a
+    :class:`concurrent.futures.Future` that is resolved with the report
+    dict once the callback arrives. If the callback doesn't arrive before
+    the deadline, the report is consulted with `get_reports(id=...)`
+    until it is ready.
+
+    :param client: Object of :class:`FouryouseeAPI` used to request
+            the reports and to poll them as fallback.
+    :type client: FouryouseeAPI, optional
+    :param host: Interface where the server will listen. Default value is
+            127.0.0.1, use 0.0.0.0 to be reached from other machines.
+    :type host: str, optional
+    :param port: Port where the server will listen. 0 picks a free port.
+    :type port: int, optional
+    :param public_url: Url through the 4YouSee servers reach this receiver
+            **Ex.**: http://4fc8e5ddf059.ngrok.io. Default value is the
+            local address of the server.
+    :type public_url: str, optional
+    :param poll_interval: Seconds between every consult of the fallback.
+    :type poll_interval: int, optional
+    :param deadline: Seconds that `wait` expects the callback before
+            starting the fallback, when it doesn't receive a `timeout`.
+            None waits the callback forever.
+    :type deadline: float, optional
+    :param secret: Last part of the path of the webhook. The POSTs sent to
+            other paths are rejected, so only who knows the url can
+            resolve the reports.
+    :type secret: str, optional
+    :param max_received: Reports kept when they arrive before being
+            registered. The oldest ones are discarded first.
+    :type max_received: int, optional
+    :param received_ttl: Seconds that a report is kept when it arrives
+            before being registered.
+    :type received_ttl: int, optional
+
+    **Usage**
+
+    Once "**my**" object has been created. You can execute the next:
+
+    >>> from fouryousee.webhook import ReportWebhookReceiver
+    >>> import secrets
+    >>> with ReportWebhookReceiver(my, port=8000, secret=secrets.token_urlsafe(16),
+    ...                            public_url='http://4fc8e5ddf059.ngrok.io') as receiver:
+    ...     future = receiver.request_report(filter={
+    ...                                              "startDate": "2020-07-26",
+    ...                                              "startTime": "00:00:00",
+    ...                                              "endDate": "2020-08-24",
+    ...                                              "endTime": "23:59:59"})
+    ...     report = receiver.wait(future.report_id, timeout=600)
+    >>> report['status'], report['url']
+    ('success', 'https://4yousee-playlogs-reports.s3.amazonaws.com/...62bb067d43ac1.gz')
+
+    """
+
+    def __init__(self, client=None, host="127.0.0.1", port=0,
+                 public_url=None, poll_interval=30, secret=None,
+                 max_received=1000, received_ttl=3600, deadline=600):
+        self.client = client
+        self.host = host
+        self.port = port
+        self.public_url = public_url
+        self.poll_interval = poll_interval
+        self.deadline = deadline
+        self.secret = secret
+        self.max_received = max_received
+        self.received_ttl = received_ttl
+        self.pending = {}
+        self.received = OrderedDict()
+        self.lock = threading.Lock()
+        self.server = None
+        self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """Url to send as `webhook` on `request_report`, including
+        the secret."""
+        if self.public_url:
+            url = self.public_url.rstrip("/") + "/"
+        elif not self.server:
+            raise Exception("The receiver has not been started.")
+        else:
+            host, port = self.server.server_address[:2]
+            if host == "0.0.0.0":
+                host = "127.0.0.1"
+            url = f"http://{host}:{port}/"
+        return url + (self.secret or "")
+
+    def authorized(self, path: str) -> bool:
+        """True if the path of a POST ends with the secret"""
+        if not self.secret:
+            return True
+        last = path.split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+        return hmac.compare_digest(last.encode(), self.secret.encode())
+
+    def start(self):
+        """Start listening on a daemon thread."""
+        if self.server:
+            return self
+        self.server = ThreadingHTTPServer(
+            (self.host, self.port), _handler_for(self)
+        )
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server. The pending futures are kept."""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server, self.thread = None, None
+
+    def register(self, report_id: int) -> Future:
+        """Return the future that will be resolved with the report
+        that has the id received."""
+        report_id = int(report_id)
+        with self.lock:
+            if report_id in self.pending:
+                return self.pending[report_id]
+            future = Future()
+            future.report_id = report_id
+            self._expire()
+            if report_id in self.received:
+                future.set_result(self.received.pop(report_id)[1])
+            else:
+                self.pending[report_id] = future
+            return future
+
+    def resolve(self, report: dict) -> bool:
+        """Resolve the future of a report. Reports that arrive before
+        being registered are kept until `register` is called. Return
+        False if the report is still pending."""
+        if not isinstance(report, dict) or "id" not in report:
+            return False
+        if report.get("status") in PENDING_STATUS:
+            return False
+        with self.lock:
+            future = self.pending.pop(int(report["id"]), None)
+            if future is None:
+                self.received.pop(int(report["id"]), None)
+                self.received[int(report["id"])] = (time.monotonic(), report)
+                self._expire()
+                return True
+        if future.done():
+            return False
+        future.set_result(report)
+        return True
+
+    def _expire(self):
+        """Discard the reports received before being registered that
+        are too old or exceed `max_received`. Called holding the lock."""
+        limit = time.monotonic() - self.received_ttl
+        while self.received and (
+            len(self.received) > self.max_received
+            or next(iter(self.received.values()))[0] < limit
+        ):
+            self.received.popitem(last=False)
+
+    def request_report(self, **kwargs) -> Future:
+        """Request a report sending the url of this receiver as
+        `webhook` and register it. It receives the same params as
+        `request_report`."""
+        if not self.client:
+            raise Exception("Missing client to request the report.")
+        kwargs["webhook"] = kwargs.get("webhook", self.url)
+        report = self.client.request_report(**kwargs)
+        future = self.register(report["id"])
+        self.resolve(report)
+        return future
+
+    def wait(self, report_id: int, timeout: float = None) -> dict:
+        """Wait the callback of the report until the `timeout` in seconds,
+        by default the `deadline` of the receiver, then consult
+        `get_reports(id=...)` every `poll_interval` seconds until the
+        report is ready."""
+        future = self.register(report_id)
+        try:
+            return future.result(timeout=self.deadline if timeout is None else timeout)
+        except TimeoutError:
+            if not self.client:
+                raise
+        while not future.done():
+            self.resolve(self.client.get_reports(id=report_id))
+            if not future.done():
+                time.sleep(self.poll_interval)
+        return future.result()
+
+
+def _handler_for(receiver: ReportWebhookReceiver):
+    """Build the request handler bound to a receiver"""
+
+    class ReportWebhookHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if not receiver.authorized(self.path):
+                self.send_response(404)
+                self.end_headers()
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                report = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+            receiver.resolve(report)
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReportWebhookHandler
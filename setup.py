@@ -136,5 +136,8 @@ setup(
     install_requires=[
         'requests'
     ],
+    extras_require={
+        'parquet': ['pyarrow']
+    },
     zip_safe=False,
 )
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from fouryousee.fouryousee import FouryouseeAPI
+
+
+def unexpected(method):
+    return lambda resource, payload=None: pytest.fail(f"Unexpected {method} {resource}")
+
+
+@pytest.fixture
+def offline_client(monkeypatch):
+    """Build clients that never reach the API: the listings received are
+    cached, a GET fails the test and every PUT, POST and DELETE is
+    recorded in `requests` as (resource, payload) and answered by the
+    callable received, which takes the resource and the decoded payload"""
+
+    def build(edit=None, post=None, delete=None, **cached) -> FouryouseeAPI:
+        my = FouryouseeAPI("token")
+        for name, listing in cached.items():
+            setattr(my, name, list(listing))
+        my.requests = []
+
+        def recorded(answer):
+            def send(resource, payload=None):
+                payload = json.loads(payload) if isinstance(payload, str) else payload
+                my.requests.append((resource, payload))
+                return answer(resource, payload)
+            return send
+
+        monkeypatch.setattr(my, "get_all", lambda *args, **kwargs: pytest.fail("Unexpected GET"))
+        monkeypatch.setattr(my, "edit", recorded(edit or unexpected("PUT")))
+        monkeypatch.setattr(my, "post", recorded(post or unexpected("POST")))
+        monkeypatch.setattr(my, "delete", recorded(delete or unexpected("DELETE")))
+        return my
+
+    return build
@@ -0,0 +1,72 @@
+"""Listings of a small account used by the tests of the local indexes"""
+
+MEDIAS = [
+    {"id": 1, "name": "4YouSee Play", "description": "4YouSee Play", "file": "i_1.mp4",
+     "durationInSeconds": 10, "categories": [{"id": 1, "name": "DEMO"}, {"id": 3, "name": "Imagenes"}],
+     "schedule": {"startDate": "2021-06-25", "endDate": "2021-06-30", "times": [
+         {"startTime": "06:00", "endTime": "23:00", "weekDays": [0, 2, 3, 5]},
+         {"startTime": "09:00", "endTime": "23:00", "weekDays": [1, 4, 6]}]}},
+    {"id": 4, "name": "4YouSee Analyse", "description": "4YouSee Analyse", "file": "i_4.mp4",
+     "durationInSeconds": 10, "categories": [{"id": 1, "name": "DEMO"}],
+     "schedule": {"startDate": "None", "endDate": "None", "times": []}},
+    {"id": 31, "name": "Gopro", "description": "Gopro", "file": "i_31.mp4",
+     "durationInSeconds": 30, "categories": [{"id": 2, "name": "Sample name via API"}],
+     "schedule": {"startDate": "None", "endDate": "None", "times": []}},
+    {"id": 55, "name": "samsung_A80", "description": "samsung A80", "file": "i_55.mp4",
+     "durationInSeconds": 10, "categories": [{"id": 2, "name": "Sample name via API"}],
+     "schedule": {"startDate": "2022-06-01", "endDate": "None", "times": []}},
+    {"id": 56, "name": "audifonos_samsung", "description": "audifonos", "file": "i_56.zip",
+     "durationInSeconds": 10, "categories": [{"id": 16, "name": "Semana 1"}],
+     "schedule": {"startDate": "None", "endDate": "None", "times": []}},
+]
+
+PLAYLISTS = [
+    {"id": 38, "name": "Player DEMO", "durationInSeconds": 70, "isSubPlaylist": False, "category": None,
+     "items": [
+         {"type": "news", "durationInSeconds": 10},
+         {"type": "media", "id": 55, "name": "samsung_A80", "file": "i_55.mp4", "durationInSeconds": 10},
+         {"type": "media", "id": 31, "name": "Gopro", "file": "i_31.mp4", "durationInSeconds": 30},
+         {"type": "subPlaylist", "id": 40, "name": "Sub"},
+     ],
+     "sequence": [0, 1, 2, 0, 3]},
+    {"id": 39, "name": "Videowall", "durationInSeconds": 20, "isSubPlaylist": False,
+     "category": {"id": 1, "name": "Main Category"},
+     "items": [
+         {"type": "layout", "id": 1, "name": "Grid 1920x1080 com 1 area", "width": 1920, "height": 1080},
+         {"type": "videoWall", "abortIfError": False, "ignoreLayout": False, "grid": [
+             [{"id": 4, "durationInSeconds": 10}, {"id": 1, "durationInSeconds": 10}],
+             [{"id": 1, "durationInSeconds": 10}, {"id": 4, "durationInSeconds": 10}]]},
+         {"type": "media", "id": 1, "name": "4YouSee Play", "file": "i_1.mp4", "durationInSeconds": 10},
+     ],
+     "sequence": [0, 1, 2]},
+    {"id": 40, "name": "Sub", "durationInSeconds": 20, "isSubPlaylist": True, "category": None,
+     "items": [
+         {"type": "media", "id": 56, "name": "audifonos_samsung", "file": "i_56.zip", "durationInSeconds": 10},
+         {"type": "carousel", "id": 16, "name": "Semana 1", "items": [
+             {"id": 1, "durationInSeconds": 10}], "sequence": [1]},
+     ],
+     "sequence": [0, 1]},
+    {"id": 41, "name": "Unused", "durationInSeconds": 10, "isSubPlaylist": False, "category": None,
+     "items": [{"type": "media", "id": 55, "name": "samsung_A80", "file": "i_55.mp4", "durationInSeconds": 10}],
+     "sequence": [0]},
+]
+
+
+def player(id, name, playlists, group=1, platform="ANDROID", audio=None, contact=1, status=(1, "Online")):
+    return {
+        "id": id, "name": name, "description": "", "platform": platform,
+        "lastContactInMinutes": contact,
+        "group": {"id": group, "name": "Group {}".format(group)},
+        "playerStatus": {"id": status[0], "name": status[1], "time": 10},
+        "playlists": {str(day): {"id": plist, "name": "Playlist {}".format(plist)}
+                      for day, plist in enumerate(playlists)},
+        "audios": {"0": {"id": audio, "name": "Audio {}".format(audio)} if audio else None},
+        "lastLogReceived": "2022-07-01 16:46:33",
+    }
+
+
+PLAYERS = [
+    player(1, "Player DEMO", [38] * 7, audio=40),
+    player(2, "Sample name via API", [39] * 6 + [38], group=2, platform="SAMSUNG"),
+    player(3, "Store 3", [39] * 7, group=2, platform="LG", contact=9000, status=(5, "Local assist needed")),
+]
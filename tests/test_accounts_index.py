@@ -0,0 +1,48 @@
+from fouryousee.pool import AccountsIndex, ClientPool
+from tests.resources_for_tests.fleet import MEDIAS, PLAYERS, player
+
+
+def fake_pool():
+    """Pool whose clients answer local listings"""
+    pool = ClientPool({"store-a": "token-a", "store-b": "token-b", "broken": "token-c"})
+    pool["store-a"].get_players = lambda: PLAYERS
+    pool["store-a"].get_medias = lambda: MEDIAS
+    pool["store-b"].get_players = lambda: [player(1, "Lobby", [7] * 7, platform="LG", contact=45)]
+    pool["store-b"].get_medias = lambda: MEDIAS[:2]
+
+    def broken():
+        raise Exception("Invalid token")
+
+    pool["broken"].get_players = broken
+    pool["broken"].get_medias = broken
+    return pool
+
+
+def test_refresh_tags_the_account():
+    """Test the records of every account are merged and tagged"""
+    index = AccountsIndex(fake_pool())
+    assert index.refresh() == {"broken": "Invalid token"}
+    assert len(index.records["players"]) == 4
+    assert [p["account"] for p in index.filter("players", id=1)] == ["store-a", "store-b"]
+    assert "account" not in PLAYERS[0]
+
+
+def test_fleet_wide_filters_and_counts():
+    """Test the filters and counts consider all the accounts"""
+    index = AccountsIndex(fake_pool())
+    index.refresh()
+    assert [(p["account"], p["id"]) for p in index.offline_players(threshold=30)] == [
+        ("store-a", 3), ("store-b", 1)]
+    assert index.count("players", by="platform") == {"ANDROID": 1, "SAMSUNG": 1, "LG": 2}
+    assert index.count("medias") == {"store-a": 5, "store-b": 2}
+    assert [p["name"] for p in index.filter("players", **{"group.id": 2, "platform": "LG"})] == ["Store 3"]
+
+
+def test_refresh_one_account_keeps_the_others():
+    """Test refreshing an account replaces only its records"""
+    pool = fake_pool()
+    index = AccountsIndex(pool)
+    index.refresh(["players"])
+    pool["store-b"].get_players = lambda: []
+    index.refresh(["players"], accounts=["store-b"])
+    assert index.count("players") == {"store-a": 3}
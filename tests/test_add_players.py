@@ -0,0 +1,56 @@
+import pytest
+
+from tests.resources_for_tests.fleet import PLAYERS, player
+
+WEEK = {str(day): 38 for day in range(7)}
+
+
+@pytest.fixture
+def my(offline_client):
+    """Client with the players cached and the POSTs answered locally"""
+
+    def post(resource, payload):
+        if payload["name"] == "Store 7":
+            raise Exception('{"message":"License limit reached"}')
+        return player(100 + len(my.requests), payload["name"], [38] * 7, group=payload["group"])
+
+    my = offline_client(post=post, players=PLAYERS)
+    return my
+
+
+def test_validated_before_any_request(my):
+    """Test an invalid payload stops the whole batch"""
+    stores = [dict(name="Store 1", platform="ANDROID", playlists=WEEK),
+              dict(name="Store 2", platform="TIZEN", playlists=WEEK)]
+    with pytest.raises(Exception, match="Player 1: Invalid platform field"):
+        my.add_players(stores)
+    with pytest.raises(Exception, match="Player 0: Missing"):
+        my.add_players([dict(name="Store 3", platform="LG")])
+    assert my.requests == []
+
+
+def test_dedup_and_rerun(my):
+    """Test existing and repeated names are skipped and reruns only retry failures"""
+    stores = [dict(name=f"Store {n}", platform="ANDROID", group=5, playlists=WEEK) for n in range(5, 9)]
+    stores += [dict(name="store  3", platform="LG", playlists=WEEK),
+               dict(name="STORE 5", platform="ANDROID", playlists=WEEK)]
+    result = my.add_players(stores)
+    assert sorted(result["created"]) == ["Store 5", "Store 6", "Store 8"]
+    assert result["existing"] == {"store  3": 3}
+    assert list(result["errors"]) == ["Store 7"]
+    assert result["duplicates"] == {"STORE 5": "Store 5"}
+    assert len(my.requests) == 4
+    assert all(p["group"] == 5 for _, p in my.requests)
+
+    again = my.add_players(stores)
+    assert list(again["errors"]) == ["Store 7"]
+    assert again["created"] == {}
+    assert sorted(again["existing"]) == ["STORE 5", "Store 5", "Store 6", "Store 8", "store  3"]
+
+
+def test_long_names_are_truncated(my):
+    """Test the names are truncated like add_player before comparing"""
+    name = "A" * 60
+    my.add_players([dict(name=name, platform="ANDROID", playlists=WEEK)])
+    assert my.requests[0][1]["name"] == "A" * 46 + "..."
+    assert my.add_players([dict(name=name + "B", platform="ANDROID", playlists=WEEK)])["created"] == {}
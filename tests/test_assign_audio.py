@@ -0,0 +1,38 @@
+import pytest
+
+from tests.resources_for_tests.fleet import PLAYERS, player
+
+STORE_4 = player(4, "Store 4", [39] * 7, group=2, platform="SAMSUNG", audio=8)
+
+
+@pytest.fixture
+def my(offline_client):
+    """Client with the players cached and the PUTs answered locally"""
+    players = {p["id"]: p for p in PLAYERS + [STORE_4]}
+
+    def edit(resource, payload):
+        audio = payload["audios"].get("0")
+        return dict(players[int(resource.split("/")[1])], audios={"0": {"id": audio, "name": ""} if audio else None})
+
+    return offline_client(edit=edit, players=players.values())
+
+
+def test_assign_audio_by_group_and_platform(my):
+    """Test only the players that match the filters are edited"""
+    result = my.assign_audio(61, group=2, platform="SAMSUNG")
+    assert result == {"editedPlayers": [2, 4], "skippedPlayers": [], "errors": {}}
+    assert dict(my.requests)["players/2"]["audios"] == {"0": 61}
+    assert dict(my.requests)["players/4"]["playlists"] == {str(day): 39 for day in range(7)}
+
+
+def test_assign_audio_by_current_audio(my):
+    """Test the players are selected by the audio they have now"""
+    assert my.assign_audio(61, current_audio=0)["editedPlayers"] == [2, 3]
+    assert my.assign_audio(None, current_audio=40)["editedPlayers"] == [1]
+    assert dict(my.requests)["players/1"]["audios"] == {}
+
+
+def test_players_with_the_audio_are_skipped(my):
+    """Test no request is sent for players that already have the audio"""
+    assert my.assign_audio(8, player_ids=[1, 4]) == {"editedPlayers": [1], "skippedPlayers": [4], "errors": {}}
+    assert [resource for resource, _ in my.requests] == ["players/1"]
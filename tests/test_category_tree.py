@@ -0,0 +1,44 @@
+from fouryousee.categories import CategoryTree
+from tests.resources_for_tests.fleet import MEDIAS
+
+
+def category(id, parent=None, children=()):
+    return {"id": id, "name": "Category {}".format(id), "description": None,
+            "parent": {"id": parent, "name": "Category {}".format(parent)} if parent else None,
+            "children": [{"id": c} for c in children], "sequence": []}
+
+
+CATEGORIES = [
+    category(1, children=[3, 11]), category(3, parent=1), category(11, parent=1, children=[15]),
+    category(15, parent=11, children=[16]), category(16, parent=15),
+    category(2), category(9), category(10, children=[14]), category(14, parent=10),
+]
+tree = CategoryTree(CATEGORIES, MEDIAS)
+
+
+def test_subtree_and_ancestors():
+    """Test the subtree is the category and all its descendants"""
+    assert tree.subtree(1) == [1, 3, 11, 15, 16]
+    assert tree.subtree(15) == [15, 16]
+    assert tree.ancestors(16) == [15, 11, 1]
+
+
+def test_medias_under_subtree():
+    """Test the medias of a category include its descendants without repetitions"""
+    assert tree.medias_under(1) == [1, 4, 56]
+    assert tree.media_count(1) == 3
+    assert tree.media_count(11) == 1
+    assert tree.medias_under(2) == [31, 55]
+
+
+def test_empty_subtrees():
+    """Test categories without medias in all their subtree"""
+    assert tree.empty_subtrees() == [9, 10, 14]
+    assert tree.empty_subtrees(topmost=True) == [9, 10]
+
+
+def test_ancestors_with_cycle():
+    """Test a cycle of parents doesn't loop forever"""
+    cyclic = CategoryTree([category(1, parent=2), category(2, parent=1), category(3, parent=2)])
+    assert cyclic.ancestors(1) == [2]
+    assert cyclic.ancestors(3) == [2, 1]
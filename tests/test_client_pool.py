@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from fouryousee.fouryousee import FouryouseeAPI, run_concurrently
+from fouryousee.budget import RateBudget
+from fouryousee.pool import ClientPool
+
+
+class AccountHandler(BaseHTTPRequestHandler):
+    """Answer the players of the account of the token, slowly"""
+    in_flight, peak = 0, 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        token = self.headers.get("Secret-Token")
+        with AccountHandler.lock:
+            AccountHandler.in_flight += 1
+            AccountHandler.peak = max(AccountHandler.peak, AccountHandler.in_flight)
+        time.sleep(0.05)
+        with AccountHandler.lock:
+            AccountHandler.in_flight -= 1
+        if token == "broken":
+            self.send_response(401)
+            body = b"Invalid token"
+        else:
+            self.send_response(200)
+            body = json.dumps({"results": [{"id": 1, "name": token}]}).encode()
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    AccountHandler.in_flight, AccountHandler.peak = 0, 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), AccountHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setattr(FouryouseeAPI, "url", f"http://127.0.0.1:{httpd.server_address[1]}/")
+    yield
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_rate_budget():
+    """Test the burst is immediate and the next requests are spaced"""
+    budget = RateBudget(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(4):
+        budget.acquire()
+    assert 0.09 <= time.monotonic() - start < 0.5
+
+
+def test_threads_of_a_client_share_its_budget(server):
+    """Test the concurrent requests of a plain client keep its rate"""
+    my = FouryouseeAPI("token-a")
+    assert my.budget.rate == 1.0
+    my.budget = RateBudget(rate=10)
+    start = time.monotonic()
+    result = run_concurrently({i: my.get_users for i in range(5)}, workers=4)
+    assert len(result["done"]) == 5
+    assert time.monotonic() - start >= 0.4  # Not 4 requests at a time
+
+
+def test_map_by_account(server):
+    """Test per-account results and errors, sharing one session"""
+    accounts = {f"account-{i}": f"token-{i}" for i in range(6)}
+    accounts["broken"] = "broken"
+    with ClientPool(accounts, rate=100, burst=5, max_concurrency=3) as pool:
+        assert len({id(pool[a].session) for a in pool}) == 1
+        start = time.monotonic()
+        result = pool.map(lambda my: my.get_players())
+        elapsed = time.monotonic() - start
+    assert result["done"]["account-4"] == [{"id": 1, "name": "token-4"}]
+    assert sorted(result["errors"]) == ["broken"]
+    assert AccountHandler.peak <= 3
+    assert elapsed < 0.5  # Not one second per request
+
+
+def test_concurrency_cap_across_operations(server):
+    """Test the cap also holds inside operations of one account"""
+    with ClientPool({"a": "token-a", "b": "token-b"}, rate=100, burst=10, max_concurrency=2) as pool:
+        result = pool.map(
+            lambda my: run_concurrently({i: my.get_users for i in range(6)}, workers=6), accounts=["a"]
+        )
+    assert list(result["done"]) == ["a"]
+    assert len(result["done"]["a"]["done"]) == 6
+    assert AccountHandler.peak <= 2
@@ -0,0 +1,49 @@
+import pytest
+
+from tests.resources_for_tests.fleet import MEDIAS
+
+UPLOADS = [
+    {"id": "5021b3b7c402468d5b018a8b4a2b448a", "filename": "Gopro.mp4"},
+    {"id": "caf52322a13608e78751573ef1f94bc6", "filename": "sample-png-file.png"},
+    {"id": "9db1ca3bf0b81dd30e40c721323b59a6", "filename": "sample-zip-file.zip"},
+    {"id": "00fa6bba3bb250012278ae03754ad1bb", "filename": "failed.mp4"},
+]
+
+
+@pytest.fixture
+def my(offline_client):
+    """Client with the uploads and medias cached and the DELETEs answered locally"""
+
+    def delete(resource, payload):
+        if resource.endswith("00fa6bba3bb250012278ae03754ad1bb"):
+            raise Exception('{"message":"Upload in process"}')
+        return True
+
+    return offline_client(delete=delete, uploads=UPLOADS, medias=MEDIAS)
+
+
+def test_report_unused_uploads(my):
+    """Test the uploads named after a media or used by this client are in use"""
+    my.used_uploads.add("9db1ca3bf0b81dd30e40c721323b59a6")
+    result = my.collect_uploads()
+    assert [u["filename"] for u in result["unusedUploads"]] == ["sample-png-file.png", "failed.mp4"]
+    assert result["usedUploads"] == 2
+    assert my.requests == []
+
+
+def test_delete_unused_uploads(my):
+    """Test one DELETE per unused upload, without consulting the uploads again"""
+    result = my.collect_uploads(delete=True, keep=["9db1ca3bf0b81dd30e40c721323b59a6"])
+    assert result["deletedUploads"] == ["caf52322a13608e78751573ef1f94bc6"]
+    assert result["errors"] == {"00fa6bba3bb250012278ae03754ad1bb": '{"message":"Upload in process"}'}
+    assert sorted(r for r, _ in my.requests) == [
+        "uploads/00fa6bba3bb250012278ae03754ad1bb", "uploads/caf52322a13608e78751573ef1f94bc6"
+    ]
+    assert len(my.uploads) == 3
+
+
+def test_media_referencing_upload_id(my):
+    """Test a media whose file references the id of an upload"""
+    my.medias.append({"id": 90, "name": "Other", "file": {"id": "00fa6bba3bb250012278ae03754ad1bb"}})
+    unused = my.collect_uploads()["unusedUploads"]
+    assert [u["id"] for u in unused] == ["caf52322a13608e78751573ef1f94bc6", "9db1ca3bf0b81dd30e40c721323b59a6"]
@@ -0,0 +1,63 @@
+import pytest
+
+from fouryousee.fouryousee import FouryouseeAPI
+from fouryousee.graph import DependencyGraph
+from tests.resources_for_tests.fleet import MEDIAS, PLAYERS, PLAYLISTS
+
+
+@pytest.fixture
+def my():
+    """Client with the index of dependencies already cached"""
+    my = FouryouseeAPI("token")
+    my.graph = DependencyGraph(MEDIAS, PLAYLISTS, PLAYERS)
+    return my
+
+
+def test_impact_of_media(my):
+    """Test the impact of a media lists direct and nested playlists"""
+    assert my.get_impact(media=56) == {"playlists": [40], "nestedPlaylists": [38], "players": [1, 2]}
+
+
+def test_impact_of_playlist(my):
+    """Test the impact of a playlist lists parents, slots and players"""
+    impact = my.get_impact(playlist=40)
+    assert impact == {"playlists": [38], "slots": [(1, "audio")], "players": [1, 2]}
+
+
+def test_delete_blocked_by_impact(my):
+    """Test the delete is blocked before any request when it's used"""
+    with pytest.raises(Exception, match="is used by playlists"):
+        my.delete_media(55, check_impact=True)
+    with pytest.raises(Exception, match=r"players \[1, 2\]"):
+        my.delete_playlist(38, check_impact=True)
+
+
+def test_discard_playlist_updates_index(my):
+    """Test a deleted playlist is removed from the reverse indexes"""
+    my.graph.discard_playlist(41)
+    assert my.get_impact(media=55)["playlists"] == [38]
+    my.graph.discard_media(31)
+    assert my.graph.playlists_of_media(31) == set()
+
+
+def test_discard_playlist_recomputes_players(my):
+    """Test the players that reached a sub-playlist only through the
+    deleted playlist are no longer affected by it or its medias"""
+    my.graph.discard_playlist(38)
+    assert my.get_impact(playlist=40) == {"playlists": [], "slots": [(1, "audio")], "players": [1]}
+    assert my.get_impact(media=56) == {"playlists": [40], "nestedPlaylists": [], "players": [1]}
+    assert my.get_impact(media=55)["players"] == []
+
+
+def test_delete_updates_cached_listings(offline_client, monkeypatch):
+    """Test the deleted medias and playlists don't come back when the
+    index of dependencies is built again"""
+    my = offline_client(delete=lambda resource, payload: True, medias=MEDIAS, playlists=PLAYLISTS, players=PLAYERS)
+    monkeypatch.setattr(my, "get_all", lambda resource, **kwargs: [{"id": int(resource.split("/")[1])}])
+    my.get_graph()
+    assert my.delete_playlist(38) and my.delete_media(56)
+    assert 38 not in [p["id"] for p in my.playlists]
+    assert 56 not in [m["id"] for m in my.medias]
+    assert my.get_graph().players_of_playlist(40) == {1}
+    my.graph = None
+    assert 38 not in my.get_graph().playlists and 56 not in my.graph.medias
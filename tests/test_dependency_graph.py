@@ -0,0 +1,28 @@
+from fouryousee.graph import DependencyGraph
+from tests.resources_for_tests.fleet import MEDIAS, PLAYERS, PLAYLISTS
+
+graph = DependencyGraph(MEDIAS, PLAYLISTS, PLAYERS)
+
+
+def test_playlists_of_media():
+    """Test the playlists of a media consider sub-playlists, carousels and videowalls"""
+    assert graph.playlists_of_media(55) == {38, 41}
+    assert graph.playlists_of_media(56) == {40, 38}
+    assert graph.playlists_of_media(56, nested=False) == {40}
+    assert graph.playlists_of_media(1) == {39, 40, 38}
+    assert graph.playlists_of_media(123) == set()
+
+
+def test_players_of_media():
+    """Test the players of a media through every weekday and audio slot"""
+    assert graph.players_of_media(55) == {1, 2}
+    assert graph.players_of_media(4) == {2, 3}
+    assert graph.players_of_media(1) == {1, 2, 3}
+
+
+def test_players_of_playlist():
+    """Test the players of a playlist consider the parent playlists"""
+    assert graph.players_of_playlist(40) == {1, 2}
+    assert graph.players_of_playlist(41) == set()
+    assert graph.slots_of_playlist(40) == [(1, "audio")]
+    assert graph.parents_of_playlist(40) == {38}
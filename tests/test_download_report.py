@@ -0,0 +1,74 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from fouryousee.reports import download_report
+
+CONTENT = bytes(range(256)) * 1000
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serve CONTENT honoring the Range header when `ranged` is True"""
+    ranged = True
+    requests = []
+
+    def do_GET(self):
+        RangeHandler.requests.append(self.headers.get("Range"))
+        header = self.headers.get("Range")
+        if self.ranged and header:
+            start, end = map(int, header.replace("bytes=", "").split("-"))
+            body = CONTENT[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(CONTENT)}")
+        else:
+            body = CONTENT
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    RangeHandler.ranged, RangeHandler.requests = True, []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/report.gz"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_report_by_ranges(server, tmp_path):
+    """Test the report is downloaded in parallel chunks"""
+    path = download_report(server, tmp_path / "report.gz", chunk_size=10_000)
+    assert path.read_bytes() == CONTENT
+    assert len(RangeHandler.requests) == 1 + 26
+    assert not (tmp_path / "report.gz.part").exists()
+    assert not (tmp_path / "report.gz.part.json").exists()
+
+
+def test_download_report_resumes_part_file(server, tmp_path):
+    """Test only the chunks missing in the .part file are requested"""
+    part = tmp_path / "report.gz.part"
+    part.write_bytes(CONTENT[:100_000] + bytes(len(CONTENT) - 100_000))
+    (tmp_path / "report.gz.part.json").write_text(json.dumps(
+        dict(total=len(CONTENT), chunkSize=50_000, done=[0, 1])
+    ))
+    path = download_report(server, tmp_path / "report.gz", chunk_size=50_000)
+    assert path.read_bytes() == CONTENT
+    assert sorted(RangeHandler.requests[1:]) == [
+        "bytes=100000-149999", "bytes=150000-199999",
+        "bytes=200000-249999", "bytes=250000-255999",
+    ]
+
+
+def test_download_report_without_ranges(server, tmp_path):
+    """Test the report is downloaded in one GET if ranges aren't supported"""
+    RangeHandler.ranged = False
+    path = download_report(server, tmp_path / "report.gz")
+    assert path.read_bytes() == CONTENT
@@ -0,0 +1,71 @@
+import gzip
+import json
+
+import pytest
+
+from fouryousee.reports import export_report
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+REPORT = {"id": 521546, "type": "detailed", "format": "json"}
+PLAYLOGS = [
+    {"playerId": 2, "playerName": "Sample", "mediaId": 55, "date": "2022-07-01",
+     "time": "10:0{}:00".format(i % 10), "duration": 10, "extra": {"a": i}}
+    for i in range(25)
+]
+
+
+@pytest.fixture
+def report_file(tmp_path):
+    path = tmp_path / "report_521546.gz"
+    with gzip.open(path, "wt") as file:
+        json.dump(PLAYLOGS, file)
+    return path
+
+
+def test_export_report_to_parquet(report_file, tmp_path):
+    """Test the report is written in chunks to a typed parquet file"""
+    destination = export_report(report_file, tmp_path / "report.parquet",
+                                report=REPORT, chunk_rows=10)
+    parquet = pq.ParquetFile(destination)
+    assert parquet.metadata.num_rows == 25
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.schema_arrow.field("mediaId").type == pa.int64()
+    assert parquet.schema_arrow.field("playedAt").type == pa.timestamp("ms")
+    table = pq.read_table(destination, columns=["mediaId", "extra"])
+    assert table.column("extra")[0].as_py() == '{"a": 0}'
+
+
+def test_export_report_to_arrow(report_file, tmp_path):
+    """Test the report is written to an arrow file"""
+    destination = export_report(report_file, tmp_path / "report.arrow", report=REPORT)
+    table = pa.ipc.open_file(str(destination)).read_all()
+    assert table.num_rows == 25
+    assert table.column("duration").type == pa.int64()
+
+
+def test_export_report_rejects_other_formats(report_file, tmp_path):
+    """Test only json reports are exported"""
+    with pytest.raises(Exception):
+        export_report(report_file, tmp_path / "report.parquet", report=dict(REPORT, format="csv"))
+
+
+def test_export_report_promotes_drifting_columns(tmp_path):
+    """Test the columns that change of type or appear after the first chunk"""
+    path = tmp_path / "report_drift.gz"
+    playlogs = [dict(p, extra=None) for p in PLAYLOGS[:10]] + [
+        dict(PLAYLOGS[0], duration=10.5, mediaId="promo", extra="x", flag=True),
+        dict(PLAYLOGS[1], flag=1),
+    ]
+    with gzip.open(path, "wt") as file:
+        json.dump(playlogs, file)
+    destination = export_report(path, tmp_path / "report.parquet", report=REPORT, chunk_rows=10)
+    table = pq.read_table(destination)
+    assert table.schema.field("duration").type == pa.float64()
+    assert table.schema.field("mediaId").type == pa.string()
+    assert table.schema.field("flag").type == pa.string()
+    assert table.column("duration").to_pylist()[10] == 10.5
+    assert table.column("mediaId").to_pylist()[9:11] == ["55", "promo"]
+    assert table.column("extra").to_pylist()[9:] == [None, "x", '{"a": 1}']
+    assert table.column("flag").to_pylist()[9:] == [None, "True", "1"]
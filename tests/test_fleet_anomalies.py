@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from fouryousee.fleet import scan_playlog_anomalies
+
+NOW = datetime(2022, 7, 1, 18, 0, 0)
+PLAYERS = [
+    {"id": 1, "name": "Player DEMO", "lastContactInMinutes": 224998,
+     "lastLogReceived": "2022-01-26 13:49:28"},
+    {"id": 2, "name": "Sample name via API", "lastContactInMinutes": 1,
+     "lastLogReceived": "2022-07-01 16:46:33"},
+    {"id": 3, "name": "Healthy", "lastContactInMinutes": 2,
+     "lastLogReceived": "2022-07-01 17:58:00"},
+    {"id": 4, "name": "Never logged", "lastContactInMinutes": 0,
+     "lastLogReceived": "None"},
+]
+PLAYLOGS = [
+    {"playerId": 3, "mediaId": 1, "date": "2022-07-01", "time": "08:00:00"},
+    {"playerId": 3, "mediaId": 1, "date": "2022-07-01", "time": "12:30:00"},
+    {"playerId": 3, "mediaId": 1, "date": "2022-07-01", "time": "12:40:00"},
+]
+
+
+def test_scan_contact_without_logs():
+    """Test players in contact without recent logs are ranked first"""
+    anomalies = scan_playlog_anomalies(PLAYERS, now=NOW)
+    assert [(a["id"], a["gapInMinutes"]) for a in anomalies] == [(4, None), (2, 73)]
+
+
+def test_scan_playback_gaps():
+    """Test the longest gap between playlogs of a player is reported"""
+    anomalies = scan_playlog_anomalies(PLAYERS, PLAYLOGS, now=NOW, gap_threshold=120)
+    gap = [a for a in anomalies if a["issue"] == "playback gap"]
+    assert gap == [dict(id=3, name="Healthy", lastContactInMinutes=2,
+                        lastLogReceived="2022-07-01 17:58:00", issue="playback gap",
+                        gapInMinutes=270, gapStart="2022-07-01 08:00:00")]
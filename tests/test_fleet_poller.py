@@ -0,0 +1,88 @@
+import asyncio
+
+from fouryousee.fleet import (CAME_ONLINE, GROUP_CHANGED, PLATFORM_CHANGED, PLAYER_ADDED, PLAYER_REMOVED,
+                              PLAYLISTS_CHANGED, STATUS_CHANGED, WENT_OFFLINE, FleetPoller)
+from tests.resources_for_tests.fleet import PLAYERS, player
+
+
+class Client(object):
+    """Returns one listing of players on every consult"""
+
+    def __init__(self, *listings):
+        self.listings = list(listings)
+
+    def get_players(self):
+        return self.listings.pop(0)
+
+
+CHANGED = [
+    player(1, "Player DEMO", [38] * 6 + [41], audio=40),
+    player(2, "Sample name via API", [39] * 6 + [38], group=2, platform="SAMSUNG", contact=30,
+           status=(2, "Offline")),
+    player(3, "Store 3", [39] * 7, group=2, platform="LG", contact=9000, status=(5, "Local assist needed")),
+    player(4, "New store", [38] * 7),
+]
+
+
+def test_first_poll_is_the_baseline():
+    """Test the first snapshot doesn't produce events"""
+    poller = FleetPoller(Client(PLAYERS))
+    assert poller.poll() == []
+    assert sorted(poller.players) == [1, 2, 3]
+
+
+def test_typed_events():
+    """Test every change of the players produces its event"""
+    poller = FleetPoller(Client(PLAYERS, CHANGED, CHANGED[1:3]), offline_threshold=15)
+    poller.poll()
+    events = [(e.type, e.player_id) for e in poller.poll()]
+    assert events == [(PLAYLISTS_CHANGED, 1), (STATUS_CHANGED, 2), (WENT_OFFLINE, 2), (PLAYER_ADDED, 4)]
+    assert sorted((e.type, e.player_id) for e in poller.poll()) == [(PLAYER_REMOVED, 1), (PLAYER_REMOVED, 4)]
+    events = sorted((e.type, e.player_id) for e in poller.diff(PLAYERS))
+    assert events == [(CAME_ONLINE, 2), (PLAYER_ADDED, 1), (STATUS_CHANGED, 2)]
+
+
+def test_event_values_and_callbacks():
+    """Test the callbacks receive the previous and current values"""
+    poller = FleetPoller(Client(PLAYERS, CHANGED[1:]))
+    received, everything = [], []
+    poller.on(PLAYLISTS_CHANGED, received.append)
+    poller.on(PLAYER_REMOVED, received.append)
+    poller.on(None, everything.append)
+    poller.poll()
+    poller.poll()
+    assert [(e.type, e.player_id) for e in received] == [(PLAYER_REMOVED, 1)]
+    assert len(everything) == 4
+    offline = next(e for e in everything if e.type == WENT_OFFLINE)
+    assert (offline.previous, offline.current) == (1, 30)
+
+
+def test_playlists_changed_slots():
+    """Test the slots before and after the change"""
+    poller = FleetPoller(Client())
+    poller.diff(PLAYERS)
+    event = next(e for e in poller.diff(CHANGED) if e.type == PLAYLISTS_CHANGED)
+    assert event.previous["6"] == 38 and event.current["6"] == 41
+    assert event.current["audio"] == 40
+
+
+def test_group_and_platform_changed():
+    """Test moving a player to another group or platform produces its events"""
+    poller = FleetPoller(Client())
+    poller.diff(PLAYERS)
+    moved = [player(1, "Player DEMO", [38] * 7, group=3, platform="LG", audio=40)] + PLAYERS[1:]
+    events = poller.diff(moved)
+    assert [(e.type, e.player_id) for e in events] == [(GROUP_CHANGED, 1), (PLATFORM_CHANGED, 1)]
+    assert (events[0].previous["id"], events[0].current["id"]) == (1, 3)
+    assert (events[1].previous, events[1].current) == ("ANDROID", "LG")
+
+
+def test_async_iterator():
+    """Test the events can be consumed with async for"""
+    poller = FleetPoller(Client(PLAYERS, CHANGED), interval=0)
+
+    async def first_event():
+        async for event in poller:
+            return event
+
+    assert asyncio.run(first_event()).type == PLAYLISTS_CHANGED
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from fouryousee.fleet import FleetPoller
+from fouryousee.health import HealthHistory
+from tests.resources_for_tests.fleet import player
+
+START = datetime(2022, 7, 1, 8, 0)
+
+
+def snapshots(history, contacts):
+    """Record one snapshot every 10 minutes with the last contact of the players 1 and 2"""
+    for index, (first, second) in enumerate(contacts):
+        history.record([player(1, "One", [38] * 7, contact=first), player(2, "Two", [38] * 7, contact=second)],
+                       START + timedelta(minutes=10 * index))
+
+
+def test_score_uptime_flaps_and_mttr():
+    """Test the scores computed from the samples"""
+    history = HealthHistory()
+    snapshots(history, [(1, 90), (1, 100), (40, 110), (50, 1), (1, 2), (30, 3), (1, 4)])
+    scores = history.score()
+    assert scores[1] == {"uptime": 50.0, "flaps": 4, "flapsPerDay": 96.0, "mttr": 15.0,
+                         "online": True, "samples": 7}
+    assert scores[2]["uptime"] == 50.0
+    assert scores[2]["mttr"] is None  # The outage started before the history
+    assert history.score(start=START + timedelta(minutes=30), player_ids=[1])[1]["flaps"] == 3
+
+
+def test_ring_buffer_capacity():
+    """Test only the newest samples are kept"""
+    history = HealthHistory(capacity=3)
+    snapshots(history, [(1, 1)] * 5)
+    assert [s[0] for s in history.samples[1]] == [
+        int((START + timedelta(minutes=m)).timestamp()) for m in (20, 30, 40)]
+    history.compact()  # Without file there is nothing to rewrite
+    assert len(history.samples[1]) == 3
+
+
+def test_file_survives_restart(tmp_path):
+    """Test the snapshots are loaded again and the file is compacted"""
+    path = tmp_path / "health.jsonl"
+    snapshots(HealthHistory(path), [(1, 90), (40, 1), (1, 1)])
+    history = HealthHistory(path, capacity=2)
+    assert history.score()[1]["uptime"] == 0.0
+    history.compact()
+    assert len(path.read_text().splitlines()) == 2
+    assert HealthHistory(path).score() == history.score()
+
+
+def test_poller_records_history():
+    """Test the poller records a snapshot on every poll"""
+    history = HealthHistory()
+
+    class Client(object):
+        def get_players(self):
+            return [player(1, "One", [38] * 7)]
+
+    poller = FleetPoller(Client(), history=history)
+    poller.poll()
+    poller.poll()
+    assert len(history.samples[1]) == 2
@@ -0,0 +1,67 @@
+import pytest
+
+from fouryousee.fouryousee import FouryouseeAPI
+from fouryousee.search import MediaSearchIndex
+from tests.resources_for_tests.fleet import MEDIAS
+
+
+def ids(medias):
+    return [m["id"] for m in medias]
+
+
+@pytest.fixture
+def index():
+    return MediaSearchIndex(MEDIAS)
+
+
+def test_search_by_prefix(index):
+    """Test every word of the text is the beginning of a word"""
+    assert ids(index.search("sams")) == [56, 55]
+    assert ids(index.search("4you PL")) == [1]
+    assert index.search("ams") == []
+
+
+def test_search_by_substring(index):
+    """Test substrings in any part of the name or the description"""
+    assert ids(index.search("amsun", substring=True)) == [56, 55]
+    assert ids(index.search("ee an", substring=True)) == [4]
+
+
+def test_search_by_facets(index):
+    """Test categories, file types and durations are combined with the text"""
+    assert ids(index.search(category=1)) == [4, 1]
+    assert ids(index.search("samsung", file_type=".ZIP")) == [56]
+    assert ids(index.search(min_duration=20)) == [31]
+    assert ids(index.search(max_duration=10, limit=2)) == [4, 1]
+    assert index.facets(index.search("samsung")) == {"categories": {2: 1, 16: 1}, "fileTypes": {"mp4": 1, "zip": 1}}
+
+
+def test_incremental_updates(index):
+    """Test the index follows added, edited and deleted medias"""
+    index.add({"id": 422, "name": "sample-mp4-file", "file": "https://4usee.com/videos/i_422.mp4",
+               "duration": 126, "categories": [31]})
+    assert ids(index.search("sample mp4")) == [422]
+    assert ids(index.search(min_duration=100)) == [422]
+    index.update({"id": 55, "name": "Galaxy", "duration": 15, "categories": [27]})
+    assert index.search("samsung_A80") == []
+    assert ids(index.search("galaxy", category=27, min_duration=15)) == [55]
+    assert index.search("a80") == []  # The description follows the name
+    index.remove(55)
+    assert index.search("galaxy") == []
+    assert 55 not in ids(index.search(max_duration=20))
+
+
+def test_client_keeps_index_updated(monkeypatch):
+    """Test add_media, edit_media and delete_media update the cached index"""
+    my = FouryouseeAPI("token")
+    my.medias = list(MEDIAS)
+    monkeypatch.setattr(my, "get_all", lambda resource, **kwargs: next(m for m in MEDIAS if m["id"] == 31))
+    monkeypatch.setattr(my, "edit", lambda resource, payload: {"id": 31, "name": "Hero", "duration": 30,
+                                                               "categories": [2]})
+    monkeypatch.setattr(my, "delete", lambda resource: True)
+    assert ids(my.search_medias("gop")) == [31]
+    my.edit_media(id=31, name="Hero")
+    assert my.search_medias("gop") == []
+    assert ids(my.search_medias("her")) == [31]
+    my.delete_media(31)
+    assert my.search_medias("her") == []
@@ -0,0 +1,52 @@
+import pytest
+
+from fouryousee.groups import GroupIndex
+from tests.resources_for_tests.fleet import PLAYERS
+
+
+@pytest.fixture
+def my(offline_client):
+    """Client with the players cached and the PUTs answered locally"""
+    players = {p["id"]: p for p in PLAYERS}
+
+    def edit(resource, payload):
+        player_id = int(resource.split("/")[1])
+        if player_id == 3:
+            raise Exception('{"message":"Can not update an inactive player"}')
+        return dict(
+            players[player_id],
+            group={"id": payload["group"], "name": f"Group {payload['group']}"},
+            playlists={day: {"id": plist, "name": ""} for day, plist in payload["playlists"].items()},
+        )
+
+    return offline_client(edit=edit, players=PLAYERS)
+
+
+def test_group_index():
+    """Test the players are indexed by group"""
+    groups = GroupIndex(PLAYERS)
+    assert groups.groups() == [{"id": 1, "name": "Group 1", "players": [1]},
+                               {"id": 2, "name": "Group 2", "players": [2, 3]}]
+    assert groups.group_of(3) == 2
+    assert [s["status"] for s in groups.statuses(2)] == ["Online", "Local assist needed"]
+
+
+def test_assign_group_playlist(my):
+    """Test only the players of the group are edited, one PUT each"""
+    result = my.assign_group_playlist(2, 41, days=[0, 6])
+    assert result == {"editedPlayers": [2],
+                      "errors": {3: '{"message":"Can not update an inactive player"}'}}
+    assert sorted(r for r, _ in my.requests) == ["players/2", "players/3"]
+    payload = dict(my.requests)["players/2"]
+    assert payload["playlists"] == {"0": 41, "1": 39, "2": 39, "3": 39, "4": 39, "5": 39, "6": 41}
+    assert payload["group"] == 2 and payload["platform"] == "SAMSUNG"
+
+
+def test_move_players_updates_index(my):
+    """Test the cached players and the group index follow the move"""
+    my.get_group_index()
+    assert my.move_players([1, 2, 99], 5)["errors"] == {99: "Player with ID 99 was not found"}
+    assert my.group_index.players_of(5) == [1, 2]
+    assert my.group_index.players_of(2) == [3]
+    assert next(p for p in my.players if p["id"] == 2)["group"]["id"] == 5
+    assert my.get_group_statuses(1) == []
@@ -0,0 +1,68 @@
+import csv
+import json
+
+from fouryousee.fleet import FleetPoller
+from fouryousee.inventory import PlayerInventory
+from tests.resources_for_tests.fleet import PLAYERS, player
+
+
+def test_crosstabs():
+    """Test the counts by any combination of dimensions"""
+    inventory = PlayerInventory(PLAYERS)
+    assert inventory.crosstab("platform") == {("SAMSUNG",): 1, ("WINDOWS",): 0, ("ANDROID",): 1,
+                                              ("4YOUSEE_PLAYER",): 0, ("LG",): 1}
+    assert inventory.crosstab("group", "status") == {("Group 1", "Online"): 1, ("Group 2", "Online"): 1,
+                                                     ("Group 2", "Local assist needed"): 1}
+    assert inventory.crosstab("playlist") == {(38,): 2, (39,): 2}
+    assert inventory.crosstab() == {(): 3}
+
+
+def test_players_by_dimensions():
+    """Test the lists of players filtered by dimensions"""
+    inventory = PlayerInventory(PLAYERS)
+    assert inventory.players(group="Group 2") == [2, 3]
+    assert inventory.players(playlist=38, platform="SAMSUNG") == [2]
+    assert inventory.players(status="Offline") == []
+
+
+def test_export_csv_and_json(tmp_path):
+    """Test the cross-tabulations are written with counts and players"""
+    inventory = PlayerInventory(PLAYERS)
+    with open(inventory.export(tmp_path / "inventory.csv", "group")) as file:
+        assert list(csv.DictReader(file)) == [{"group": "Group 1", "count": "1", "players": "1"},
+                                              {"group": "Group 2", "count": "2", "players": "2 3"}]
+    rows = json.loads(inventory.export(tmp_path / "inventory.json").read_text())
+    assert {"platform": "LG", "status": "Local assist needed", "group": "Group 2", "playlist": 39,
+            "count": 1, "players": [3]} in rows
+
+
+def test_updated_by_poller_events():
+    """Test the inventory follows the events of the poller"""
+    listings = [PLAYERS, [player(1, "Player DEMO", [41] * 7, platform="LG"), PLAYERS[2]],
+                [player(1, "Player DEMO", [41] * 7, platform="LG", contact="None"), PLAYERS[2]]]
+
+    class Client(object):
+        def get_players(self):
+            return listings.pop(0)
+
+    inventory = PlayerInventory(PLAYERS)
+    poller = FleetPoller(Client())
+    poller.on(None, inventory.apply)
+    poller.poll()
+    poller.poll()
+    assert inventory.crosstab("platform", "playlist") == {("LG", 41): 1, ("LG", 39): 1}
+    assert inventory.players(platform="SAMSUNG") == []
+    poller.poll()  # Player 1 goes offline without a last contact
+    assert inventory.crosstab("platform", "playlist") == {("LG", 41): 1, ("LG", 39): 1}
+
+
+def test_moved_players_by_poller_events():
+    """Test the inventory follows a player moved to another group or platform"""
+    moved = [player(1, "Player DEMO", [38] * 7, group=2, platform="WINDOWS", audio=40)] + PLAYERS[1:]
+    inventory = PlayerInventory(PLAYERS)
+    poller = FleetPoller(None)
+    poller.on(None, inventory.apply)
+    poller.diff(PLAYERS)
+    poller.dispatch(poller.diff(moved))
+    assert inventory.players(platform="WINDOWS", group="Group 2") == [1]
+    assert inventory.players(platform="ANDROID") == []
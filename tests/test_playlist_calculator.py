@@ -0,0 +1,35 @@
+import pytest
+
+from fouryousee.playlists import PlaylistCalculator
+from tests.resources_for_tests.fleet import MEDIAS, PLAYLISTS
+
+calculator = PlaylistCalculator(MEDIAS, PLAYLISTS)
+
+
+def test_duration_of_cached_playlists():
+    """Test news, sub-playlists, layouts, videowalls and carousels"""
+    assert calculator.durations() == {38: 80, 39: 20, 40: 20, 41: 10}
+
+
+def test_offsets_of_planned_playlist():
+    """Test a playlist that only has the ids of the payload"""
+    offsets = calculator.offsets({"items": [{"type": "media", "id": 31}, {"type": "news"}],
+                                  "sequence": [0, 1, 0]})
+    assert [(o["start"], o["duration"]) for o in offsets] == [(0, 30), (30, 10), (40, 30)]
+
+
+def test_carousel_plays_next_media_every_time():
+    """Test every appearance of a carousel plays its next media"""
+    playlist = {"items": [{"type": "carousel", "id": 3, "items": [{"id": 31}, {"id": 4}],
+                           "sequence": [4, 31]}], "sequence": [0, 0, 0]}
+    assert [o["duration"] for o in calculator.offsets(playlist)] == [10, 30, 10]
+
+
+def test_playlist_that_contains_itself():
+    """Test a cycle of sub-playlists is detected"""
+    cyclic = PlaylistCalculator(MEDIAS, [
+        {"id": 1, "items": [{"type": "subPlaylist", "id": 2}], "sequence": [0]},
+        {"id": 2, "items": [{"type": "subPlaylist", "id": 1}], "sequence": [0]},
+    ])
+    with pytest.raises(Exception, match="contains itself"):
+        cyclic.duration(1)
@@ -0,0 +1,50 @@
+import pytest
+
+from fouryousee.playlists import PlaylistFlattener
+from tests.resources_for_tests.fleet import PLAYLISTS
+
+flattener = PlaylistFlattener(PLAYLISTS)
+
+
+def test_flatten_follows_sequence_and_sub_playlists():
+    """Test the sub-playlist is replaced by its items in the sequence"""
+    flat = flattener.flatten(38)
+    assert [(i["type"], i.get("id")) for i in flat] == [
+        ("news", None), ("media", 55), ("media", 31), ("news", None),
+        ("media", 56), ("carousel", 16),
+    ]
+    assert flattener.media_ids(38) == [55, 31, 56, 1]
+
+
+def test_flatten_is_memoized():
+    """Test the expansion of a shared sub-playlist is reused"""
+    flattener.flatten_all()
+    assert flattener.flatten(40) is flattener._flat[40]
+    assert flattener.flatten(38)[-2:] == flattener.flatten(40)
+
+
+def test_flatten_detects_cycles():
+    """Test a playlist containing itself through sub-playlists"""
+    cyclic = PlaylistFlattener([
+        {"id": 90, "items": [{"type": "subPlaylist", "id": 91}], "sequence": [0]},
+        {"id": 91, "items": [{"type": "media", "id": 1}, {"type": "subPlaylist", "id": 90}],
+         "sequence": [0, 1]},
+    ])
+    with pytest.raises(Exception, match="90 -> 91 -> 90"):
+        cyclic.flatten(90)
+
+
+def test_flatten_skips_missing_sub_playlists():
+    """Test a sub-playlist that isn't in the listing and a call after an error"""
+    dangling = PlaylistFlattener([
+        {"id": 90, "items": [{"type": "media", "id": 1}, {"type": "subPlaylist", "id": 99}],
+         "sequence": [0, 1]},
+        {"id": 91, "items": [{"type": "subPlaylist", "id": 90}], "sequence": [0]},
+        {"id": 92, "items": [{"type": "subPlaylist", "id": 91}], "sequence": [0, 3]},
+    ])
+    with pytest.raises(IndexError):
+        dangling.flatten(92)
+    assert dangling._path == []
+    assert dangling.media_ids(91) == [1]
+    with pytest.raises(Exception, match="Playlist with ID 99 was not found"):
+        dangling.flatten(99)
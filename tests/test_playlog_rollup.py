@@ -0,0 +1,105 @@
+import gzip
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from fouryousee.reports import PlaylogRollup, merge_windows, report_filter
+
+PLAYLOGS = [
+    {"playerId": 1, "mediaId": 55, "date": "2022-07-01", "time": "10:05:00"},
+    {"playerId": 1, "mediaId": 55, "date": "2022-07-01", "time": "10:45:00"},
+    {"playerId": 2, "mediaId": 31, "date": "2022-07-01", "time": "11:10:00"},
+    {"playerId": 2, "mediaId": 31, "date": "2022-07-01", "time": "12:10:00"},
+]
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    """Serve the playlogs as the gzipped file of any report"""
+
+    def do_GET(self):
+        body = gzip.compress(json.dumps(PLAYLOGS).encode())
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeClient(object):
+    """Request reports that are ready at the first consult"""
+
+    def __init__(self, url):
+        self.url = url
+        self.filters = []
+
+    def request_report(self, filter):
+        self.filters.append(filter)
+        return {"id": len(self.filters), "status": "waiting"}
+
+    def get_reports(self, id):
+        return {"id": id, "status": "success", "url": f"{self.url}report_{id}.gz"}
+
+
+@pytest.fixture
+def client():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ReportHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield FakeClient(f"http://127.0.0.1:{httpd.server_address[1]}/")
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_merge_windows():
+    """Test overlapping and contiguous windows are merged"""
+    assert merge_windows([[3, 5], [0, 1], [1, 2], [4, 8]]) == [[0, 2], [3, 8]]
+
+
+def test_report_filter_excludes_end():
+    """Test the filter of a window finish one second before the end"""
+    filter = report_filter(datetime(2022, 7, 1), datetime(2022, 7, 2), [2, 1])
+    assert filter["endDate"] == "2022-07-01"
+    assert filter["endTime"] == "23:59:59"
+    assert filter["playerId"] == [1, 2]
+
+
+def test_rollup_requests_only_uncovered_windows(tmp_path):
+    """Test the ingested windows are not requested again after reloading"""
+    path = tmp_path / "rollup.json"
+    rollup = PlaylogRollup(None, path)
+    rollup.ingest(PLAYLOGS, datetime(2022, 7, 1, 10), datetime(2022, 7, 1, 12), [1, 2])
+    rollup.save()
+
+    rollup = PlaylogRollup(None, path)
+    assert rollup.totals(by="mediaId") == {55: 2, 31: 1}
+    assert rollup.uncovered(datetime(2022, 7, 1, 10), datetime(2022, 7, 1, 13), [1, 2, 3]) == [
+        (datetime(2022, 7, 1, 10), datetime(2022, 7, 1, 13), [3]),
+        (datetime(2022, 7, 1, 12), datetime(2022, 7, 1, 13), [1, 2]),
+    ]
+
+    rollup.ingest(PLAYLOGS, datetime(2022, 7, 1, 12), datetime(2022, 7, 1, 13), [1, 2])
+    assert rollup.totals(by="playerId") == {1: 2, 2: 2}
+    assert rollup.totals(by="hour", start=datetime(2022, 7, 1, 11)) == {
+        "2022-07-01 11:00": 1, "2022-07-01 12:00": 1
+    }
+
+
+def test_update_requests_only_the_new_hour(client, tmp_path):
+    """Test request, wait, download, ingest and save, then a second run with one more hour"""
+    path = tmp_path / "rollup.json"
+    rollup = PlaylogRollup(client, path, poll_interval=0)
+    assert rollup.update(datetime(2022, 7, 1, 10), datetime(2022, 7, 1, 12), [1, 2], tmp_path) == 1
+    assert rollup.totals(by="mediaId") == {55: 2, 31: 1}
+    assert path.exists()
+    assert not list(tmp_path.glob("report_*"))
+
+    rollup = PlaylogRollup(client, path, poll_interval=0)
+    assert rollup.update(datetime(2022, 7, 1, 10), datetime(2022, 7, 1, 13), [1, 2], tmp_path) == 1
+    assert [(f["startTime"], f["endTime"]) for f in client.filters] == [
+        ("10:00:00", "11:59:59"), ("12:00:00", "12:59:59")
+    ]
+    assert rollup.totals(by="mediaId") == {55: 2, 31: 2}
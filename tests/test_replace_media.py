@@ -0,0 +1,78 @@
+import pytest
+
+from fouryousee.fouryousee import replace_media
+from tests.resources_for_tests.fleet import MEDIAS, PLAYERS, PLAYLISTS
+
+
+@pytest.fixture
+def my(offline_client):
+    """Client with the listings cached and the PUTs answered with the payload"""
+    return offline_client(
+        edit=lambda resource, payload: dict(payload, id=int(resource.split("/")[1])),
+        medias=MEDIAS, playlists=PLAYLISTS, players=PLAYERS,
+    )
+
+
+def test_replace_media_items():
+    """Test the media items are replaced and the sequence is kept"""
+    items, sequence = replace_media(PLAYLISTS[0], 55, 4)
+    assert items[1] == {"type": "media", "id": 4}
+    assert items[0] == {"type": "news", "durationInSeconds": 10}
+    assert sequence == [0, 1, 2, 0, 3]
+
+
+def test_replace_media_already_in_playlist():
+    """Test the old item is dropped when the new media already is an item"""
+    items, sequence = replace_media(PLAYLISTS[0], 55, 31)
+    assert items == [PLAYLISTS[0]["items"][i] for i in (0, 2, 3)]
+    assert sequence == [0, 1, 1, 0, 2]
+
+
+def test_replace_media_videowall_cells():
+    """Test only the cells of the old media change, without its descriptive fields"""
+    items, sequence = replace_media(PLAYLISTS[1], 1, 31)
+    assert items[1]["grid"] == [[{"id": 4, "durationInSeconds": 10}, {"type": "media", "id": 31}],
+                                [{"type": "media", "id": 31}, {"id": 4, "durationInSeconds": 10}]]
+    assert items[2] == {"type": "media", "id": 31}
+    assert sequence == [0, 1, 2]
+
+
+def test_replace_media_keeps_content_schedules():
+    """Test the untouched items and cells, and the replaced ones, keep their contentSchedule"""
+    schedule = {"startDate": "2050-11-26", "endDate": "2050-12-26", "times": []}
+    playlist = {"id": 90, "items": [
+        {"type": "media", "id": 31, "name": "Gopro", "contentSchedule": schedule},
+        {"type": "videoWall", "grid": [[{"id": 4, "contentSchedule": schedule}, {"id": 55}]]},
+        {"type": "media", "id": 55, "name": "samsung_A80", "contentSchedule": schedule},
+    ], "sequence": [0, 1, 2]}
+    items, sequence = replace_media(playlist, 55, 117)
+    assert items[0] == playlist["items"][0]
+    assert items[1]["grid"] == [[{"id": 4, "contentSchedule": schedule}, {"type": "media", "id": 117}]]
+    assert items[2] == {"type": "media", "id": 117, "contentSchedule": schedule}
+    assert sequence == [0, 1, 2]
+
+
+def test_dry_run_without_requests(my):
+    """Test the plan is computed without any request"""
+    plan = my.replace_media_in_playlists(1, 31, dry_run=True)
+    assert sorted(plan["changes"]) == [39]
+    assert plan["skippedPlaylists"] == [40]  # Only inside a carousel
+    assert my.requests == []
+
+
+def test_only_needed_puts(my):
+    """Test one PUT per playlist changed and the cache updated"""
+    result = my.replace_media_in_playlists(55, 4)
+    assert result == {"editedPlaylists": [38, 41], "skippedPlaylists": [], "errors": {}}
+    assert sorted(r for r, _ in my.requests) == ["playlists/38", "playlists/41"]
+    payload = dict(my.requests)["playlists/41"]
+    assert payload == {"name": "Unused", "isSubPlaylist": False, "category": None,
+                       "items": [{"type": "media", "id": 4}], "sequence": [0]}
+    assert next(p for p in my.playlists if p["id"] == 41)["items"] == [{"type": "media", "id": 4}]
+    assert my.graph is None
+
+
+def test_unknown_new_media(my):
+    """Test the new media must exist"""
+    with pytest.raises(Exception, match="Media with ID 999 was not found"):
+        my.replace_media_in_playlists(55, 999)
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from fouryousee.schedule import CompiledSchedule, ScheduleEngine
+from tests.resources_for_tests.fleet import MEDIAS, PLAYLISTS
+
+engine = ScheduleEngine(MEDIAS, PLAYLISTS)
+
+
+def test_compiled_schedule():
+    """Test dates and times of a schedule, 2021-06-27 is sunday (weekday 0)"""
+    schedule = CompiledSchedule(MEDIAS[0]["schedule"])
+    assert not schedule.active(datetime(2021, 6, 24, 12))
+    assert schedule.active(datetime(2021, 6, 27, 6))
+    assert not schedule.active(datetime(2021, 6, 28, 8))  # monday starts at 09:00
+    assert schedule.active(datetime(2021, 6, 30, 22, 59))
+    assert not schedule.active(datetime(2021, 7, 1, 10))
+
+
+def test_schedule_crossing_midnight():
+    """Test a time where endTime is before startTime"""
+    schedule = CompiledSchedule({"times": [{"startTime": "22:00", "endTime": "02:00", "weekDays": [6]}]})
+    assert schedule.active(datetime(2021, 7, 3, 23))  # saturday
+    assert schedule.active(datetime(2021, 7, 4, 1))  # sunday
+    assert not schedule.active(datetime(2021, 7, 4, 3))
+
+
+def test_active_medias_of_playlist():
+    """Test the active medias consider videowalls, carousels and sub-playlists"""
+    assert engine.active_medias(39, datetime(2021, 6, 27, 10)) == {1, 4}
+    assert engine.active_medias(39, datetime(2021, 6, 27, 5)) == {4}
+    assert engine.active_medias(38, datetime(2021, 6, 27, 10)) == {1, 31, 56}
+    assert engine.active_medias(38, datetime(2022, 7, 1)) == {31, 55, 56}
+
+
+def test_next_change():
+    """Test the next moment when the active medias change"""
+    assert engine.next_change(39, datetime(2021, 6, 27, 10)) == datetime(2021, 6, 27, 23)
+    assert engine.next_change(39, datetime(2021, 6, 27, 23)) == datetime(2021, 6, 28, 9)
+    assert engine.next_change(39, datetime(2021, 6, 30, 23)) is None
+    assert engine.next_change(41, datetime(2021, 1, 1)) == datetime(2022, 6, 1)
+
+
+def test_vectorized_evaluation_and_timeline():
+    """Test many moments at once and the timeline of a week"""
+    moments = [datetime(2021, 6, 27, 10), datetime(2021, 6, 20), datetime(2021, 6, 27, 5)]
+    assert engine.active_medias_at(39, moments) == [{1, 4}, {4}, {4}]
+    timeline = engine.timeline(39, datetime(2021, 6, 27), datetime(2021, 6, 29))
+    assert [(s.hour, e.hour, sorted(m)) for s, e, m in timeline] == [
+        (0, 6, [4]), (6, 23, [1, 4]), (23, 9, [4]), (9, 23, [1, 4]), (23, 0, [4])
+    ]
+
+
+def test_missing_playlists_have_no_medias():
+    """Test a dangling sub-playlist and a playlist that isn't in the listing"""
+    dangling = ScheduleEngine(MEDIAS, [
+        {"id": 90, "items": [{"type": "media", "id": 31}, {"type": "subPlaylist", "id": 99}],
+         "sequence": [0, 1]},
+    ])
+    assert dangling.active_medias(90, datetime(2021, 6, 27, 10)) == {31}
+    assert dangling.active_medias(99, datetime(2021, 6, 27, 10)) == set()
+
+
+def test_content_schedule_narrows_the_media():
+    """Test the contentSchedule of the items limits the schedule of their medias"""
+    playlists = [{"id": 90, "items": [
+        {"type": "media", "id": 31, "contentSchedule": {"startDate": "2021-06-20", "endDate": "2021-07-10", "times": [
+            {"startTime": "08:00", "endTime": "12:00", "weekDays": [0]}]}},
+        {"type": "videoWall", "grid": [[{"id": 4}, {"id": 1, "contentSchedule": {"times": [
+            {"startTime": "20:00", "endTime": "23:30", "weekDays": [0]}]}}]]},
+    ], "sequence": [0, 1]}]
+    narrowed = ScheduleEngine(MEDIAS, playlists)
+    assert narrowed.active_medias(90, datetime(2021, 6, 27, 10)) == {4, 31}
+    assert narrowed.active_medias(90, datetime(2021, 6, 27, 13)) == {4}
+    assert narrowed.active_medias(90, datetime(2021, 6, 27, 21)) == {1, 4}
+    assert narrowed.active_medias(90, datetime(2021, 7, 11, 10)) == {4}
+    assert narrowed.next_change(90, datetime(2021, 6, 27, 10)) == datetime(2021, 6, 27, 12)
+    assert narrowed.next_change(90, datetime(2021, 6, 27, 21)) == datetime(2021, 6, 27, 23)
+    assert narrowed.is_active(31, datetime(2021, 6, 27, 13))
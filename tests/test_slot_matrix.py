@@ -0,0 +1,47 @@
+from fouryousee.slots import SlotMatrix
+from tests.resources_for_tests.fleet import PLAYERS, PLAYLISTS, player
+
+matrix = SlotMatrix(PLAYERS)
+
+
+def test_rows_and_columns():
+    """Test the slots of a player and of a day"""
+    assert matrix.row(2) == [39, 39, 39, 39, 39, 39, 38]
+    assert matrix.column(6).tolist() == [38, 38, 39]
+    assert SlotMatrix([player(9, "Empty", [])]).row(9) == [0] * 7
+
+
+def test_queries():
+    """Test who plays a playlist, unused playlists and counts"""
+    assert matrix.players_of(38, day=6) == [1, 2]
+    assert matrix.players_of(38, day=0) == [1]
+    assert matrix.players_of(39) == [2, 3]
+    assert matrix.unused([p["id"] for p in PLAYLISTS]) == [40, 41]
+    assert matrix.counts() == {38: 8, 39: 13}
+    assert matrix.counts(day=6) == {38: 2, 39: 1}
+
+
+def test_diff_between_snapshots():
+    """Test the slot-wise changes, including added and removed players"""
+    planned = matrix.copy()
+    planned.assign([1, 3], 41, days=[0])
+    assert matrix.row(1)[0] == 38
+    assert planned.diff(matrix) == [
+        {"player": 1, "day": 0, "before": 38, "after": 41},
+        {"player": 3, "day": 0, "before": 39, "after": 41},
+    ]
+    later = SlotMatrix(PLAYERS[:1] + [player(4, "New", [38] * 7)])
+    changes = later.diff(matrix)
+    assert {c["player"] for c in changes} == {2, 3, 4}
+    assert {"player": 4, "day": 0, "before": 0, "after": 38} in changes
+
+
+def test_apply_slot_matrix_edits_only_changed(offline_client):
+    """Test only the players with different slots are edited"""
+    my = offline_client(edit=lambda resource, payload: payload, players=PLAYERS)
+    planned = my.get_slot_matrix().copy()
+    planned.assign([2], 41, days=[5, 6])
+    planned.assign([3], 39)
+    assert my.apply_slot_matrix(planned)["editedPlayers"] == [2]
+    assert [resource for resource, _ in my.requests] == ["players/2"]
+    assert my.requests[0][1]["playlists"] == {"0": 39, "1": 39, "2": 39, "3": 39, "4": 39, "5": 41, "6": 41}
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from fouryousee.fouryousee import remove_items
+from fouryousee.schedule import CompiledSchedule, find_expired
+from tests.resources_for_tests.fleet import MEDIAS, PLAYLISTS
+
+MOMENT = datetime(2022, 7, 1)
+SCHEDULE = {"startDate": "2022-01-01", "endDate": "None", "times": [
+    {"startTime": "08:00", "endTime": "20:00", "weekDays": [1, 2, 3, 4, 5]}]}
+
+
+def test_never_active_schedule():
+    """Test a schedule whose weekdays don't fall between its dates"""
+    schedule = CompiledSchedule({"startDate": "2022-07-04", "endDate": "2022-07-05", "times": [
+        {"startTime": "08:00", "endTime": "10:00", "weekDays": [0, 6]}]})
+    assert schedule.never_active()
+    assert not CompiledSchedule(MEDIAS[0]["schedule"]).never_active()
+
+
+def test_find_expired():
+    """Test expired medias and items in one pass"""
+    medias = MEDIAS + [{"id": 99, "schedule": {"startDate": "2022-07-02", "endDate": "2022-07-01", "times": []}}]
+    playlists = PLAYLISTS + [{"id": 75, "items": [{"type": "layout", "id": 1}, {"type": "media", "id": 99}],
+                              "sequence": [0, 1]}]
+    assert find_expired(medias, playlists, MOMENT) == {
+        "expiredMedias": [1],
+        "neverActiveMedias": [99],
+        "expiredPlaylists": [75],
+        "expiredItems": {39: [2], 75: [1]},  # The carousel of 40 plays a category
+    }
+
+
+def test_find_expired_content_schedules():
+    """Test an item expired by its contentSchedule while its media is still valid"""
+    playlists = [{"id": 75, "items": [
+        {"type": "media", "id": 31, "contentSchedule": {"startDate": "2022-06-01", "endDate": "2022-06-15"}},
+        {"type": "media", "id": 31},
+    ], "sequence": [0, 1]}]
+    assert find_expired(MEDIAS, playlists, MOMENT) == {
+        "expiredMedias": [1],
+        "neverActiveMedias": [],
+        "expiredPlaylists": [],
+        "expiredItems": {75: [0]},
+    }
+
+
+def test_remove_items_rebuilds_sequence():
+    """Test the sequence is shifted after removing items"""
+    schedule = {"startDate": "2050-11-26", "times": []}
+    playlist = {"items": [{"type": "news"}, {"type": "media", "id": 1, "name": "a"},
+                          {"type": "media", "id": 2, "contentSchedule": schedule}], "sequence": [0, 1, 2, 0, 1]}
+    assert remove_items(playlist, [1]) == (
+        [{"type": "news"}, {"type": "media", "id": 2, "contentSchedule": schedule}], [0, 1, 0]
+    )
+
+
+def test_sweep_expired_acts_on_cached_listing(offline_client):
+    """Test the playlists are edited directly and only the unreferenced medias are deleted"""
+    expiring = {"id": 99, "name": "Promo", "schedule": {"startDate": "None", "endDate": "2022-06-01", "times": []}}
+    promos = {"id": 75, "name": "Promos", "isSubPlaylist": False, "category": None,
+              "items": [{"type": "media", "id": 99}, {"type": "media", "id": 31, "contentSchedule": SCHEDULE}],
+              "sequence": [0, 1, 0]}
+    my = offline_client(
+        edit=lambda resource, payload: dict(payload, id=int(resource.split("/")[1])),
+        delete=lambda resource, payload: True,
+        medias=MEDIAS + [expiring], playlists=PLAYLISTS + [promos],
+    )
+
+    result = my.sweep_expired(MOMENT, delete_medias=True, clean_playlists=True)
+    assert result["editedPlaylists"] == [39, 75]
+    assert result["deletedMedias"] == [99]
+    assert result["keptMedias"] == [1]  # Still in the videowall of the playlist 39
+    assert result["errors"] == {}
+    edited = dict(my.requests)
+    assert "playlists/40" not in edited  # Its carousel is kept
+    assert edited["playlists/75"]["items"] == [{"type": "media", "id": 31, "contentSchedule": SCHEDULE}]
+    assert edited["playlists/75"]["sequence"] == [0]
+    assert [resource for resource, payload in my.requests if payload is None] == ["medias/99"]
+    assert [m["id"] for m in my.medias] == [1, 4, 31, 55, 56]
@@ -0,0 +1,61 @@
+import pytest
+
+from fouryousee.videowall import VideowallCompiler
+from tests.resources_for_tests.fleet import MEDIAS
+
+compiler = VideowallCompiler(MEDIAS, tolerance=0)
+
+
+def test_compile_normalized_payload():
+    """Test the cells are reduced to the media references and other keys are kept"""
+    schedule = {"startDate": "2050-11-26"}
+    wall = {"type": "videoWall", "abortIfError": False, "contentSchedule": schedule, "grid": [
+        [{"id": 4, "name": "4YouSee Analyse", "durationInSeconds": 10},
+         {"type": "media", "id": 1, "contentSchedule": schedule}]]}
+    assert compiler.compile(wall) == {
+        "type": "videoWall", "abortIfError": False, "ignoreLayout": False, "contentSchedule": schedule,
+        "grid": [[{"type": "media", "id": 4}, {"type": "media", "id": 1, "contentSchedule": schedule}]],
+    }
+
+
+def test_all_errors_in_one_pass():
+    """Test shape, ids and durations are reported together"""
+    wall = {"type": "videowall", "grid": [[{"id": 4}, {"id": 999}], [{"id": 31}], [{"type": "news"}, {"id": 1}]]}
+    assert compiler.errors(wall) == [
+        "Cell (0, 1) references the media 999, that was not found",
+        "Row 1 has 1 cells instead of 2",
+        "Cell (2, 0) must be a media with an id",
+        "Durations of the cells are different: 10s in (0, 0), 30s in (1, 0)",
+    ]
+    assert compiler.errors({"type": "videowall", "grid": []}) == ["The grid must be a non empty list of rows"]
+
+
+def test_durations_tolerance_and_cells():
+    """Test the tolerance and the durations of the cells without medias"""
+    wall = {"type": "videowall", "grid": [[{"id": 4}, {"id": 31}]]}
+    assert VideowallCompiler(MEDIAS, tolerance=20).errors(wall) == []
+    assert VideowallCompiler(MEDIAS).errors(wall) == []  # Not checked by default
+    wall = {"type": "videowall", "grid": [[{"id": 7, "durationInSeconds": 5}, {"id": 8, "durationInSeconds": 6}]]}
+    assert VideowallCompiler(tolerance=0).errors(wall) == [
+        "Durations of the cells are different: 5s in (0, 0), 6s in (0, 1)"
+    ]
+
+
+def test_add_playlist_rejected_locally(offline_client):
+    """Test an invalid videowall doesn't reach the API"""
+    my = offline_client(medias=MEDIAS)
+    with pytest.raises(Exception, match="Item 1: Invalid videowall: Cell"):
+        my.add_playlist(name="Wall", items=[{"type": "layout", "id": 1},
+                                            {"type": "videowall", "grid": [[{"id": 4}, {"id": 999}]]}],
+                        sequence=[0, 1])
+
+
+def test_add_playlist_accepts_different_durations(offline_client):
+    """Test the durations of the cells aren't checked and their schedules are sent"""
+    my = offline_client(post=lambda resource, payload: dict(payload, id=90), medias=MEDIAS)
+    schedule = {"startDate": "2050-11-26"}
+    my.add_playlist(name="Wall", items=[{"type": "videowall", "grid": [
+        [{"id": 4}, {"id": 31, "contentSchedule": schedule}]]}], sequence=[0])
+    assert my.requests[0][1]["items"][0]["grid"] == [
+        [{"type": "media", "id": 4}, {"type": "media", "id": 31, "contentSchedule": schedule}]
+    ]
@@ -0,0 +1,92 @@
+import json
+
+import requests
+
+from fouryousee.webhook import ReportWebhookReceiver
+
+REPORT = {
+    "id": 521546,
+    "type": "detailed",
+    "format": "json",
+    "status": "success",
+    "url": "https://4yousee-playlogs-reports.s3.amazonaws.com/62bb067d43ac1.gz",
+}
+
+
+class FakeReports(object):
+    """Answer get_reports(id=...) with a report that is ready at the
+    second consult"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_reports(self, id):
+        self.calls += 1
+        return dict(REPORT, id=id, status="waiting" if self.calls < 2 else "success")
+
+
+def test_webhook_resolves_registered_report():
+    """Test the callback resolves the future of a registered report"""
+    with ReportWebhookReceiver() as receiver:
+        future = receiver.register(REPORT["id"])
+        response = requests.post(receiver.url, data=json.dumps(REPORT))
+        assert response.status_code == 200
+        assert future.result(timeout=5) == REPORT
+
+
+def test_webhook_keeps_report_received_before_register():
+    """Test a callback arriving before the register is not lost"""
+    with ReportWebhookReceiver() as receiver:
+        requests.post(receiver.url, data=json.dumps(REPORT))
+        assert receiver.wait(REPORT["id"], timeout=5) == REPORT
+
+
+def test_webhook_requires_secret():
+    """Test only the POSTs to the path with the secret are accepted"""
+    with ReportWebhookReceiver(secret="s3cr3t") as receiver:
+        assert receiver.server.server_address[0] == "127.0.0.1"
+        assert receiver.url.endswith("/s3cr3t")
+        future = receiver.register(REPORT["id"])
+        base = receiver.url[:-len("s3cr3t")]
+        assert requests.post(base, data=json.dumps(REPORT)).status_code == 404
+        assert requests.post(base + "guess", data=json.dumps(REPORT)).status_code == 404
+        assert not future.done()
+        assert requests.post(receiver.url, data=json.dumps(REPORT)).status_code == 200
+        assert future.result(timeout=5) == REPORT
+
+
+def test_webhook_limits_unregistered_reports():
+    """Test the reports received before being registered are capped and expire"""
+    receiver = ReportWebhookReceiver(max_received=2)
+    for report_id in [1, 2, 3]:
+        receiver.resolve(dict(REPORT, id=report_id))
+    assert list(receiver.received) == [2, 3]
+    receiver.received_ttl = 0
+    assert not receiver.register(2).done()
+    assert receiver.received == {}
+
+
+def test_webhook_ignores_pending_report():
+    """Test a report with status waiting doesn't resolve the future"""
+    receiver = ReportWebhookReceiver()
+    future = receiver.register(REPORT["id"])
+    assert not receiver.resolve(dict(REPORT, status="waiting"))
+    assert not future.done()
+
+
+def test_webhook_falls_back_to_polling():
+    """Test the report is consulted once the deadline is reached"""
+    client = FakeReports()
+    receiver = ReportWebhookReceiver(client, poll_interval=0)
+    report = receiver.wait(10, timeout=0.01)
+    assert report["status"] == "success"
+    assert client.calls == 2
+
+
+def test_webhook_falls_back_without_timeout():
+    """Test a lost callback falls back to polling at the deadline of
+    the receiver when wait doesn't receive a timeout"""
+    client = FakeReports()
+    receiver = ReportWebhookReceiver(client, poll_interval=0, deadline=0.01)
+    assert receiver.wait(10)["status"] == "success"
+    assert client.calls == 2